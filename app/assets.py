@@ -1,24 +1,18 @@
+import asyncio
+
 from fastapi import APIRouter, Depends, HTTPException
-from binance.client import Client
 
-from . import auth
-from .supabase_db import db
+from . import auth, clients
+from .exchange import AsyncExchange
 
 router = APIRouter()
 
 
-def _get_client(user_id: int) -> Client:
-    settings = db.get_user_settings(user_id)
-    if not settings:
-        raise HTTPException(status_code=400, detail="Binance API keys not configured")
-    return Client(settings["binance_api_key"], settings["binance_api_secret"])
-
-
 @router.get("/assets")
-def get_assets(current_user: dict = Depends(auth.get_current_user)):
-    client = _get_client(current_user["id"])
+async def get_assets(current_user: dict = Depends(auth.get_current_user)):
+    exchange = AsyncExchange(await clients.get_client_async(current_user["id"]))
     try:
-        account = client.get_account()
+        account = await exchange.get_account()
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
     balances = account.get("balances", [])
@@ -26,30 +20,33 @@ def get_assets(current_user: dict = Depends(auth.get_current_user)):
     return {"balances": non_zero}
 
 
+async def _usdt_value(exchange: AsyncExchange, asset: str, qty: float) -> float:
+    if asset == "USDT":
+        return qty
+    try:
+        ticker = await exchange.get_symbol_ticker(symbol=f"{asset}USDT")
+        return qty * float(ticker["price"])
+    except Exception:
+        # Skip assets without a direct USDT pair
+        return 0.0
+
+
 @router.get("/portfolio_value")
-def get_portfolio_value(current_user: dict = Depends(auth.get_current_user)):
+async def get_portfolio_value(current_user: dict = Depends(auth.get_current_user)):
     """Return total portfolio value in USDT."""
-    client = _get_client(current_user["id"])
+    exchange = AsyncExchange(await clients.get_client_async(current_user["id"]))
     try:
-        account = client.get_account()
+        account = await exchange.get_account()
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
     balances = account.get("balances", [])
-    total = 0.0
+    holdings = []
     for b in balances:
         qty = float(b.get("free", 0)) + float(b.get("locked", 0))
-        if qty <= 0:
-            continue
-        asset = b.get("asset")
-        if asset == "USDT":
-            total += qty
-            continue
-        symbol = f"{asset}USDT"
-        try:
-            ticker = client.get_symbol_ticker(symbol=symbol)
-            price = float(ticker["price"])
-            total += qty * price
-        except Exception:
-            # Skip assets without a direct USDT pair
-            continue
-    return {"total_usdt": total}
+        if qty > 0:
+            holdings.append((b.get("asset"), qty))
+    # price every holding concurrently rather than one ticker call at a time
+    values = await asyncio.gather(
+        *(_usdt_value(exchange, asset, qty) for asset, qty in holdings)
+    )
+    return {"total_usdt": sum(values)}
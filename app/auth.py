@@ -1,41 +1,71 @@
 from datetime import datetime, timedelta
 from typing import Optional
 import os
+import threading
+import time
 
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from jose import JWTError, jwt
-from passlib.context import CryptContext
 
-from . import schemas
-from .supabase_db import db
+from . import passwords, schemas
+from .supabase_db import async_db, db
 
 SECRET_KEY = os.getenv("SECRET_KEY", "CHANGE_ME")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
+# Seconds an authenticated user record is reused before it is read again
+USER_CACHE_SECONDS = float(os.getenv("USER_CACHE_SECONDS", "30"))
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
 router = APIRouter()
 
+# user id -> (user record, expiry on the monotonic clock)
+_USERS: dict[int, tuple[dict, float]] = {}
+_users_lock = threading.Lock()
+
 # Utility functions
 
 def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
+    return passwords.verify_password(plain_password, hashed_password)
 
 
 def get_password_hash(password):
-    return pwd_context.hash(password)
+    return passwords.hash_password(password)
 
 
 def get_user(username: str) -> Optional[dict]:
     return db.get_user_by_username(username)
 
 
-def authenticate_user(username: str, password: str):
-    user = get_user(username)
-    if not user or not verify_password(password, user["hashed_password"]):
+def _cached_user(user_id: int) -> Optional[dict]:
+    entry = _USERS.get(user_id)
+    if entry is None or entry[1] <= time.monotonic():
+        return None
+    return entry[0]
+
+
+def _cache_user(user: dict):
+    now = time.monotonic()
+    with _users_lock:
+        for user_id in [u for u, (_, expiry) in _USERS.items() if expiry <= now]:
+            del _USERS[user_id]
+        _USERS[user["id"]] = (user, now + USER_CACHE_SECONDS)
+
+
+def invalidate_user(user_id: int):
+    """Forget the cached record, e.g. after the user's status changed.
+
+    Other workers keep theirs for at most ``USER_CACHE_SECONDS``.
+    """
+    with _users_lock:
+        _USERS.pop(user_id, None)
+
+
+async def authenticate_user(username: str, password: str):
+    user = await async_db.get_user_by_username(username)
+    if not user or not await passwords.verify_password_async(password, user["hashed_password"]):
         return False
     return user
 
@@ -50,18 +80,18 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
 # Routes
 
 @router.post("/register", response_model=schemas.User)
-def register(user: schemas.UserCreate):
-    db_user = get_user(user.username)
+async def register(user: schemas.UserCreate):
+    db_user = await async_db.get_user_by_username(user.username)
     if db_user:
         raise HTTPException(status_code=400, detail="Username already registered")
-    hashed_password = get_password_hash(user.password)
-    new_user = db.create_user(user.username, hashed_password, status="Pending")
+    hashed_password = await passwords.hash_password_async(user.password)
+    new_user = await async_db.create_user(user.username, hashed_password, status="Pending")
     return new_user
 
 
 @router.post("/token")
-def login(form_data: OAuth2PasswordRequestForm = Depends()):
-    user = authenticate_user(form_data.username, form_data.password)
+async def login(form_data: OAuth2PasswordRequestForm = Depends()):
+    user = await authenticate_user(form_data.username, form_data.password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -74,12 +104,20 @@ def login(form_data: OAuth2PasswordRequestForm = Depends()):
         )
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
-        data={"sub": user["username"]}, expires_delta=access_token_expires
+        data={"sub": user["username"], "uid": user["id"], "status": user["status"]},
+        expires_delta=access_token_expires,
     )
     return {"access_token": access_token, "token_type": "bearer"}
 
 
-def get_current_user(token: str = Depends(oauth2_scheme)):
+async def get_current_user(token: str = Depends(oauth2_scheme)):
+    """The user the token was issued to, usually without a database read.
+
+    Tokens carry the user id and status.  The user record is then cached for
+    ``USER_CACHE_SECONDS``, so it is only fetched when the cache expires or
+    the user's status was changed.  Users who are no longer active are
+    rejected even while their token is still valid.
+    """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -92,8 +130,20 @@ def get_current_user(token: str = Depends(oauth2_scheme)):
             raise credentials_exception
     except JWTError:
         raise credentials_exception
-    user = get_user(username)
+    user_id = payload.get("uid")
+    if user_id is not None and payload.get("status") != "Active":
+        raise credentials_exception
+    user = _cached_user(user_id) if user_id is not None else None
     if user is None:
+        if user_id is not None:
+            user = await async_db.get_user(user_id)
+        else:
+            # token issued before the claims were added
+            user = await async_db.get_user_by_username(username)
+        if user is None or user["username"] != username:
+            raise credentials_exception
+        _cache_user(user)
+    if user.get("status") != "Active":
         raise credentials_exception
     return user
 
@@ -112,6 +162,7 @@ def list_users(current_user: dict = Depends(get_current_user)):
 def update_user_status(user_id: int, status: str, current_user: dict = Depends(get_current_user)):
     # In a real app, validate admin privileges here
     updated = db.update_user_status(user_id, status)
+    invalidate_user(user_id)
     if not updated:
         raise HTTPException(status_code=404, detail="User not found")
     return updated
@@ -0,0 +1,245 @@
+"""Vectorized backtests of the registered strategies over stored klines.
+
+Each strategy's BUY/SELL conditions are evaluated for every candle in one pass
+with the same pandas helpers the live strategies were written against.  The
+position is then resolved without a Python loop: a BUY only opens a trade
+when flat and a SELL only closes one when in a position, exactly as
+``_run_strategy_loop`` acts on ``check_signal``.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+from fastapi import APIRouter, Depends, HTTPException
+
+from . import auth, kline_store
+from .candles import Candles
+from .dashboard import FEE_RATE
+from .strategies import (
+    STRATEGY_MARKETS,
+    STRATEGY_SPECS,
+    ContinuousTrendRiderStrategy,
+    HyperFrequencyEMAStrategy,
+    SqueezeBreakoutStrategy,
+    atr,
+    bollinger_bands,
+    ema,
+    keltner_channels,
+)
+
+router = APIRouter()
+
+
+def squeeze_signals(
+    candles: Candles,
+    ema_length: int,
+    squeeze_length: int,
+    bb_mult: float,
+    kc_mult: float,
+) -> tuple[np.ndarray, np.ndarray]:
+    df = pd.DataFrame({"high": candles.high, "low": candles.low, "close": candles.close})
+    close = df["close"]
+    bbl, bbu = bollinger_bands(close, squeeze_length, bb_mult)
+    kcl, kcu = keltner_channels(df, squeeze_length, kc_mult)
+    don_h = df["high"].rolling(squeeze_length).max()
+    don_l = df["low"].rolling(squeeze_length).min()
+
+    is_bull_market = close > ema(close, ema_length)
+    squeeze_was_active = (bbl.shift() > kcl.shift()) & (bbu.shift() < kcu.shift())
+    buy = is_bull_market & squeeze_was_active & (close > don_h.shift())
+    sell = is_bull_market & ~buy & (close < don_l.shift())
+    return buy.to_numpy(), sell.to_numpy()
+
+
+def ema_cross_signals(
+    candles: Candles,
+    ema_long_len: int,
+    ema_fast_len: int,
+    ema_slow_len: int,
+    atr_len_vol: int,
+    min_vol_percent: float,
+) -> tuple[np.ndarray, np.ndarray]:
+    df = pd.DataFrame({"high": candles.high, "low": candles.low, "close": candles.close})
+    close = df["close"]
+    ema_long = ema(close, ema_long_len)
+    fast = ema(close, ema_fast_len)
+    slow = ema(close, ema_slow_len)
+
+    has_vol = (atr(df, atr_len_vol) / close) * 100 > min_vol_percent
+    long_entry = (fast.shift() <= slow.shift()) & (fast > slow)
+    short_entry = (fast.shift() >= slow.shift()) & (fast < slow)
+    buy = has_vol & (close > ema_long) & long_entry
+    sell = has_vol & ~buy & (close < ema_long) & short_entry
+    return buy.to_numpy(), sell.to_numpy()
+
+
+def trend_rider_signals(candles: Candles, ema_len: int) -> tuple[np.ndarray, np.ndarray]:
+    close = pd.Series(candles.close)
+    ema_now = ema(close, ema_len)
+    return (close > ema_now).to_numpy(), (close < ema_now).to_numpy()
+
+
+# strategy class -> (vectorized signal function, strategy attributes it takes)
+SIGNAL_FUNCTIONS = {
+    SqueezeBreakoutStrategy: (
+        squeeze_signals, ("ema_length", "squeeze_length", "bb_mult", "kc_mult")
+    ),
+    HyperFrequencyEMAStrategy: (
+        ema_cross_signals,
+        ("ema_long_len", "ema_fast_len", "ema_slow_len", "atr_len_vol", "min_vol_percent"),
+    ),
+    ContinuousTrendRiderStrategy: (trend_rider_signals, ("ema_len",)),
+}
+
+
+def signal_function(strategy_id: str):
+    """Vectorized signal function and parameter names of a registered strategy."""
+    return SIGNAL_FUNCTIONS[STRATEGY_SPECS[strategy_id].factory]
+
+
+def default_params(strategy_id: str) -> dict:
+    """Parameters the live strategy runs with."""
+    strategy = STRATEGY_SPECS[strategy_id].build()
+    _, names = signal_function(strategy_id)
+    return {name: getattr(strategy, name) for name in names}
+
+
+@dataclass
+class BacktestResult:
+    """Closed trades (one array entry per trade) and the per-candle equity."""
+
+    entry_time: np.ndarray
+    exit_time: np.ndarray
+    entry_price: np.ndarray
+    exit_price: np.ndarray
+    quantity: np.ndarray
+    commission_entry: np.ndarray
+    commission_exit: np.ndarray
+    profit: np.ndarray
+    equity: np.ndarray
+
+    def summary(self) -> dict:
+        trades = len(self.profit)
+        peak = np.maximum.accumulate(self.equity) if len(self.equity) else self.equity
+        return {
+            "total_profit": float(self.profit.sum()),
+            "trades": trades,
+            "win_rate": float((self.profit > 0).mean() * 100) if trades else 0.0,
+            "max_drawdown": float((peak - self.equity).max()) if len(self.equity) else 0.0,
+        }
+
+    def trades(self) -> list[dict]:
+        return [
+            {
+                "entry_time": int(self.entry_time[i]),
+                "exit_time": int(self.exit_time[i]),
+                "entry_price": float(self.entry_price[i]),
+                "exit_price": float(self.exit_price[i]),
+                "quantity": float(self.quantity[i]),
+                "commission_entry": float(self.commission_entry[i]),
+                "commission_exit": float(self.commission_exit[i]),
+                "profit": float(self.profit[i]),
+            }
+            for i in range(len(self.profit))
+        ]
+
+
+def simulate(
+    candles: Candles,
+    buy: np.ndarray,
+    sell: np.ndarray,
+    amount: float,
+    fee_rate: float = FEE_RATE,
+) -> BacktestResult:
+    """Fill signals at the candle close with a fixed quote ``amount`` per trade.
+
+    Commissions are charged in the quote asset on both legs and profit is
+    computed as in ``crud.create_completed_trade``.
+    """
+    close = np.asarray(candles.close, dtype=np.float64)
+    # 1 after a BUY, 0 after a SELL, carried forward between signals
+    state = np.where(buy, 1.0, np.where(sell, 0.0, np.nan))
+    in_position = pd.Series(state).ffill().fillna(0.0).to_numpy() > 0
+    was_in_position = np.concatenate(([False], in_position[:-1]))
+    entries = np.flatnonzero(in_position & ~was_in_position)
+    exits = np.flatnonzero(~in_position & was_in_position)
+
+    entry_price = close[entries]
+    quantity = amount / entry_price
+    commission_entry = np.full(len(entries), amount * fee_rate)
+
+    # mark the open position to market on every candle it is held
+    trade_index = np.cumsum(in_position & ~was_in_position) - 1
+    held = in_position & (trade_index >= 0)
+    unrealized = np.zeros(len(close))
+    idx = trade_index[held]
+    unrealized[held] = (close[held] - entry_price[idx]) * quantity[idx] - commission_entry[idx]
+
+    # only trades that have been exited are closed
+    closed = len(exits)
+    exit_price = close[exits]
+    commission_exit = exit_price * quantity[:closed] * fee_rate
+    profit = (
+        (exit_price - entry_price[:closed]) * quantity[:closed]
+        - commission_entry[:closed]
+        - commission_exit
+    )
+    realized = np.zeros(len(close))
+    realized[exits] = profit
+
+    return BacktestResult(
+        entry_time=np.asarray(candles.open_time)[entries[:closed]],
+        exit_time=np.asarray(candles.open_time)[exits],
+        entry_price=entry_price[:closed],
+        exit_price=exit_price,
+        quantity=quantity[:closed],
+        commission_entry=commission_entry[:closed],
+        commission_exit=commission_exit,
+        profit=profit,
+        equity=np.cumsum(realized) + unrealized,
+    )
+
+
+def run_backtest(
+    strategy_id: str,
+    candles: Candles,
+    amount: float = 100.0,
+    params: dict | None = None,
+) -> BacktestResult:
+    """Backtest a registered strategy, optionally overriding its parameters."""
+    signals, _ = signal_function(strategy_id)
+    merged = {**default_params(strategy_id), **(params or {})}
+    buy, sell = signals(candles, **merged)
+    return simulate(candles, buy, sell, amount)
+
+
+@router.get("/strategy/{strategy_id}/backtest")
+def backtest_strategy(
+    strategy_id: str,
+    start: int | None = None,
+    end: int | None = None,
+    amount: float = 100.0,
+    points: int = 500,
+    current_user: dict = Depends(auth.get_current_user),
+):
+    """Backtest a strategy over the locally stored klines of its market."""
+    strategy_id = strategy_id.lower()
+    if strategy_id not in STRATEGY_SPECS:
+        raise HTTPException(status_code=404, detail="Unknown strategy")
+    symbol, interval = STRATEGY_MARKETS[strategy_id]
+    candles = kline_store.get_store(symbol, interval).read(start, end)
+    if len(candles) < 2:
+        raise HTTPException(status_code=404, detail="No stored klines for this range")
+    result = run_backtest(strategy_id, candles, amount)
+    step = max(len(candles) // max(points, 1), 1)
+    return {
+        "strategy": strategy_id,
+        "symbol": symbol,
+        "interval": interval,
+        "summary": result.summary(),
+        "trades": result.trades(),
+        "equity": [
+            [int(candles.open_time[i]), float(result.equity[i])]
+            for i in range(len(candles) - 1, -1, -step)
+        ][::-1],
+    }
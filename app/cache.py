@@ -1,15 +1,108 @@
 import os
+import secrets
+
 import redis
+import redis.asyncio
 
 REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+# Seconds to wait on Redis before treating it as unavailable
+REDIS_TIMEOUT = float(os.getenv("REDIS_TIMEOUT", "0.5"))
+# Lifetime of a cached dashboard payload; writes make it stale sooner
+DASHBOARD_CACHE_SECONDS = int(os.getenv("DASHBOARD_CACHE_SECONDS", "3600"))
+
+redis_client = redis.from_url(
+    REDIS_URL, socket_timeout=REDIS_TIMEOUT, socket_connect_timeout=REDIS_TIMEOUT
+)
+async_redis = redis.asyncio.from_url(
+    REDIS_URL, socket_timeout=REDIS_TIMEOUT, socket_connect_timeout=REDIS_TIMEOUT
+)
+
+
+async def get_market_data(symbols: list[str]) -> list[bytes | None]:
+    """Cached market data of ``symbols`` in one round trip; misses are None."""
+    try:
+        return await async_redis.mget([f"market:{symbol}" for symbol in symbols])
+    except redis.RedisError:
+        return [None] * len(symbols)
+
+
+async def cache_market_data(data: dict[str, bytes], expire: float):
+    """Store market data of several symbols in one pipelined round trip."""
+    try:
+        async with async_redis.pipeline(transaction=False) as pipe:
+            for symbol, value in data.items():
+                pipe.set(f"market:{symbol}", value, px=int(expire * 1000))
+            await pipe.execute()
+    except redis.RedisError:
+        pass
+
+
+# Dashboard payloads are keyed by a per-user version counter that every
+# trade write increments, so a write makes all cached payloads of the user
+# unreachable at once and they simply expire.  A random epoch token is
+# created alongside the counters; a flush or a restart without persistence
+# drops it with them, so counters that start over from zero never repeat an
+# ETag handed out before.  Helpers return None instead of raising when Redis
+# is down, and callers then skip the cache.
+
+_EPOCH_KEY = "dashboard:epoch"
+
+def _version_key(user_id: int) -> str:
+    return f"dashboard:version:{user_id}"
+
+
+def _dashboard_key(user_id: int, version: int, variant: str) -> str:
+    return f"dashboard:{user_id}:{version}:{variant}"
+
+
+def bump_dashboard_version(user_id: int) -> int | None:
+    try:
+        return redis_client.incr(_version_key(user_id))
+    except redis.RedisError as exc:
+        print(f"Redis unavailable, dashboard cache not invalidated: {exc}")
+        return None
+
+
+async def abump_dashboard_version(user_id: int) -> int | None:
+    try:
+        return await async_redis.incr(_version_key(user_id))
+    except redis.RedisError as exc:
+        print(f"Redis unavailable, dashboard cache not invalidated: {exc}")
+        return None
+
+
+async def get_dashboard_version(user_id: int) -> int | None:
+    try:
+        return int(await async_redis.get(_version_key(user_id)) or 0)
+    except redis.RedisError:
+        return None
+
+
+async def get_dashboard_state(user_id: int) -> tuple[str, int] | None:
+    """Epoch token and dashboard version of a user, in one round trip."""
+    try:
+        epoch, version = await async_redis.mget(_EPOCH_KEY, _version_key(user_id))
+        if epoch is None:
+            await async_redis.set(_EPOCH_KEY, secrets.token_hex(8), nx=True)
+            epoch = await async_redis.get(_EPOCH_KEY)
+            if epoch is None:
+                return None
+        return epoch.decode(), int(version or 0)
+    except redis.RedisError:
+        return None
 
-redis_client = redis.from_url(REDIS_URL)
 
-def cache_market_data(symbol: str, data: str, expire: int = 60):
-    key = f"market:{symbol}"
-    redis_client.set(key, data, ex=expire)
+async def get_dashboard(user_id: int, version: int, variant: str) -> bytes | None:
+    try:
+        return await async_redis.get(_dashboard_key(user_id, version, variant))
+    except redis.RedisError:
+        return None
 
 
-def get_cached_market_data(symbol: str):
-    key = f"market:{symbol}"
-    return redis_client.get(key)
+async def set_dashboard(user_id: int, version: int, variant: str, payload: bytes):
+    try:
+        await async_redis.set(
+            _dashboard_key(user_id, version, variant), payload, ex=DASHBOARD_CACHE_SECONDS
+        )
+    except redis.RedisError:
+        pass
@@ -0,0 +1,96 @@
+"""Fixed-capacity candle history kept in preallocated NumPy arrays."""
+from dataclasses import dataclass
+
+import numpy as np
+
+PRICE_COLUMNS = ("open", "high", "low", "close", "volume")
+
+
+@dataclass(frozen=True)
+class Candles:
+    """Read-only column views of the newest candles, oldest first."""
+
+    open_time: np.ndarray
+    close_time: np.ndarray
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.open_time)
+
+
+class CandleBuffer:
+    """Ring buffer of candles updated in place from raw klines.
+
+    Every row is written to slot ``i`` and its mirror ``i + capacity`` so the
+    newest rows always form one contiguous slice, letting ``view`` hand out
+    zero-copy arrays.  Views are only valid until the next write.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.count = 0
+        # slot holding the newest row
+        self._last = -1
+        self.open_time = np.zeros(2 * capacity, dtype=np.int64)
+        self.close_time = np.zeros(2 * capacity, dtype=np.int64)
+        self.prices = {c: np.zeros(2 * capacity, dtype=np.float64) for c in PRICE_COLUMNS}
+
+    @property
+    def last_open_time(self) -> int | None:
+        return int(self.open_time[self._last]) if self.count else None
+
+    def _write(self, slot: int, kline: list):
+        for i in (slot, slot + self.capacity):
+            self.open_time[i] = kline[0]
+            self.close_time[i] = kline[6]
+            for offset, column in enumerate(PRICE_COLUMNS, start=1):
+                self.prices[column][i] = float(kline[offset])
+
+    def upsert(self, kline: list) -> bool:
+        """Revise the newest candle or append a newer one.
+
+        Returns ``False`` for klines older than the newest stored candle.
+        """
+        open_time = int(kline[0])
+        last = self.last_open_time
+        if last is not None and open_time < last:
+            return False
+        if last is None or open_time > last:
+            self._last = (self._last + 1) % self.capacity
+            self.count = min(self.count + 1, self.capacity)
+        self._write(self._last, kline)
+        return True
+
+    def view(self, n: int | None = None) -> Candles:
+        """Views of the newest ``n`` candles (all stored ones by default)."""
+        n = self.count if n is None else min(n, self.count)
+        end = self._last + 1 + self.capacity
+        columns = {
+            "open_time": self.open_time[end - n:end],
+            "close_time": self.close_time[end - n:end],
+            **{c: self.prices[c][end - n:end] for c in PRICE_COLUMNS},
+        }
+        for array in columns.values():
+            array.flags.writeable = False
+        return Candles(**columns)
+
+    def load(self, candles: Candles):
+        """Replace the contents with the newest ``capacity`` of ``candles``."""
+        n = min(len(candles), self.capacity)
+        for half in (0, self.capacity):
+            self.open_time[half:half + n] = candles.open_time[len(candles) - n:]
+            self.close_time[half:half + n] = candles.close_time[len(candles) - n:]
+            for column in PRICE_COLUMNS:
+                self.prices[column][half:half + n] = getattr(candles, column)[len(candles) - n:]
+        self.count = n
+        self._last = n - 1
+
+    def grow(self, capacity: int) -> "CandleBuffer":
+        """Return a larger buffer holding the same candles."""
+        bigger = CandleBuffer(capacity)
+        bigger.load(self.view())
+        return bigger
@@ -0,0 +1,77 @@
+"""Per-user exchange clients shared across requests and strategy tasks.
+
+Building a client costs a settings lookup, two decrypts and a new HTTP
+session, so each user's client is kept for ``CLIENT_TTL_SECONDS`` after its
+last use and its keep-alive connections are reused.  Changing the API keys
+through ``POST /settings`` drops the cached client.
+"""
+import os
+import threading
+import time
+
+from binance.client import Client
+from fastapi import HTTPException
+
+from .exchange import create_client
+from .supabase_db import async_db, db
+
+# Seconds an unused client stays cached
+CLIENT_TTL_SECONDS = float(os.getenv("CLIENT_TTL_SECONDS", "900"))
+
+# user id -> (client, expiry on the monotonic clock)
+_CLIENTS: dict[int, tuple[Client, float]] = {}
+# bumped by ``invalidate`` so a client built from old keys is not cached
+_GENERATIONS: dict[int, int] = {}
+_lock = threading.Lock()
+
+
+def _cached(user_id: int) -> Client | None:
+    now = time.monotonic()
+    with _lock:
+        entry = _CLIENTS.get(user_id)
+        if entry is None or entry[1] <= now:
+            return None
+        _CLIENTS[user_id] = (entry[0], now + CLIENT_TTL_SECONDS)
+        return entry[0]
+
+
+def _evict_expired(now: float):
+    for user_id in [u for u, (_, expiry) in _CLIENTS.items() if expiry <= now]:
+        del _CLIENTS[user_id]
+
+
+def _build(user_id: int, generation: int, settings: dict | None) -> Client:
+    if not settings:
+        raise HTTPException(status_code=400, detail="Binance API keys not configured")
+    client = create_client(settings["binance_api_key"], settings["binance_api_secret"])
+    now = time.monotonic()
+    with _lock:
+        _evict_expired(now)
+        if _GENERATIONS.get(user_id, 0) == generation:
+            _CLIENTS[user_id] = (client, now + CLIENT_TTL_SECONDS)
+    return client
+
+
+def get_client(user_id: int) -> Client:
+    """Cached client of ``user_id``, built from their stored API keys."""
+    client = _cached(user_id)
+    if client is not None:
+        return client
+    generation = _GENERATIONS.get(user_id, 0)
+    return _build(user_id, generation, db.get_user_settings(user_id))
+
+
+async def get_client_async(user_id: int) -> Client:
+    """``get_client`` reading the keys without blocking the event loop."""
+    client = _cached(user_id)
+    if client is not None:
+        return client
+    generation = _GENERATIONS.get(user_id, 0)
+    return _build(user_id, generation, await async_db.get_user_settings(user_id))
+
+
+def invalidate(user_id: int):
+    """Forget the cached client, e.g. after the user's keys changed."""
+    with _lock:
+        _CLIENTS.pop(user_id, None)
+        _GENERATIONS[user_id] = _GENERATIONS.get(user_id, 0) + 1
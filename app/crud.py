@@ -1,20 +1,21 @@
 from fastapi import HTTPException
-from . import schemas
+from . import pnl, schemas
 from .supabase_db import db
-from .dashboard import _compute_metrics
 
 
-def create_trade(trade: schemas.TradeCreate, user_id: int):
+def _trade_data(trade: schemas.TradeCreate) -> dict:
     data = trade.dict()
     if "side" in data:
         data["side"] = data["side"].lower()
+    return data
+
+
+def create_trade(trade: schemas.TradeCreate, user_id: int):
+    data = _trade_data(trade)
     data["owner_id"] = user_id
     new_trade = db.create_trade(data)
-    try:
-        # recompute user's total profit whenever a new trade is recorded
-        _compute_metrics(user_id)
-    except Exception:
-        pass
+    # the P&L aggregate is rebuilt on the next dashboard request
+    pnl.changed(user_id)
     return new_trade
 
 
@@ -31,55 +32,46 @@ def get_trades(owner_id: int, skip: int = 0, limit: int = 100):
 
 def update_trade(trade_id: int, trade: schemas.TradeCreate):
     existing = get_trade(trade_id)
-    data = trade.dict()
-    if "side" in data:
-        data["side"] = data["side"].lower()
+    data = _trade_data(trade)
     updated = db.update_trade(trade_id, data)
-    try:
-        # update cached metrics after trade modifications
-        _compute_metrics(existing["owner_id"])
-    except Exception:
-        pass
+    pnl.changed(existing["owner_id"])
     return updated
 
 
 def delete_trade(trade_id: int):
     existing = get_trade(trade_id)
     db.delete_trade(trade_id)
-    try:
-        _compute_metrics(existing["owner_id"])
-    except Exception:
-        pass
+    pnl.changed(existing["owner_id"])
     return existing
 
 
+def _completed_trade_data(trade_data: schemas.CompletedTradeCreate, user_id: int) -> dict:
+    # Calculate profit before insertion, including commissions
+    profit = (trade_data.exit_price - trade_data.entry_price) * trade_data.quantity
+    if trade_data.commission_entry is not None:
+        profit -= trade_data.commission_entry
+    if trade_data.commission_exit is not None:
+        profit -= trade_data.commission_exit
+    return {
+        "user_id": user_id,
+        "strategy_id": trade_data.strategy_id,
+        "symbol": trade_data.symbol,
+        "entry_price": trade_data.entry_price,
+        "exit_price": trade_data.exit_price,
+        "quantity": trade_data.quantity,
+        "commission_entry": trade_data.commission_entry,
+        "commission_exit": trade_data.commission_exit,
+        "profit": profit,
+    }
+
+
 def create_completed_trade(trade_data: schemas.CompletedTradeCreate, user_id: int):
     """
     Inserts a new record into the completed_trades table and calculates profit.
     """
     try:
-        # Calculate profit before insertion, including commissions
-        profit = (trade_data.exit_price - trade_data.entry_price) * trade_data.quantity
-        if trade_data.commission_entry is not None:
-            profit -= trade_data.commission_entry
-        if trade_data.commission_exit is not None:
-            profit -= trade_data.commission_exit
-
-        response = db.table("completed_trades").insert({
-            "user_id": user_id,
-            "strategy_id": trade_data.strategy_id,
-            "symbol": trade_data.symbol,
-            "entry_price": trade_data.entry_price,
-            "exit_price": trade_data.exit_price,
-            "quantity": trade_data.quantity,
-            "commission_entry": trade_data.commission_entry,
-            "commission_exit": trade_data.commission_exit,
-            "profit": profit
-        }).execute()
-
-        if response.data:
-            return response.data[0]
-        return None
+        return db.create_completed_trade(_completed_trade_data(trade_data, user_id))
     except Exception as e:
         print(f"ERROR: Failed to create completed trade in Supabase: {e}")
         return None
+
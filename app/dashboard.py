@@ -1,46 +1,38 @@
-from fastapi import APIRouter, Depends
-import pandas as pd
-from . import auth
-from .supabase_db import db
+import json
+import os
+
+import numpy as np
+from fastapi import APIRouter, Depends, Header, HTTPException, Response
+from . import auth, cache, pnl, rollups
+from .metrics import DASHBOARD_SECONDS
 
 # Binance trading fee rate (0.1% per trade)
 FEE_RATE = 0.001
+# Upper bound on the points of each chart series
+DASHBOARD_MAX_POINTS = int(os.getenv("DASHBOARD_MAX_POINTS", "500"))
 
 router = APIRouter()
 
 
-def _compute_metrics(user_id: int, trades=None):
-    """Compute dashboard metrics using ``trade_summary_view``."""
-    summary = db.get_trade_summary(user_id, skip=0, limit=1000) or []
-    if trades is None:
-        trades = db.get_trades(user_id, skip=0, limit=1000) or []
-
-    buy_trades = [t for t in trades if (t.get("side") or "").lower() == "buy"]
-    paired_ids = {s.get("entry_trade_id") for s in summary if s.get("entry_trade_id")}
-    open_trades = [t for t in buy_trades if t.get("id") not in paired_ids]
+def _metrics(user_pnl: pnl.UserPnL, resolution: str = "trade", points: int = DASHBOARD_MAX_POINTS):
+    """Dashboard payload of an aggregate.
 
+    ``resolution`` ``"trade"`` charts the most recent closed trades one by
+    one; a key of ``rollups.RESOLUTIONS`` charts P&L per time bucket and adds
+    the bucketed ``series`` overall and per strategy.
+    """
     trade_history: list[dict] = []
     chart_data: list[dict] = []
-    durations: list[float] = []
-
-    total_profit = 0.0
-    closed_count = 0
-    win_count = 0
-
-    for row in summary:
-        profit = float(row.get("profit_amount", 0))
-        total_profit += profit
-        closed_count += 1
-        if profit > 0:
-            win_count += 1
 
+    for row in user_pnl.history:
+        profit = float(row.get("profit_amount") or 0)
         trade_history.append(
             {
                 "id": row.get("trade_pair_id"),
                 "pair": row.get("symbol"),
                 "strategy": row.get("strategy_id"),
                 "status": "Closed",
-                "profit_percentage": float(row.get("profit_percentage", 0)),
+                "profit_percentage": float(row.get("profit_percentage") or 0),
                 "profit": profit,
             }
         )
@@ -53,18 +45,7 @@ def _compute_metrics(user_id: int, trades=None):
             }
         )
 
-        entry_ts = row.get("entry_timestamp")
-        exit_ts = row.get("exit_timestamp")
-        if entry_ts and exit_ts:
-            try:
-                dur = (
-                    pd.to_datetime(exit_ts) - pd.to_datetime(entry_ts)
-                ).total_seconds() / 60
-                durations.append(dur)
-            except Exception:
-                pass
-
-    for trade in open_trades:
+    for trade in user_pnl.open_trades.values():
         trade_history.append(
             {
                 "id": trade.get("id"),
@@ -76,30 +57,76 @@ def _compute_metrics(user_id: int, trades=None):
             }
         )
 
-    active_trades = len(open_trades)
-    win_rate = (win_count / closed_count * 100) if closed_count else 0.0
-    avg_duration = sum(durations) / len(durations) if durations else 0.0
+    series = None
+    if resolution == "trade":
+        chart_data = chart_data[-points:]
+    else:
+        series = rollups.series(
+            np.array(user_pnl.exit_times),
+            np.array(user_pnl.profits),
+            np.array(user_pnl.strategy_codes),
+            user_pnl.strategies,
+            resolution,
+            points,
+        )
+        chart_data = [
+            {
+                "name": point["time"],
+                "profit": max(point["profit"], 0.0),
+                "loss": max(-point["profit"], 0.0),
+            }
+            for point in series["total"]
+        ]
 
     metrics = {
         "stats": {
-            "total_profit": total_profit,
-            "win_rate": win_rate,
-            "active_trades": active_trades,
-            "avg_trade_duration": avg_duration,
+            "total_profit": user_pnl.total_profit,
+            "win_rate": user_pnl.win_rate,
+            "active_trades": len(user_pnl.open_trades),
+            "avg_trade_duration": user_pnl.avg_duration,
         },
         "trade_history": trade_history,
         "chart_data": chart_data,
     }
-
-    # Persist total profit on the user record
-    try:
-        db.update_user_total_profit(user_id, total_profit)
-    except Exception:
-        pass
-
+    if series is not None:
+        metrics["series"] = {"resolution": resolution, **series}
     return metrics
 
-
 @router.get("/dashboard")
-def get_dashboard_data(current_user: dict = Depends(auth.get_current_user)):
-    return _compute_metrics(current_user["id"])
+async def get_dashboard_data(
+    resolution: str = "trade",
+    points: int = DASHBOARD_MAX_POINTS,
+    if_none_match: str | None = Header(None),
+    current_user: dict = Depends(auth.get_current_user),
+):
+    """Dashboard payload, cached in Redis until the user's trades change.
+
+    The ETag names the Redis epoch and the user's dashboard version, so a
+    poll with an unchanged ``If-None-Match`` costs one Redis read and
+    returns 304, and an ETag from before a Redis flush never matches.
+    """
+    if resolution != "trade" and resolution not in rollups.RESOLUTIONS:
+        raise HTTPException(status_code=400, detail="Unknown resolution")
+    points = min(max(points, 3), DASHBOARD_MAX_POINTS)
+    user_id = current_user["id"]
+    variant = f"{resolution}:{points}"
+
+    state = await cache.get_dashboard_state(user_id)
+    if state is None:
+        # Redis is down: serve from the in-process aggregate, uncached
+        user_pnl = await pnl.get(user_id)
+        with DASHBOARD_SECONDS.labels(resolution).time():
+            return _metrics(user_pnl, resolution, points)
+
+    epoch, version = state
+    headers = {"ETag": f'"{epoch}-{user_id}-{version}-{variant}"', "Cache-Control": "private, no-cache"}
+    if if_none_match == headers["ETag"]:
+        return Response(status_code=304, headers=headers)
+    payload = await cache.get_dashboard(user_id, version, variant)
+    if payload is None:
+        user_pnl = await pnl.get(user_id, version)
+        with DASHBOARD_SECONDS.labels(resolution).time():
+            metrics = _metrics(user_pnl, resolution, points)
+        payload = json.dumps(metrics).encode()
+        await cache.set_dashboard(user_id, version, variant, payload)
+    return Response(content=payload, media_type="application/json", headers=headers)
@@ -0,0 +1,191 @@
+"""Per-user push stream of strategy logs, trade events and run status.
+
+Publishers append events to the user's ``LogRing``, which numbers them, and
+hand them to every open connection of that user.  A connection buffers at
+most ``EVENT_QUEUE_SIZE`` events; when a slow client lets it fill up, further
+events are not queued and the connection catches up from the ring instead,
+so memory per connection stays bounded.  A client that reconnects with the
+last sequence number it saw resumes where it left off, as long as the ring
+still holds the events in between.
+
+``GET /events`` serves the stream as Server-Sent Events, so the browser's
+``EventSource`` reconnects and sends ``Last-Event-ID`` by itself.
+"""
+import asyncio
+import json
+import os
+import threading
+
+from fastapi import APIRouter, Header, HTTPException
+from fastapi.responses import StreamingResponse
+
+from . import auth
+from .logs import EVENT_TYPES, LEVEL_NAMES, LogRing, record_fields, render
+
+# Events kept per user for clients that reconnect
+USER_EVENT_LOG_SIZE = int(os.getenv("USER_EVENT_LOG_SIZE", "5000"))
+# Events buffered per connection before it falls back to the ring
+EVENT_QUEUE_SIZE = int(os.getenv("EVENT_QUEUE_SIZE", "256"))
+# Seconds between keep-alive comments on an idle stream
+EVENT_KEEPALIVE_SECONDS = float(os.getenv("EVENT_KEEPALIVE_SECONDS", "15"))
+
+router = APIRouter()
+
+
+class _Subscriber:
+    def __init__(self):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=EVENT_QUEUE_SIZE)
+        # set when an event could not be queued; the reader then rereads the ring
+        self.lagged = False
+
+    def offer(self, event: dict):
+        if self.lagged:
+            return
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.lagged = True
+
+
+class EventHub:
+    def __init__(self):
+        self.rings: dict[int, LogRing] = {}
+        self.subscribers: dict[int, set[_Subscriber]] = {}
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._lock = threading.Lock()
+
+    def ring(self, user_id: int) -> LogRing:
+        ring = self.rings.get(user_id)
+        if ring is None:
+            with self._lock:
+                ring = self.rings.setdefault(user_id, LogRing(USER_EVENT_LOG_SIZE))
+        return ring
+
+    def publish(self, user_id: int | None, event: dict):
+        """Record ``event`` for ``user_id`` and push it to their connections.
+
+        Safe to call from worker threads as well as from the event loop.
+        """
+        if user_id is None:
+            return
+        ring = self.ring(user_id)
+        with self._lock:
+            # numbering and queueing under one lock keeps queues in order
+            event = {"seq": ring.next_seq, **event}
+            ring.append(event)
+            if not self.subscribers.get(user_id):
+                return
+            loop = self._loop
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            self._deliver(user_id, event)
+        elif loop is not None:
+            loop.call_soon_threadsafe(self._deliver, user_id, event)
+
+    def _deliver(self, user_id: int, event: dict):
+        for subscriber in self.subscribers.get(user_id, ()):
+            subscriber.offer(event)
+
+    async def stream(self, user_id: int, since: int | None = None):
+        """Yield ``(kind, event)`` from ``since`` on, forever.
+
+        ``kind`` is ``"event"``, ``"reset"`` when events were lost before
+        they could be sent, or ``"keepalive"`` after an idle period.
+        """
+        self._loop = asyncio.get_running_loop()
+        subscriber = _Subscriber()
+        ring = self.ring(user_id)
+        with self._lock:
+            self.subscribers.setdefault(user_id, set()).add(subscriber)
+        cursor = since
+        try:
+            while True:
+                # catch up from the ring, then follow the queue
+                subscriber.lagged = False
+                events, cursor, truncated = ring.read(cursor)
+                if truncated:
+                    yield "reset", {"seq": events[0]["seq"] if events else cursor}
+                for event in events:
+                    yield "event", event
+                while not subscriber.lagged:
+                    try:
+                        event = await asyncio.wait_for(
+                            subscriber.queue.get(), EVENT_KEEPALIVE_SECONDS
+                        )
+                    except asyncio.TimeoutError:
+                        yield "keepalive", None
+                        continue
+                    if event["seq"] < cursor:
+                        continue
+                    cursor = event["seq"] + 1
+                    yield "event", event
+                while not subscriber.queue.empty():
+                    subscriber.queue.get_nowait()
+        finally:
+            with self._lock:
+                subscribers = self.subscribers.get(user_id)
+                subscribers.discard(subscriber)
+                if not subscribers:
+                    del self.subscribers[user_id]
+
+
+HUB = EventHub()
+
+
+def _payload(event: dict) -> dict:
+    """Event as sent, with a structured record expanded and rendered."""
+    rec = event.get("record")
+    if rec is None:
+        return event
+    time_ms, kind, _ = rec
+    data = {key: value for key, value in event.items() if key != "record"}
+    data.update(
+        event=kind,
+        level=LEVEL_NAMES[EVENT_TYPES[kind][0]],
+        time=time_ms,
+        fields=record_fields(rec),
+        line=render(rec),
+    )
+    return data
+
+
+def _sse(kind: str, event: dict | None) -> str:
+    if kind == "keepalive":
+        return ": keepalive\n\n"
+    if kind == "reset":
+        return f"event: reset\ndata: {json.dumps(event)}\n\n"
+    event = _payload(event)
+    return f"id: {event['seq']}\nevent: {event['type']}\ndata: {json.dumps(event)}\n\n"
+
+
+@router.get("/events")
+async def stream_events(
+    token: str,
+    since: int | None = None,
+    last_event_id: str | None = Header(None),
+):
+    """Server-Sent Events of the user's logs, trades and strategy status.
+
+    ``token`` is passed in the query since ``EventSource`` cannot send an
+    ``Authorization`` header.  Without ``since`` or ``Last-Event-ID`` the
+    stream starts with every event still held.
+    """
+    user = await auth.get_current_user(token)
+    if last_event_id is not None:
+        try:
+            since = int(last_event_id) + 1
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid Last-Event-ID")
+
+    async def body():
+        async for kind, event in HUB.stream(user["id"], since):
+            yield _sse(kind, event)
+
+    return StreamingResponse(
+        body(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,88 @@
+"""Awaitable access to the synchronous python-binance client.
+
+Every call runs in a bounded thread pool so exchange round trips never block
+the event loop shared by the API handlers and the strategy tasks.
+"""
+import asyncio
+import functools
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from binance.client import Client
+from requests.adapters import HTTPAdapter
+
+from .metrics import EXCHANGE_ERRORS, EXCHANGE_SECONDS
+
+# Maximum number of exchange requests in flight at once
+EXCHANGE_WORKERS = int(os.getenv("EXCHANGE_WORKERS", "32"))
+# Optional base URL (e.g. http://127.0.0.1:8100/api) of a Binance compatible
+# server such as ``python -m app.fake_exchange``
+BINANCE_API_URL = os.getenv("BINANCE_API_URL")
+
+_executor = ThreadPoolExecutor(
+    max_workers=EXCHANGE_WORKERS, thread_name_prefix="exchange"
+)
+
+
+def create_client(api_key: str | None = None, api_secret: str | None = None) -> Client:
+    """Build a client, pointed at ``BINANCE_API_URL`` when it is set.
+
+    The construction-time ping is skipped since the first real request
+    reports connectivity problems just as well, and the session keeps up to
+    ``EXCHANGE_WORKERS`` connections alive so concurrent calls from the
+    thread pool reuse them instead of reconnecting.
+    """
+    client = Client(api_key, api_secret, ping=False)
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=EXCHANGE_WORKERS)
+    client.session.mount("https://", adapter)
+    client.session.mount("http://", adapter)
+    if BINANCE_API_URL:
+        client.API_URL = BINANCE_API_URL.rstrip("/")
+    return client
+
+
+async def run(func, *args, **kwargs):
+    """Run a blocking exchange call in the exchange thread pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _executor, functools.partial(func, *args, **kwargs)
+    )
+
+
+async def _timed(method: str, func, **params):
+    """``run`` recording latency and errors per method and symbol."""
+    symbol = params.get("symbol", "")
+    start = time.perf_counter()
+    try:
+        return await run(func, **params)
+    except Exception:
+        EXCHANGE_ERRORS.labels(method, symbol).inc()
+        raise
+    finally:
+        EXCHANGE_SECONDS.labels(method, symbol).observe(time.perf_counter() - start)
+
+
+class AsyncExchange:
+    """Awaitable wrapper around a python-binance ``Client``."""
+
+    def __init__(self, client: Client):
+        self.client = client
+
+    async def get_klines(self, **params):
+        return await _timed("get_klines", self.client.get_klines, **params)
+
+    async def create_order(self, **params):
+        return await _timed("create_order", self.client.create_order, **params)
+
+    async def get_symbol_info(self, symbol: str):
+        return await run(self.client.get_symbol_info, symbol)
+
+    async def get_symbol_ticker(self, **params):
+        return await run(self.client.get_symbol_ticker, **params)
+
+    async def get_account(self, **params):
+        return await run(self.client.get_account, **params)
+
+    async def get_server_time(self):
+        return await run(self.client.get_server_time)
@@ -0,0 +1,222 @@
+"""Process-wide cache of exchange symbol filters.
+
+All symbols are loaded with a single bulk ``exchangeInfo`` request and kept
+fresh by a background task, so order amounts can be validated and rounded to
+the exchange's precision locally instead of finding out from a rejected
+order.  Symbols missing from the cache (e.g. newly listed ones) trigger a
+reload, at most once per ``EXCHANGE_INFO_RETRY_SECONDS``.
+"""
+import asyncio
+import os
+import threading
+import time
+from dataclasses import dataclass
+from decimal import ROUND_DOWN, ROUND_HALF_UP, Decimal
+
+from .exchange import create_client, run
+
+# How often the cached filters are reloaded in the background
+EXCHANGE_INFO_REFRESH_SECONDS = float(os.getenv("EXCHANGE_INFO_REFRESH_SECONDS", "3600"))
+# Minimum delay between reloads triggered by failures or unknown symbols
+EXCHANGE_INFO_RETRY_SECONDS = float(os.getenv("EXCHANGE_INFO_RETRY_SECONDS", "60"))
+
+
+def _decimal(value) -> Decimal:
+    return Decimal(str(value)) if value not in (None, "") else Decimal(0)
+
+
+def _to_step(value: float, step: Decimal, rounding) -> float:
+    if not step:
+        return float(value)
+    return float((Decimal(str(value)) / step).to_integral_value(rounding) * step)
+
+
+@dataclass(frozen=True)
+class SymbolFilters:
+    """Trading rules of one symbol taken from its ``exchangeInfo`` filters.
+
+    Zero means the corresponding limit is not enforced.
+    """
+
+    symbol: str
+    status: str = "TRADING"
+    base_asset: str = ""
+    quote_asset: str = ""
+    # PRICE_FILTER
+    tick_size: Decimal = Decimal(0)
+    min_price: float = 0.0
+    max_price: float = 0.0
+    # LOT_SIZE, and MARKET_LOT_SIZE when the symbol defines one
+    step_size: Decimal = Decimal(0)
+    min_qty: float = 0.0
+    max_qty: float = 0.0
+    market_step_size: Decimal = Decimal(0)
+    market_min_qty: float = 0.0
+    market_max_qty: float = 0.0
+    # NOTIONAL, or the legacy MIN_NOTIONAL, as applied to market orders
+    min_notional: float = 0.0
+    max_notional: float = 0.0
+
+    @classmethod
+    def from_symbol_info(cls, info: dict) -> "SymbolFilters":
+        fields = {
+            "symbol": info["symbol"],
+            "status": info.get("status", "TRADING"),
+            "base_asset": info.get("baseAsset", ""),
+            "quote_asset": info.get("quoteAsset", ""),
+        }
+        for f in info.get("filters", []):
+            kind = f.get("filterType")
+            if kind == "PRICE_FILTER":
+                fields["tick_size"] = _decimal(f.get("tickSize")).normalize()
+                fields["min_price"] = float(f.get("minPrice", 0))
+                fields["max_price"] = float(f.get("maxPrice", 0))
+            elif kind == "LOT_SIZE":
+                fields["step_size"] = _decimal(f.get("stepSize")).normalize()
+                fields["min_qty"] = float(f.get("minQty", 0))
+                fields["max_qty"] = float(f.get("maxQty", 0))
+            elif kind == "MARKET_LOT_SIZE":
+                fields["market_step_size"] = _decimal(f.get("stepSize")).normalize()
+                fields["market_min_qty"] = float(f.get("minQty", 0))
+                fields["market_max_qty"] = float(f.get("maxQty", 0))
+            elif kind == "NOTIONAL":
+                if f.get("applyMinToMarket", True):
+                    fields["min_notional"] = float(f.get("minNotional", 0))
+                if f.get("applyMaxToMarket", False):
+                    fields["max_notional"] = float(f.get("maxNotional", 0))
+            elif kind == "MIN_NOTIONAL" and f.get("applyToMarket", True):
+                fields["min_notional"] = float(f.get("minNotional", 0))
+        return cls(**fields)
+
+    def _market_lot(self) -> tuple[Decimal, float, float]:
+        step = self.market_step_size or self.step_size
+        return (
+            step,
+            max(self.min_qty, self.market_min_qty),
+            min(q for q in (self.max_qty, self.market_max_qty, float("inf")) if q),
+        )
+
+    def round_quantity(self, quantity: float, market: bool = True) -> float:
+        """Round a base quantity down to the allowed step size."""
+        step = self._market_lot()[0] if market else self.step_size
+        return _to_step(quantity, step, ROUND_DOWN)
+
+    def round_price(self, price: float) -> float:
+        """Round a price to the nearest tick."""
+        return _to_step(price, self.tick_size, ROUND_HALF_UP)
+
+    def validate(
+        self,
+        quantity: float | None = None,
+        quote_quantity: float | None = None,
+        price: float | None = None,
+        market: bool = True,
+    ):
+        """Raise ``ValueError`` if the exchange would reject the order.
+
+        ``quantity`` must already be rounded.  The notional is checked from
+        ``quote_quantity`` or, when ``price`` is given, ``quantity * price``.
+        """
+        if self.status != "TRADING":
+            raise ValueError(f"{self.symbol} is not trading ({self.status})")
+        if quantity is not None:
+            step, min_qty, max_qty = self._market_lot() if market else (
+                self.step_size, self.min_qty, self.max_qty or float("inf")
+            )
+            if quantity < min_qty:
+                raise ValueError(f"Quantity {quantity} below {self.symbol} minimum {min_qty}")
+            if quantity > max_qty:
+                raise ValueError(f"Quantity {quantity} above {self.symbol} maximum {max_qty}")
+            if step and _to_step(quantity, step, ROUND_DOWN) != quantity:
+                raise ValueError(f"Quantity {quantity} is not a multiple of {step}")
+        if price is not None and not market:
+            if price < self.min_price or (self.max_price and price > self.max_price):
+                raise ValueError(f"Price {price} outside the {self.symbol} price limits")
+        notional = quote_quantity
+        if notional is None and quantity is not None and price is not None:
+            notional = quantity * price
+        if notional is not None:
+            if notional < self.min_notional:
+                raise ValueError(
+                    f"Order value {notional} below {self.symbol} minimum {self.min_notional}"
+                )
+            if self.max_notional and notional > self.max_notional:
+                raise ValueError(
+                    f"Order value {notional} above {self.symbol} maximum {self.max_notional}"
+                )
+
+
+class ExchangeInfoCache:
+    """Filters of every symbol, replaced wholesale on each reload."""
+
+    def __init__(self):
+        self.symbols: dict[str, SymbolFilters] = {}
+        self.loaded_at = 0.0
+        self._attempted_at = float("-inf")
+        self._lock = threading.Lock()
+        self._task: asyncio.Task | None = None
+
+    def load(self, client=None):
+        """Fetch ``exchangeInfo`` for all symbols (blocking)."""
+        client = client or create_client()
+        info = client.get_exchange_info()
+        self.symbols = {
+            s["symbol"]: SymbolFilters.from_symbol_info(s) for s in info.get("symbols", [])
+        }
+        self.loaded_at = time.monotonic()
+
+    def get(self, symbol: str, client=None) -> SymbolFilters | None:
+        """Cached filters of ``symbol``, reloading once if it is unknown.
+
+        Returns ``None`` when the filters cannot be loaded, in which case
+        callers fall back to letting the exchange validate the order.
+        """
+        symbol = symbol.upper()
+        filters = self.symbols.get(symbol)
+        if filters is not None:
+            return filters
+        with self._lock:
+            filters = self.symbols.get(symbol)
+            if filters is None and time.monotonic() - self._attempted_at >= EXCHANGE_INFO_RETRY_SECONDS:
+                self._attempted_at = time.monotonic()
+                try:
+                    self.load(client)
+                except Exception as exc:
+                    print(f"Failed to load exchange info: {exc}")
+                filters = self.symbols.get(symbol)
+        return filters
+
+    async def filters(self, symbol: str, client=None) -> SymbolFilters | None:
+        """Awaitable ``get`` that only leaves the event loop on a cache miss."""
+        filters = self.symbols.get(symbol.upper())
+        if filters is not None:
+            return filters
+        return await run(self.get, symbol, client)
+
+    async def _refresh(self):
+        while True:
+            try:
+                await run(self.load)
+                delay = EXCHANGE_INFO_REFRESH_SECONDS
+            except Exception as exc:
+                print(f"Failed to refresh exchange info: {exc}")
+                delay = EXCHANGE_INFO_RETRY_SECONDS
+            await asyncio.sleep(delay)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._refresh())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+
+EXCHANGE_INFO = ExchangeInfoCache()
+
+
+def min_notional(symbol: str, client=None) -> float:
+    """Smallest quote amount accepted for a market order on ``symbol``."""
+    filters = EXCHANGE_INFO.get(symbol, client)
+    return filters.min_notional if filters else 0.0
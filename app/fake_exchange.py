@@ -0,0 +1,220 @@
+"""Minimal Binance compatible REST server for local development.
+
+Serves deterministic synthetic candles and fills market orders instantly so
+strategies can run without network access or real funds, and so event loop
+lag can be measured under many concurrent tasks.  Start it with::
+
+    python -m app.fake_exchange --port 8100 --latency 0.05
+
+and point the API at it with ``BINANCE_API_URL=http://127.0.0.1:8100/api``.
+"""
+import argparse
+import json
+import math
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib import parse
+
+from .scheduler import INTERVAL_MS
+
+# Commission charged on every fill, matching Binance's base spot fee
+FEE_RATE = 0.001
+
+
+def _base_price(symbol: str) -> float:
+    return 10 + sum(ord(c) for c in symbol) % 90
+
+
+def price_at(symbol: str, ts_ms: int) -> float:
+    """Deterministic synthetic price of ``symbol`` at ``ts_ms``."""
+    x = ts_ms / 60_000
+    return _base_price(symbol) * (
+        1 + 0.03 * math.sin(x / 240) + 0.01 * math.sin(x / 17) + 0.002 * math.sin(x)
+    )
+
+
+def klines(
+    symbol: str,
+    interval: str,
+    limit: int,
+    start_ms: int | None = None,
+    end_ms: int | None = None,
+) -> list[list]:
+    period = INTERVAL_MS[interval]
+    now_ms = int(time.time() * 1000)
+    last_open = (min(end_ms or now_ms, now_ms) // period) * period
+    first_open = last_open - (limit - 1) * period
+    if start_ms is not None:
+        first_open = -(-start_ms // period) * period
+        last_open = min(last_open, first_open + (limit - 1) * period)
+    rows = []
+    for open_time in range(first_open, last_open + 1, period):
+        close_time = open_time + period - 1
+        open_ = price_at(symbol, open_time)
+        close = price_at(symbol, min(close_time, now_ms))
+        wiggle = abs(close - open_) * 0.5 + open_ * 0.0005
+        rows.append([
+            open_time, f"{open_:.8f}", f"{max(open_, close) + wiggle:.8f}",
+            f"{min(open_, close) - wiggle:.8f}", f"{close:.8f}", "100.0",
+            close_time, f"{100 * close:.8f}", 100, "50.0", f"{50 * close:.8f}", "0",
+        ])
+    return rows
+
+
+def symbol_info(symbol: str) -> dict:
+    return {
+        "symbol": symbol,
+        "status": "TRADING",
+        "baseAsset": symbol[:-4],
+        "quoteAsset": symbol[-4:],
+        "filters": [
+            {"filterType": "PRICE_FILTER", "minPrice": "0.00010000",
+             "maxPrice": "1000000.00000000", "tickSize": "0.00010000"},
+            {"filterType": "LOT_SIZE", "minQty": "0.00010000",
+             "maxQty": "900000.00000000", "stepSize": "0.00010000"},
+            {"filterType": "NOTIONAL", "minNotional": "5.00000000",
+             "applyMinToMarket": True, "maxNotional": "9000000.00000000",
+             "applyMaxToMarket": False, "avgPriceMins": 5},
+        ],
+    }
+
+
+SYMBOLS = ["BTCUSDT", "XRPUSDT", "DOGEUSDT", "SOLUSDT", "ETHUSDT", "BNBUSDT"]
+
+
+class FakeExchangeHandler(BaseHTTPRequestHandler):
+    # keep-alive, so the client's pooled connections are reused, without
+    # Nagle holding back the body written after the headers
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    latency = 0.0
+    order_id = 0
+
+    def log_message(self, format, *args):
+        pass
+
+    def _params(self) -> dict:
+        url = parse.urlparse(self.path)
+        params = dict(parse.parse_qsl(url.query))
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            params.update(parse.parse_qsl(self.rfile.read(length).decode()))
+        return params
+
+    def _send(self, payload, status: int = 200):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        self._handle("GET")
+
+    def do_POST(self):
+        self._handle("POST")
+
+    def _handle(self, method: str):
+        if self.latency:
+            time.sleep(self.latency)
+        path = parse.urlparse(self.path).path
+        params = self._params()
+        now_ms = int(time.time() * 1000)
+        if path == "/api/v3/ping":
+            return self._send({})
+        if path == "/api/v3/time":
+            return self._send({"serverTime": now_ms})
+        if path == "/api/v3/klines":
+            return self._send(klines(
+                params["symbol"], params["interval"], int(params.get("limit", 500)),
+                int(params["startTime"]) if "startTime" in params else None,
+                int(params["endTime"]) if "endTime" in params else None,
+            ))
+        if path == "/api/v3/exchangeInfo":
+            symbols = [params["symbol"]] if "symbol" in params else SYMBOLS
+            return self._send({
+                "serverTime": now_ms, "symbols": [symbol_info(s) for s in symbols]
+            })
+        if path == "/api/v3/ticker/price":
+            symbol = params["symbol"]
+            return self._send({"symbol": symbol, "price": f"{price_at(symbol, now_ms):.8f}"})
+        if path == "/api/v3/ticker/24hr":
+            symbol = params["symbol"]
+            last = price_at(symbol, now_ms)
+            day = [price_at(symbol, now_ms - i * 3_600_000) for i in range(25)]
+            return self._send({
+                "symbol": symbol,
+                "lastPrice": f"{last:.8f}",
+                "openPrice": f"{day[-1]:.8f}",
+                "highPrice": f"{max(day):.8f}",
+                "lowPrice": f"{min(day):.8f}",
+                "priceChange": f"{last - day[-1]:.8f}",
+                "priceChangePercent": f"{(last / day[-1] - 1) * 100:.3f}",
+                "volume": "2400.0",
+                "quoteVolume": f"{2400 * last:.8f}",
+                "closeTime": now_ms,
+            })
+        if path == "/api/v3/account":
+            return self._send({"balances": [
+                {"asset": "USDT", "free": "10000.00000000", "locked": "0.00000000"},
+                {"asset": "BTC", "free": "0.10000000", "locked": "0.00000000"},
+            ]})
+        if path == "/api/v3/order" and method == "POST":
+            return self._send(self._fill(params, now_ms))
+        self._send({"code": -1, "msg": f"Unknown endpoint {path}"}, status=404)
+
+    def _fill(self, params: dict, now_ms: int) -> dict:
+        symbol = params["symbol"]
+        price = price_at(symbol, now_ms)
+        if "quantity" in params:
+            qty = float(params["quantity"])
+        else:
+            qty = float(params["quoteOrderQty"]) / price
+        FakeExchangeHandler.order_id += 1
+        return {
+            "symbol": symbol,
+            "orderId": FakeExchangeHandler.order_id,
+            "transactTime": now_ms,
+            "side": params["side"],
+            "type": params["type"],
+            "status": "FILLED",
+            "executedQty": f"{qty:.8f}",
+            "cummulativeQuoteQty": f"{qty * price:.8f}",
+            "fills": [{
+                "price": f"{price:.8f}",
+                "qty": f"{qty:.8f}",
+                "commission": f"{qty * price * FEE_RATE:.8f}",
+                "commissionAsset": "USDT",
+            }],
+        }
+
+
+class FakeExchangeServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # the default backlog of 5 resets connections under many concurrent clients
+    request_queue_size = 1024
+
+
+def make_server(
+    host: str = "127.0.0.1", port: int = 8100, latency: float = 0.0
+) -> FakeExchangeServer:
+    """Bound but not yet serving server; port 0 picks a free port."""
+    FakeExchangeHandler.latency = latency
+    return FakeExchangeServer((host, port), FakeExchangeHandler)
+
+
+def serve(host: str = "127.0.0.1", port: int = 8100, latency: float = 0.0):
+    server = make_server(host, port, latency)
+    print(f"Fake exchange listening on http://{host}:{server.server_port}/api")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--latency", type=float, default=0.0,
+                        help="seconds added to every response")
+    args = parser.parse_args()
+    serve(args.host, args.port, args.latency)
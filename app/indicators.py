@@ -0,0 +1,284 @@
+"""Streaming indicators updated in constant time per candle.
+
+Each indicator keeps the state of the closed candles it has seen and evaluates
+the newest (possibly still forming) candle on top of it without committing it.
+Feeding the same ``open_time`` again revises that candle; a new ``open_time``
+commits the previous one.  Values match the pandas helpers in
+``app/strategies.py`` for the same input series.  ``IndicatorGraph`` shares
+these indicators between every strategy reading the same candles.
+"""
+from collections import deque
+import math
+
+import numpy as np
+
+NAN = float("nan")
+
+
+class StreamingIndicator:
+    """Base class handling commit/revision of the newest candle."""
+
+    # candle columns passed to ``update`` after the open time
+    inputs: tuple[str, ...] = ("close",)
+
+    def __init__(self):
+        self._open_time = None
+        self._pending = None
+        self.value = NAN
+        self.previous = NAN
+
+    def update(self, open_time: int, *values: float):
+        """Add or revise the candle at ``open_time`` and return the new value."""
+        if open_time != self._open_time:
+            if self._pending is not None:
+                self._push(*self._pending)
+                self.previous = self.value
+            self._open_time = open_time
+        self._pending = values
+        self.value = self._peek(*values)
+        return self.value
+
+    def _peek(self, *values: float):
+        raise NotImplementedError
+
+    def _push(self, *values: float):
+        raise NotImplementedError
+
+
+class EMA(StreamingIndicator):
+    """Matches ``series.ewm(span=length, adjust=False).mean()``."""
+
+    def __init__(self, length: int, source: str = "close"):
+        super().__init__()
+        self.inputs = (source,)
+        self.alpha = 2 / (length + 1)
+        self._last = None
+
+    def _peek(self, x: float) -> float:
+        if self._last is None:
+            return x
+        return self._last + self.alpha * (x - self._last)
+
+    def _push(self, x: float):
+        self._last = self._peek(x)
+
+
+class RollingStats(StreamingIndicator):
+    """Rolling mean and sample std (``rolling(length).mean()/.std()``).
+
+    Uses Welford's algorithm over the last ``length - 1`` closed candles so the
+    forming candle can be folded in without touching the window.
+    """
+
+    def __init__(self, length: int, source: str = "close"):
+        super().__init__()
+        self.inputs = (source,)
+        self.length = length
+        self.value = (NAN, NAN)
+        self.previous = (NAN, NAN)
+        self._window: deque[float] = deque()
+        self._mean = 0.0
+        self._m2 = 0.0
+
+    def _peek(self, x: float) -> tuple[float, float]:
+        n = len(self._window) + 1
+        if n < self.length:
+            return NAN, NAN
+        delta = x - self._mean
+        mean = self._mean + delta / n
+        m2 = self._m2 + delta * (x - mean)
+        std = math.sqrt(max(m2, 0.0) / (n - 1)) if n > 1 else NAN
+        return mean, std
+
+    def _push(self, x: float):
+        self._window.append(x)
+        n = len(self._window)
+        delta = x - self._mean
+        self._mean += delta / n
+        self._m2 += delta * (x - self._mean)
+        if n > self.length - 1:
+            y = self._window.popleft()
+            n -= 1
+            if n == 0:
+                self._mean = self._m2 = 0.0
+            else:
+                delta = y - self._mean
+                self._mean -= delta / n
+                self._m2 = max(self._m2 - delta * (y - self._mean), 0.0)
+
+
+class ATR(StreamingIndicator):
+    """Average true range, as returned by ``atr``."""
+
+    inputs = ("high", "low", "close")
+
+    def __init__(self, length: int):
+        super().__init__()
+        self._ema = EMA(length)
+        self._prev_close = None
+
+    def _true_range(self, high: float, low: float) -> float:
+        if self._prev_close is None:
+            return high - low
+        return max(
+            high - low, abs(high - self._prev_close), abs(low - self._prev_close)
+        )
+
+    def _peek(self, high: float, low: float, close: float) -> float:
+        return self._ema._peek(self._true_range(high, low))
+
+    def _push(self, high: float, low: float, close: float):
+        self._ema._push(self._true_range(high, low))
+        self._prev_close = close
+
+
+class RollingMax(StreamingIndicator):
+    """Matches ``series.rolling(length).max()`` using a monotonic deque."""
+
+    def __init__(self, length: int, source: str = "high"):
+        super().__init__()
+        self.inputs = (source,)
+        self.length = length
+        self._count = 0
+        # (index, value) pairs of the closed window, values decreasing
+        self._deque: deque[tuple[int, float]] = deque()
+
+    def _better(self, a: float, b: float) -> bool:
+        return a >= b
+
+    def _peek(self, x: float) -> float:
+        if self._count + 1 < self.length:
+            return NAN
+        if self._deque and self._better(self._deque[0][1], x):
+            return self._deque[0][1]
+        return x
+
+    def _push(self, x: float):
+        while self._deque and self._better(x, self._deque[-1][1]):
+            self._deque.pop()
+        self._deque.append((self._count, x))
+        self._count += 1
+        # keep the last length - 1 closed candles for the next forming one
+        while self._deque and self._deque[0][0] <= self._count - self.length:
+            self._deque.popleft()
+
+
+class RollingMin(RollingMax):
+    """Matches ``series.rolling(length).min()`` using a monotonic deque."""
+
+    def __init__(self, length: int, source: str = "low"):
+        super().__init__(length, source)
+
+    def _better(self, a: float, b: float) -> bool:
+        return a <= b
+
+
+class Derived:
+    """Stateless node combining the values of other nodes."""
+
+    def __init__(self, combine, *parents):
+        self.combine = combine
+        self.parents = parents
+
+    @property
+    def value(self):
+        return self.combine(*(p.value for p in self.parents))
+
+    @property
+    def previous(self):
+        return self.combine(*(p.previous for p in self.parents))
+
+
+def _bands(mult: float):
+    return lambda center, width: (center - mult * width, center + mult * width)
+
+
+class IndicatorGraph:
+    """Indicators shared by every strategy reading one candle stream.
+
+    Nodes are keyed by kind and parameters, so every consumer asking for
+    ``ema(200)`` gets the same node and it is updated once per candle.
+    Composite indicators are ``Derived`` nodes over shared stateful ones, e.g.
+    Bollinger Bands with different multipliers share one rolling mean/std.
+    Only candles at or after the newest one already seen are fed on each
+    ``update``, so the work per candle does not grow with the lookback.
+    """
+
+    def __init__(self, history=None):
+        # callable returning the ``Candles`` seen so far, used to warm up
+        # nodes requested after the stream has started
+        self._history = history
+        self._nodes: dict[tuple, StreamingIndicator | Derived] = {}
+        self._stateful: list[StreamingIndicator] = []
+        self._last_open_time = None
+
+    @staticmethod
+    def _sources(candles, row: int) -> dict[str, float]:
+        high = float(candles.high[row])
+        low = float(candles.low[row])
+        close = float(candles.close[row])
+        return {
+            "high": high,
+            "low": low,
+            "close": close,
+            "tp": (high + low + close) / 3,
+            "range": abs(high - low),
+        }
+
+    def _start(self, candles) -> int:
+        if self._last_open_time is None:
+            return 0
+        return int(np.searchsorted(candles.open_time, self._last_open_time))
+
+    def _feed(self, nodes, candles, start: int, stop: int):
+        for row in range(start, stop):
+            open_time = int(candles.open_time[row])
+            sources = self._sources(candles, row)
+            for node in nodes:
+                node.update(open_time, *(sources[s] for s in node.inputs))
+
+    def update(self, candles):
+        start = self._start(candles)
+        self._feed(self._stateful, candles, start, len(candles))
+        if len(candles) > start:
+            self._last_open_time = int(candles.open_time[-1])
+
+    def _node(self, key: tuple, build):
+        node = self._nodes.get(key)
+        if node is None:
+            node = self._nodes[key] = build()
+            if isinstance(node, StreamingIndicator):
+                self._stateful.append(node)
+                if self._history is not None and self._last_open_time is not None:
+                    history = self._history()
+                    stop = int(np.searchsorted(history.open_time, self._last_open_time, "right"))
+                    self._feed((node,), history, 0, stop)
+        return node
+
+    def ema(self, length: int, source: str = "close") -> EMA:
+        return self._node(("ema", source, length), lambda: EMA(length, source))
+
+    def stats(self, length: int, source: str = "close") -> RollingStats:
+        return self._node(("stats", source, length), lambda: RollingStats(length, source))
+
+    def atr(self, length: int) -> ATR:
+        return self._node(("atr", length), lambda: ATR(length))
+
+    def highest(self, length: int, source: str = "high") -> RollingMax:
+        return self._node(("max", source, length), lambda: RollingMax(length, source))
+
+    def lowest(self, length: int, source: str = "low") -> RollingMin:
+        return self._node(("min", source, length), lambda: RollingMin(length, source))
+
+    def bollinger(self, length: int, mult: float) -> Derived:
+        """Lower and upper bands, as returned by ``bollinger_bands``."""
+        stats = self.stats(length)
+        return self._node(
+            ("bb", length, mult), lambda: Derived(lambda s: _bands(mult)(*s), stats)
+        )
+
+    def keltner(self, length: int, mult: float) -> Derived:
+        """Lower and upper channels, as returned by ``keltner_channels``."""
+        tp = self.ema(length, "tp")
+        tr = self.ema(length, "range")
+        return self._node(("kc", length, mult), lambda: Derived(_bands(mult), tp, tr))
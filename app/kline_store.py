@@ -0,0 +1,210 @@
+"""Local append-only kline history, one file per symbol/interval.
+
+Candles are stored as fixed-width little-endian records and read through
+``np.memmap``, so any time range can be sliced from years of 1m data without
+network I/O and without loading the file into memory.  The sorted
+``open_time`` column doubles as the index: lookups are positional while the
+history has no gaps and fall back to a binary search otherwise.
+"""
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+from fastapi import APIRouter, Depends, HTTPException
+
+from . import auth, exchange_info, scheduler
+from .candles import Candles
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX platforms
+    fcntl = None
+
+KLINE_STORE_DIR = os.getenv("KLINE_STORE_DIR", "data/klines")
+# Most candles fetched to close the gap between the stored history and now
+# when a feed starts; older gaps are left for ``gaps()`` to report
+KLINE_BACKFILL_LIMIT = int(os.getenv("KLINE_BACKFILL_LIMIT", "10000"))
+# Most stores (and their memory maps) kept open; the least recently used go first
+KLINE_STORE_CACHE_SIZE = int(os.getenv("KLINE_STORE_CACHE_SIZE", "64"))
+# Most candles returned by one ``/klines`` request
+KLINES_MAX_LIMIT = int(os.getenv("KLINES_MAX_LIMIT", "1000"))
+
+RECORD = np.dtype([
+    ("open_time", "<i8"),
+    ("close_time", "<i8"),
+    ("open", "<f8"),
+    ("high", "<f8"),
+    ("low", "<f8"),
+    ("close", "<f8"),
+    ("volume", "<f8"),
+])
+
+router = APIRouter()
+
+
+class KlineStore:
+    """Append-only on-disk candles for one symbol/interval."""
+
+    def __init__(self, symbol: str, interval: str, root: str = KLINE_STORE_DIR):
+        self.symbol = symbol
+        self.interval = interval
+        self.interval_ms = scheduler.interval_ms(interval)
+        self.path = os.path.join(root, f"{symbol}_{interval}.klines")
+        self._map = None
+        self._map_rows = -1
+        self._gapless_rows = -1
+
+    def __len__(self) -> int:
+        try:
+            return os.path.getsize(self.path) // RECORD.itemsize
+        except FileNotFoundError:
+            return 0
+
+    def records(self) -> np.ndarray:
+        """Memory-mapped view of every stored record."""
+        rows = len(self)
+        if rows != self._map_rows:
+            if rows:
+                self._map = np.memmap(self.path, dtype=RECORD, mode="r", shape=(rows,))
+            else:
+                self._map = np.zeros(0, dtype=RECORD)
+            self._map_rows = rows
+        return self._map
+
+    @property
+    def last_open_time(self) -> int | None:
+        records = self.records()
+        return int(records["open_time"][-1]) if len(records) else None
+
+    def append(self, klines: list[list]) -> int:
+        """Append closed klines newer than the stored history.
+
+        Returns the number of candles written.
+        """
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path, "ab") as fh:
+            if fcntl:
+                fcntl.flock(fh, fcntl.LOCK_EX)
+            last = self.last_open_time
+            rows = [
+                (int(k[0]), int(k[6]), float(k[1]), float(k[2]), float(k[3]),
+                 float(k[4]), float(k[5]))
+                for k in klines
+                if last is None or int(k[0]) > last
+            ]
+            if not rows:
+                return 0
+            if last is not None and rows[0][0] > last + self.interval_ms:
+                print(
+                    f"Kline store {self.symbol} {self.interval}: gap after {last}"
+                )
+            fh.write(np.array(rows, dtype=RECORD).tobytes())
+        return len(rows)
+
+    def _is_gapless(self, records: np.ndarray) -> bool:
+        if self._gapless_rows != len(records):
+            open_time = records["open_time"]
+            span = (open_time[-1] - open_time[0]) if len(records) else 0
+            gapless = span == (len(records) - 1) * self.interval_ms
+            self._gapless_rows = len(records) if gapless else -1
+        return self._gapless_rows == len(records)
+
+    def locate(self, open_time: int) -> int:
+        """Index of the first record with ``open_time`` at or after the given one."""
+        records = self.records()
+        if not len(records):
+            return 0
+        if self._is_gapless(records):
+            first = int(records["open_time"][0])
+            steps = -(-(open_time - first) // self.interval_ms)
+            return min(max(steps, 0), len(records))
+        return int(np.searchsorted(records["open_time"], open_time))
+
+    def read(self, start_ms: int | None = None, end_ms: int | None = None) -> Candles:
+        """Zero-copy views of the candles opened within ``[start_ms, end_ms)``."""
+        records = self.records()
+        lo = self.locate(start_ms) if start_ms is not None else 0
+        hi = self.locate(end_ms) if end_ms is not None else len(records)
+        window = records[lo:hi]
+        return Candles(**{name: window[name] for name in RECORD.names})
+
+    def gaps(self) -> list[tuple[int, int]]:
+        """Missing ``(from_open_time, to_open_time)`` ranges, both exclusive."""
+        open_time = self.records()["open_time"]
+        breaks = np.nonzero(np.diff(open_time) != self.interval_ms)[0]
+        return [(int(open_time[i]), int(open_time[i + 1])) for i in breaks]
+
+
+STORES: OrderedDict[tuple[str, str], KlineStore] = OrderedDict()
+_stores_lock = threading.Lock()
+
+
+def get_store(symbol: str, interval: str) -> KlineStore:
+    """Shared store of a symbol/interval, evicting the least recently used.
+
+    An evicted store stays valid for whoever still holds it; appends lock the
+    file, so a second instance for the same file is harmless.
+    """
+    key = (symbol.upper(), interval)
+    with _stores_lock:
+        store = STORES.get(key)
+        if store is None:
+            store = STORES[key] = KlineStore(*key)
+            while len(STORES) > KLINE_STORE_CACHE_SIZE:
+                STORES.popitem(last=False)
+        else:
+            STORES.move_to_end(key)
+    return store
+
+
+async def backfill(exchange, store: KlineStore, now_ms: int) -> int:
+    """Extend the store with closed candles up to ``now_ms``.
+
+    Starts after the newest stored candle (or ``KLINE_BACKFILL_LIMIT`` candles
+    back when that is further away) and pages through the exchange.
+    """
+    oldest = (now_ms // store.interval_ms - KLINE_BACKFILL_LIMIT) * store.interval_ms
+    last = store.last_open_time
+    start = max(last + store.interval_ms, oldest) if last is not None else oldest
+    written = 0
+    while start < now_ms:
+        klines = await exchange.get_klines(
+            symbol=store.symbol, interval=store.interval, startTime=start, limit=1000
+        )
+        closed = [k for k in klines if k[6] < now_ms]
+        if not closed:
+            break
+        written += store.append(closed)
+        start = int(closed[-1][0]) + store.interval_ms
+    return written
+
+
+@router.get("/klines/{symbol}")
+def get_klines(
+    symbol: str,
+    interval: str = "1h",
+    start: int | None = None,
+    end: int | None = None,
+    limit: int = 500,
+    current_user: dict = Depends(auth.get_current_user),
+):
+    """Return stored candles as ``[open_time, open, high, low, close, volume]`` rows.
+
+    Only the newest ``limit`` candles of the range are returned, and never
+    more than ``KLINES_MAX_LIMIT``.
+    """
+    if interval not in scheduler.INTERVAL_MS:
+        raise HTTPException(status_code=400, detail=f"Unsupported kline interval: {interval}")
+    if exchange_info.EXCHANGE_INFO.get(symbol) is None:
+        raise HTTPException(status_code=404, detail=f"Unknown symbol: {symbol}")
+    limit = min(max(limit, 0), KLINES_MAX_LIMIT)
+    store = get_store(symbol, interval)
+    candles = store.read(start, end)
+    first = max(len(candles) - limit, 0)
+    columns = (candles.open, candles.high, candles.low, candles.close, candles.volume)
+    rows = [
+        [int(candles.open_time[i]), *(float(c[i]) for c in columns)]
+        for i in range(first, len(candles))
+    ]
+    return {"symbol": symbol.upper(), "interval": interval, "klines": rows}
@@ -0,0 +1,387 @@
+"""Durable archive of strategy logs for history queries.
+
+Log records are appended to numbered segments under ``LOG_ARCHIVE_DIR``.  A
+segment is a data file of JSON lines plus an index of fixed-width rows
+(sequence number, time, user, strategy, log type and the position of the
+line).  Queries map the indexes with ``np.memmap``, narrow each segment to
+the requested time range by binary search and filter users and strategies
+with vectorised comparisons.  Only the lines actually returned are read,
+through ``mmap``, and parsed.
+
+Logging calls only queue a record.  A single background thread writes them
+in batches, so the event loop never waits on the disk.  A segment is closed
+after ``LOG_SEGMENT_RECORDS`` rows, and closed segments whose newest line is
+older than ``LOG_RETENTION_DAYS`` are deleted.
+"""
+import json
+import mmap
+import os
+import queue
+import threading
+import time
+
+import numpy as np
+from fastapi import APIRouter, Depends, HTTPException
+
+from . import auth
+from .logs import EVENT_TYPES, LEVEL_NAMES, plain, record_fields, render
+
+LOG_ARCHIVE_DIR = os.getenv("LOG_ARCHIVE_DIR", "data/logs")
+# Rows per segment before a new one is started
+LOG_SEGMENT_RECORDS = int(os.getenv("LOG_SEGMENT_RECORDS", "1000000"))
+LOG_RETENTION_DAYS = float(os.getenv("LOG_RETENTION_DAYS", "30"))
+# Records waiting for the writer before new ones are dropped
+LOG_ARCHIVE_QUEUE_SIZE = int(os.getenv("LOG_ARCHIVE_QUEUE_SIZE", "100000"))
+# Seconds the writer collects records before writing them out
+LOG_ARCHIVE_FLUSH_SECONDS = float(os.getenv("LOG_ARCHIVE_FLUSH_SECONDS", "0.5"))
+# Most lines returned by one history request
+LOG_HISTORY_MAX_LIMIT = int(os.getenv("LOG_HISTORY_MAX_LIMIT", "1000"))
+
+LOG_TYPES = ("detail", "trade")
+
+INDEX = np.dtype([
+    ("seq", "<i8"),
+    ("time", "<i8"),
+    ("user_id", "<i8"),
+    ("strategy", "S32"),
+    ("log_type", "u1"),
+    ("offset", "<i8"),
+    ("length", "<u4"),
+])
+
+router = APIRouter()
+
+
+def _strategy_key(strategy: str) -> bytes:
+    return strategy.lower().encode()[: INDEX["strategy"].itemsize]
+
+
+class _Segment:
+    """One data file and its index, named after its first sequence number."""
+
+    def __init__(self, root: str, first_seq: int):
+        name = os.path.join(root, f"{first_seq:020d}")
+        self.first_seq = first_seq
+        self.data_path = name + ".log"
+        self.index_path = name + ".idx"
+        self._index = np.zeros(0, dtype=INDEX)
+        self._data = None
+        self._data_size = 0
+        self._lock = threading.Lock()
+
+    def index(self) -> np.ndarray:
+        """Memory-mapped view of every complete index row."""
+        try:
+            rows = os.path.getsize(self.index_path) // INDEX.itemsize
+        except FileNotFoundError:
+            rows = 0
+        index = self._index
+        if rows != len(index):
+            index = np.zeros(0, dtype=INDEX)
+            if rows:
+                index = np.memmap(self.index_path, dtype=INDEX, mode="r", shape=(rows,))
+            self._index = index
+        return index
+
+    def lines(self, rows: np.ndarray) -> list[bytes]:
+        """Data lines of the given index rows.
+
+        Raises ``FileNotFoundError`` once the segment has expired.
+        """
+        if not len(rows):
+            return []
+        end = int((rows["offset"] + rows["length"]).max())
+        # sliced under the lock, so a remap cannot close the map mid-read
+        with self._lock:
+            if self._data is None or self._data_size < end:
+                # the writer adds data before the index rows pointing into it
+                with open(self.data_path, "rb") as fh:
+                    data = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+                self._close_data()
+                self._data = data
+                self._data_size = len(data)
+            return [
+                self._data[offset:offset + length]
+                for offset, length in zip(rows["offset"].tolist(), rows["length"].tolist())
+            ]
+
+    def _close_data(self):
+        if self._data is not None:
+            self._data.close()
+            self._data = None
+            self._data_size = 0
+
+    def remove(self):
+        with self._lock:
+            self._close_data()
+        for path in (self.index_path, self.data_path):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+
+def _entry(row, line: bytes) -> dict:
+    time_ms, kind, args = json.loads(line)
+    if kind not in EVENT_TYPES:
+        # archived by a version that had this event type
+        kind, args = "message", [f"{kind} {args}"]
+    rec = (time_ms, kind, tuple(args))
+    return {
+        "seq": int(row["seq"]),
+        "time": time_ms,
+        "strategy": row["strategy"].decode(),
+        "type": LOG_TYPES[row["log_type"]],
+        "event": kind,
+        "level": LEVEL_NAMES[EVENT_TYPES[kind][0]],
+        "fields": record_fields(rec),
+        "line": render(rec),
+    }
+
+
+class LogArchive:
+    """Segmented on-disk log with a background batch writer."""
+
+    def __init__(self, root: str = LOG_ARCHIVE_DIR):
+        self.root = root
+        self.segments: list[_Segment] = []
+        self.dropped = 0
+        self._queue: queue.Queue = queue.Queue(maxsize=LOG_ARCHIVE_QUEUE_SIZE)
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+        self._loaded = False
+        # state of the segment being written, owned by the writer thread
+        self._data_fh = None
+        self._index_fh = None
+        self._rows = 0
+        self._offset = 0
+        self._next_seq = 0
+        self._last_time = 0
+
+    # --- recording ---
+
+    def append(self, user_id: int | None, strategy: str, log_type: str, rec: tuple):
+        """Queue a log record for the archive without ever blocking."""
+        try:
+            self._queue.put_nowait(
+                (-1 if user_id is None else user_id, strategy, LOG_TYPES.index(log_type), rec)
+            )
+        except queue.Full:
+            self.dropped += 1
+            if self.dropped % 1000 == 1:
+                print(f"Log archive queue full, {self.dropped} records dropped")
+
+    def start(self):
+        with self._lock:
+            self._load()
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="log-archive", daemon=True
+                )
+                self._thread.start()
+
+    def stop(self, timeout: float = 5):
+        """Write what is queued and stop the writer."""
+        thread = self._thread
+        if thread is None:
+            return
+        try:
+            self._queue.put(None, timeout=timeout)
+        except queue.Full:
+            print("Log archive queue full at shutdown, queued records lost")
+            return
+        thread.join(timeout)
+        self._thread = None
+
+    def _load(self):
+        if self._loaded:
+            return
+        os.makedirs(self.root, exist_ok=True)
+        firsts = sorted(
+            int(name[:-4])
+            for name in os.listdir(self.root)
+            if name.endswith(".idx") and name[:-4].isdigit()
+        )
+        self.segments = [_Segment(self.root, first) for first in firsts]
+        if self.segments:
+            last = self.segments[-1]
+            index = self._repair(last)
+            self._next_seq = last.first_seq + len(index)
+            self._last_time = int(index["time"][-1]) if len(index) else 0
+        self._loaded = True
+
+    def _repair(self, segment: _Segment) -> np.ndarray:
+        """Cut a partly written tail left by a crash off the last segment."""
+        rows = os.path.getsize(segment.index_path) // INDEX.itemsize
+        with open(segment.index_path, "r+b") as fh:
+            fh.truncate(rows * INDEX.itemsize)
+        index = segment.index()
+        end = int(index["offset"][-1]) + int(index["length"][-1]) if rows else 0
+        with open(segment.data_path, "ab") as fh:
+            fh.truncate(end)
+        return index
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            batch = []
+            deadline = time.monotonic() + LOG_ARCHIVE_FLUSH_SECONDS
+            while item is not None:
+                batch.append(item)
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+            if batch:
+                try:
+                    self._write(batch)
+                except OSError as exc:
+                    print(f"Log archive write failed, {len(batch)} records lost: {exc}")
+            if item is None:
+                self._close_files()
+                return
+
+    def _open_segment(self):
+        """Continue the last segment or start a new one when it is full."""
+        self._close_files()
+        last = self.segments[-1] if self.segments else None
+        if last is None or len(last.index()) >= LOG_SEGMENT_RECORDS:
+            last = _Segment(self.root, self._next_seq)
+            open(last.index_path, "ab").close()
+            with self._lock:
+                self.segments.append(last)
+            self._expire()
+        self._rows = len(last.index())
+        self._data_fh = open(last.data_path, "ab")
+        self._index_fh = open(last.index_path, "ab")
+        self._offset = self._data_fh.tell()
+
+    def _close_files(self):
+        for fh in (self._data_fh, self._index_fh):
+            if fh is not None:
+                fh.close()
+        self._data_fh = self._index_fh = None
+
+    def _expire(self):
+        cutoff = time.time() * 1000 - LOG_RETENTION_DAYS * 86_400_000
+        with self._lock:
+            expired = []
+            for segment in self.segments[:-1]:
+                index = segment.index()
+                if len(index) and index["time"][-1] >= cutoff:
+                    break
+                expired.append(segment)
+            self.segments = self.segments[len(expired):]
+        for segment in expired:
+            segment.remove()
+
+    def _write(self, batch: list[tuple]):
+        # the time column must stay sorted for binary search, so records
+        # that arrive late are indexed at the newest time already written
+        batch.sort(key=lambda item: item[3][0])
+        start = 0
+        while start < len(batch):
+            if self._data_fh is None or self._rows >= LOG_SEGMENT_RECORDS:
+                self._open_segment()
+            chunk = batch[start:start + LOG_SEGMENT_RECORDS - self._rows]
+            start += len(chunk)
+            lines = []
+            rows = []
+            for user_id, strategy, log_type, (time_ms, kind, args) in chunk:
+                line = json.dumps(
+                    [time_ms, kind, [plain(arg) for arg in args]], separators=(",", ":")
+                ).encode() + b"\n"
+                self._last_time = max(self._last_time, time_ms)
+                rows.append((
+                    self._next_seq, self._last_time, user_id, _strategy_key(strategy),
+                    log_type, self._offset, len(line),
+                ))
+                lines.append(line)
+                self._offset += len(line)
+                self._next_seq += 1
+            self._data_fh.write(b"".join(lines))
+            self._data_fh.flush()
+            self._index_fh.write(np.array(rows, dtype=INDEX).tobytes())
+            self._index_fh.flush()
+            self._rows += len(rows)
+
+    # --- queries ---
+
+    def history(
+        self,
+        user_id: int,
+        strategy: str | None = None,
+        log_type: str | None = None,
+        start_ms: int | None = None,
+        end_ms: int | None = None,
+        after: int | None = None,
+        limit: int = 200,
+    ) -> tuple[list[dict], int | None]:
+        """Lines of ``user_id`` in ``[start_ms, end_ms)``, oldest first.
+
+        ``after`` is the cursor returned by the previous page.  Returns the
+        lines and the cursor of the next page, or None after the last one.
+        """
+        with self._lock:
+            self._load()
+            segments = list(self.segments)
+        found = []
+        for segment in segments:
+            index = segment.index()
+            if not len(index):
+                continue
+            times = index["time"]
+            lo = int(np.searchsorted(times, start_ms)) if start_ms is not None else 0
+            hi = int(np.searchsorted(times, end_ms)) if end_ms is not None else len(index)
+            if after is not None:
+                lo = max(lo, after - segment.first_seq)
+            if lo >= hi:
+                continue
+            window = index[lo:hi]
+            mask = window["user_id"] == user_id
+            if strategy is not None:
+                mask &= window["strategy"] == _strategy_key(strategy)
+            if log_type is not None:
+                mask &= window["log_type"] == LOG_TYPES.index(log_type)
+            rows = window[np.flatnonzero(mask)[: limit - len(found)]]
+            try:
+                lines = segment.lines(rows)
+            except FileNotFoundError:
+                # expired since the segment list was copied
+                continue
+            found += [_entry(row, line) for row, line in zip(rows, lines)]
+            if len(found) >= limit:
+                return found, found[-1]["seq"] + 1
+        return found, None
+
+
+ARCHIVE = LogArchive()
+
+
+@router.get("/logs/history")
+def get_log_history(
+    strategy: str | None = None,
+    log_type: str | None = None,
+    start: int | None = None,
+    end: int | None = None,
+    after: int | None = None,
+    limit: int = 200,
+    current_user: dict = Depends(auth.get_current_user),
+):
+    """Archived log lines between ``start`` and ``end`` (epoch milliseconds).
+
+    Pass the returned ``next`` as ``after`` for the following page; it is
+    null once the range is exhausted.
+    """
+    if log_type is not None and log_type not in LOG_TYPES:
+        raise HTTPException(
+            status_code=400, detail=f"log_type must be one of {', '.join(LOG_TYPES)}"
+        )
+    limit = min(max(limit, 1), LOG_HISTORY_MAX_LIMIT)
+    lines, cursor = ARCHIVE.history(
+        current_user["id"], strategy, log_type, start, end, after, limit
+    )
+    return {"logs": lines, "next": cursor}
@@ -0,0 +1,114 @@
+"""Bounded in-memory log buffers read incrementally by sequence number.
+
+Every line appended to a ``LogRing`` gets the next sequence number of that
+ring.  Readers pass the cursor returned by their previous read and get only
+the lines appended since, so a poll costs time and bytes proportional to the
+new activity rather than to the history kept.
+
+Strategy events are stored as compact records, ``(time_ms, kind, args)``
+with the raw values of the event, and only rendered to text when a client
+reads them.  Each kind is registered once with a level and a template.
+"""
+import os
+import string
+import threading
+import time
+
+# Lines kept per strategy for the detailed and the trade log
+DETAIL_LOG_SIZE = int(os.getenv("DETAIL_LOG_SIZE", "200"))
+TRADE_LOG_SIZE = int(os.getenv("TRADE_LOG_SIZE", "1000"))
+
+DEBUG, INFO, WARNING, ERROR = 10, 20, 30, 40
+LEVELS = {"debug": DEBUG, "info": INFO, "warning": WARNING, "error": ERROR}
+LEVEL_NAMES = {level: name for name, level in LEVELS.items()}
+# Level of strategies without their own; "debug" also logs every signal check
+STRATEGY_LOG_LEVEL = LEVELS[os.getenv("STRATEGY_LOG_LEVEL", "info").lower()]
+
+# kind -> (level, field names, template)
+EVENT_TYPES: dict[str, tuple[int, tuple[str, ...], str]] = {}
+
+
+def event_type(kind: str, level: int, template: str, *fields: str):
+    """Register an event kind; ``fields`` name its arguments in order."""
+    names = {name for _, name, _, _ in string.Formatter().parse(template) if name}
+    unknown = names - set(fields)
+    if unknown:
+        raise ValueError(f"{kind}: template uses undeclared fields {sorted(unknown)}")
+    EVENT_TYPES[kind] = (level, fields, template)
+
+
+event_type("message", INFO, "{message}", "message")
+event_type("error", ERROR, "{message}", "message")
+
+
+def record(kind: str, *args) -> tuple:
+    return (time.time_ns() // 1_000_000, kind, args)
+
+
+def plain(value):
+    """NumPy scalars as the plain numbers and booleans JSON accepts."""
+    return value.item() if hasattr(value, "item") else value
+
+
+def record_fields(rec: tuple) -> dict:
+    fields = EVENT_TYPES[rec[1]][1]
+    return {name: plain(value) for name, value in zip(fields, rec[2])}
+
+
+def render(line) -> str:
+    """Text of a stored line; records get their template and a timestamp."""
+    if isinstance(line, str):
+        return line
+    time_ms, kind, args = line
+    template = EVENT_TYPES[kind][2]
+    stamp = time.strftime("%Y-%m-%d %H:%M:%S UTC", time.gmtime(time_ms / 1000))
+    return f"[{stamp}] " + template.format(**dict(zip(EVENT_TYPES[kind][1], args)))
+
+
+class LogRing:
+    """Fixed-capacity buffer overwriting its oldest line when full."""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._lines: list = [None] * capacity
+        # sequence number the next line will get
+        self.next_seq = 0
+        self._lock = threading.Lock()
+
+    @property
+    def first_seq(self) -> int:
+        """Sequence number of the oldest line still held."""
+        return max(self.next_seq - self.capacity, 0)
+
+    def append(self, line) -> int:
+        with self._lock:
+            seq = self.next_seq
+            self._lines[seq % self.capacity] = line
+            self.next_seq = seq + 1
+        return seq
+
+    def read(self, since: int | None = None) -> tuple[list, int, bool]:
+        """Lines from sequence number ``since`` on, oldest first.
+
+        Returns the lines, the cursor for the next read and whether lines
+        were skipped because they had already been overwritten.  A cursor
+        from the future, e.g. issued before a restart, reads everything.
+        """
+        with self._lock:
+            first, end = self.first_seq, self.next_seq
+            if since is None or since > end:
+                start = first
+                truncated = since is not None
+            else:
+                start = max(since, first)
+                truncated = since < first
+            lines = [self._lines[seq % self.capacity] for seq in range(start, end)]
+        return lines, end, truncated
+
+
+def log_page(ring: LogRing | None, since: int | None = None) -> dict:
+    """Response body of a log endpoint, empty when there is no ring yet."""
+    if ring is None:
+        return {"logs": [], "next": 0, "truncated": since is not None and since > 0}
+    lines, cursor, truncated = ring.read(since)
+    return {"logs": [render(line) for line in lines], "next": cursor, "truncated": truncated}
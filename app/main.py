@@ -6,14 +6,24 @@ from . import (
     schemas,
     crud,
     auth,
-    cache,
     settings,
     strategies,
     assets,
     dashboard,
+    events,
     bot,
+    exchange_info,
     manual_trade,
+    market,
+    kline_store,
+    log_archive,
+    metrics,
+    backtest,
+    optimizer,
+    passwords,
+    trade_journal,
 )
+from .supabase_db import async_db
 
 app = FastAPI(title="Tradex API")
 
@@ -34,10 +44,33 @@ app.include_router(settings.router)
 app.include_router(strategies.router)
 app.include_router(assets.router)
 app.include_router(dashboard.router)
+app.include_router(events.router)
 app.include_router(bot.router)
 app.include_router(manual_trade.router)
+app.include_router(market.router)
+app.include_router(kline_store.router)
+app.include_router(log_archive.router)
+app.include_router(metrics.router)
+app.include_router(backtest.router)
+app.include_router(optimizer.router)
 
 
+@app.on_event("startup")
+async def start_background_tasks():
+    exchange_info.EXCHANGE_INFO.start()
+    trade_journal.JOURNAL.start()
+    log_archive.ARCHIVE.start()
+    metrics.start()
+
+
+@app.on_event("shutdown")
+async def stop_background_tasks():
+    exchange_info.EXCHANGE_INFO.stop()
+    await trade_journal.JOURNAL.stop()
+    log_archive.ARCHIVE.stop()
+    metrics.stop()
+    await async_db.aclose()
+    passwords.shutdown()
 
 
 @app.post("/trades/", response_model=schemas.Trade)
@@ -84,14 +117,3 @@ def delete_trade(trade_id: int, current_user: dict = Depends(auth.get_current_us
             status_code=403, detail="Not authorized to delete this trade"
         )
     return crud.delete_trade(trade_id)
-
-
-@app.get("/market/{symbol}")
-def get_market(symbol: str):
-    cached = cache.get_cached_market_data(symbol)
-    if cached:
-        return {"symbol": symbol, "data": cached.decode()}
-    # placeholder for real market data fetch
-    data = "sample data"
-    cache.cache_market_data(symbol, data)
-    return {"symbol": symbol, "data": data}
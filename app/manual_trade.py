@@ -1,9 +1,8 @@
 import asyncio
 from fastapi import APIRouter, Depends, HTTPException, Body
-from binance.client import Client
 
-from . import auth, crud, schemas
-from .supabase_db import db
+from . import auth, clients, exchange_info, trade_journal
+from .exchange import AsyncExchange
 from .strategies import _extract_order_details
 
 router = APIRouter()
@@ -12,27 +11,23 @@ MANUAL_POSITION: dict[int, dict | None] = {}
 MANUAL_TASKS: dict[int, asyncio.Task] = {}
 
 
-def _get_client(user_id: int) -> Client:
-    settings = db.get_user_settings(user_id)
-    if not settings:
-        raise HTTPException(status_code=400, detail="Binance API keys not configured")
-    return Client(settings["binance_api_key"], settings["binance_api_secret"])
-
-
 async def _monitor_position(user_id: int):
     pos = MANUAL_POSITION.get(user_id)
     if not pos:
         return
-    client = _get_client(user_id)
+    exchange = AsyncExchange(await clients.get_client_async(user_id))
     symbol = pos["symbol"]
     qty = pos["quantity"]
+    filters = await exchange_info.EXCHANGE_INFO.filters(symbol)
+    if filters:
+        qty = filters.round_quantity(qty)
     tp = pos.get("take_profit")
     sl = pos.get("stop_loss")
-    trade_id = pos.get("trade_id")
+    ref = pos.get("ref")
     while MANUAL_POSITION.get(user_id):
         await asyncio.sleep(5)
         try:
-            ticker = client.get_symbol_ticker(symbol=symbol)
+            ticker = await exchange.get_symbol_ticker(symbol=symbol)
             price = float(ticker["price"])
         except Exception:
             continue
@@ -44,37 +39,23 @@ async def _monitor_position(user_id: int):
         if not trigger:
             continue
         try:
-            order = client.create_order(symbol=symbol, side="SELL", type="MARKET", quantity=qty)
+            order = await exchange.create_order(symbol=symbol, side="SELL", type="MARKET", quantity=qty)
             exit_price, _, exit_commission = _extract_order_details(order)
         except Exception as exc:
             # keep trying until successful
             continue
-        sell_trade = crud.create_trade(
-            schemas.TradeCreate(
-                symbol=symbol,
-                side="SELL",
-                quantity=qty,
-                price=exit_price,
-                strategy_id="manual",
-                status="closed",
-                related_trade_id=trade_id,
-            ),
+        trade_journal.JOURNAL.record_close(
+            ref,
             user_id,
+            "manual",
+            symbol,
+            qty,
+            entry_price=pos["price"],
+            exit_price=exit_price,
+            completed=False,
+            entry_quantity=pos["quantity"],
+            entry_time=pos.get("time"),
         )
-        sell_trade_id = sell_trade.get("id") if sell_trade else None
-        if trade_id:
-            crud.update_trade(
-                trade_id,
-                schemas.TradeCreate(
-                    symbol=symbol,
-                    side="BUY",
-                    quantity=qty,
-                    price=pos["price"],
-                    strategy_id="manual",
-                    status="closed",
-                    related_trade_id=sell_trade_id,
-                ),
-            )
         MANUAL_POSITION[user_id] = None
         break
     MANUAL_TASKS.pop(user_id, None)
@@ -88,31 +69,27 @@ async def manual_buy(
     stop_loss: float | None = Body(None, embed=True),
     current_user: dict = Depends(auth.get_current_user),
 ):
-    client = _get_client(current_user["id"])
+    exchange = AsyncExchange(await clients.get_client_async(current_user["id"]))
+    filters = await exchange_info.EXCHANGE_INFO.filters(symbol)
     try:
-        order = client.create_order(symbol=symbol.upper(), side="BUY", type="MARKET", quoteOrderQty=amount)
+        if filters:
+            filters.validate(quote_quantity=amount)
+        order = await exchange.create_order(symbol=symbol.upper(), side="BUY", type="MARKET", quoteOrderQty=amount)
         entry_price, executed_qty, entry_commission = _extract_order_details(order)
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
-    trade = crud.create_trade(
-        schemas.TradeCreate(
-            symbol=symbol.upper(),
-            side="BUY",
-            quantity=executed_qty,
-            price=entry_price,
-            strategy_id="manual",
-            status="open",
-        ),
-        current_user["id"],
+    opened_at = trade_journal.now()
+    ref = trade_journal.JOURNAL.record_open(
+        current_user["id"], "manual", symbol.upper(), executed_qty, entry_price, opened_at
     )
-    trade_id = trade.get("id") if trade else None
     MANUAL_POSITION[current_user["id"]] = {
         "symbol": symbol.upper(),
         "quantity": executed_qty,
         "price": entry_price,
         "take_profit": take_profit,
         "stop_loss": stop_loss,
-        "trade_id": trade_id,
+        "ref": ref,
+        "time": opened_at,
     }
     if take_profit or stop_loss:
         task = asyncio.create_task(_monitor_position(current_user["id"]))
@@ -126,21 +103,23 @@ async def manual_sell(
     amount: float = Body(..., embed=True),
     current_user: dict = Depends(auth.get_current_user),
 ):
-    client = _get_client(current_user["id"])
+    exchange = AsyncExchange(await clients.get_client_async(current_user["id"]))
+    filters = await exchange_info.EXCHANGE_INFO.filters(symbol)
     try:
-        order = client.create_order(symbol=symbol.upper(), side="SELL", type="MARKET", quoteOrderQty=amount)
+        if filters:
+            filters.validate(quote_quantity=amount)
+        order = await exchange.create_order(symbol=symbol.upper(), side="SELL", type="MARKET", quoteOrderQty=amount)
         exit_price, executed_qty, _ = _extract_order_details(order)
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
-    crud.create_trade(
-        schemas.TradeCreate(
-            symbol=symbol.upper(),
-            side="SELL",
-            quantity=executed_qty,
-            price=exit_price,
-            strategy_id="manual",
-            status="closed",
-        ),
+    trade_journal.JOURNAL.record_close(
+        None,
         current_user["id"],
+        "manual",
+        symbol.upper(),
+        executed_qty,
+        entry_price=None,
+        exit_price=exit_price,
+        completed=False,
     )
     return {"sell": order}
@@ -0,0 +1,152 @@
+"""24h ticker statistics served from a two-tier cache.
+
+Lookups go to an in-process dict first, then to Redis, which all workers
+share, with one ``MGET`` for all symbols of a request.  Only the remaining
+misses are fetched from the exchange.  Concurrent misses on the same symbol
+share a single upstream request.  Entries expire ``MARKET_DATA_TTL_SECONDS``
+after they were fetched, in both tiers.
+
+Symbols must be listed in the exchange-info cache, and symbols the exchange
+still rejects are remembered for ``MARKET_REJECTED_TTL_SECONDS``, so bogus
+names never turn into repeated upstream requests.
+"""
+import asyncio
+import json
+import os
+import time
+
+from binance.exceptions import BinanceAPIException
+from fastapi import APIRouter, Depends, HTTPException
+
+from . import auth, cache, exchange_info
+from .exchange import create_client, run
+
+MARKET_DATA_TTL_SECONDS = float(os.getenv("MARKET_DATA_TTL_SECONDS", "5"))
+# Most symbols accepted by one ``/market`` request
+MARKET_MAX_SYMBOLS = int(os.getenv("MARKET_MAX_SYMBOLS", "50"))
+# How long a symbol the exchange answered 400 for is rejected without asking again
+MARKET_REJECTED_TTL_SECONDS = float(os.getenv("MARKET_REJECTED_TTL_SECONDS", "300"))
+
+router = APIRouter()
+
+# symbol -> (ticker, expiry in epoch seconds)
+_L1: dict[str, tuple[dict, float]] = {}
+# symbol -> upstream fetch in progress
+_inflight: dict[str, asyncio.Future] = {}
+# symbol -> (error the exchange answered with, expiry in epoch seconds)
+_rejected: dict[str, tuple[BinanceAPIException, float]] = {}
+_client = None
+
+
+def _ticker(raw: dict) -> dict:
+    return {
+        "symbol": raw["symbol"],
+        "price": float(raw["lastPrice"]),
+        "open": float(raw["openPrice"]),
+        "high": float(raw["highPrice"]),
+        "low": float(raw["lowPrice"]),
+        "change": float(raw["priceChange"]),
+        "change_percent": float(raw["priceChangePercent"]),
+        "volume": float(raw["volume"]),
+        "quote_volume": float(raw["quoteVolume"]),
+        "fetched_at": time.time(),
+    }
+
+
+async def _fetch(symbol: str) -> dict:
+    global _client
+    if _client is None:
+        _client = create_client()
+    try:
+        raw = await run(_client.get_ticker, symbol=symbol)
+    except BinanceAPIException as exc:
+        if exc.status_code == 400:
+            _rejected[symbol] = (exc, time.time() + MARKET_REJECTED_TTL_SECONDS)
+        raise
+    ticker = _ticker(raw)
+    _L1[symbol] = (ticker, ticker["fetched_at"] + MARKET_DATA_TTL_SECONDS)
+    return ticker
+
+
+def _fetch_once(symbol: str) -> tuple[asyncio.Future, bool]:
+    """The upstream fetch of ``symbol`` and whether this call started it."""
+    future = _inflight.get(symbol)
+    started = future is None
+    if started:
+        future = _inflight[symbol] = asyncio.ensure_future(_fetch(symbol))
+        future.add_done_callback(lambda _: _inflight.pop(symbol, None))
+    # a cancelled caller must not cancel the fetch the others wait for
+    return asyncio.shield(future), started
+
+
+async def get_tickers(symbols: list[str]) -> dict[str, dict]:
+    """Tickers of ``symbols``, from the fastest tier that has them fresh.
+
+    Raises ``BinanceAPIException`` for symbols the exchange does not know.
+    """
+    now = time.time()
+    for symbol in symbols:
+        rejected = _rejected.get(symbol)
+        if rejected is not None:
+            if rejected[1] > now:
+                raise rejected[0]
+            del _rejected[symbol]
+    tickers = {}
+    for symbol in symbols:
+        entry = _L1.get(symbol)
+        if entry is not None and entry[1] > now:
+            tickers[symbol] = entry[0]
+    # symbols already being fetched are joined without asking Redis
+    missing = [s for s in symbols if s not in tickers and s not in _inflight]
+    if missing:
+        for symbol, value in zip(missing, await cache.get_market_data(missing)):
+            if value is not None:
+                ticker = json.loads(value)
+                _L1[symbol] = (ticker, ticker["fetched_at"] + MARKET_DATA_TTL_SECONDS)
+                tickers[symbol] = ticker
+    missing = [s for s in symbols if s not in tickers]
+    if not missing:
+        return tickers
+
+    fetches = [_fetch_once(s) for s in missing]
+    fetched = await asyncio.gather(*(future for future, _ in fetches))
+    tickers.update(zip(missing, fetched))
+    # only the caller that started a fetch publishes it to the other workers
+    started = {t["symbol"]: json.dumps(t) for t, (_, own) in zip(fetched, fetches) if own}
+    if started:
+        await cache.cache_market_data(started, MARKET_DATA_TTL_SECONDS)
+    return tickers
+
+
+async def _serve(symbols: list[str]) -> dict[str, dict]:
+    for symbol in symbols:
+        if await exchange_info.EXCHANGE_INFO.filters(symbol) is None:
+            raise HTTPException(status_code=404, detail=f"Unknown symbol: {symbol}")
+    try:
+        return await get_tickers(symbols)
+    except BinanceAPIException as exc:
+        if exc.code == -1121:
+            raise HTTPException(status_code=404, detail="Unknown symbol")
+        raise HTTPException(status_code=502, detail=f"Exchange error: {exc.message}")
+    except Exception as exc:
+        raise HTTPException(status_code=502, detail=f"Market data unavailable: {exc}")
+
+
+@router.get("/market")
+async def get_markets(
+    symbols: str, current_user: dict = Depends(auth.get_current_user)
+):
+    """Tickers of a comma separated list of symbols."""
+    names = list(dict.fromkeys(s.strip().upper() for s in symbols.split(",") if s.strip()))
+    if not names or len(names) > MARKET_MAX_SYMBOLS:
+        raise HTTPException(
+            status_code=400, detail=f"Request between 1 and {MARKET_MAX_SYMBOLS} symbols"
+        )
+    tickers = await _serve(names)
+    return [tickers[name] for name in names]
+
+
+@router.get("/market/{symbol}")
+async def get_market(symbol: str, current_user: dict = Depends(auth.get_current_user)):
+    symbol = symbol.upper()
+    return {"symbol": symbol, "data": (await _serve([symbol]))[symbol]}
@@ -0,0 +1,168 @@
+import asyncio
+import os
+
+from . import kline_store, scheduler
+from .candles import CandleBuffer, Candles
+from .exchange import AsyncExchange
+from .indicators import IndicatorGraph
+
+# Retries, one second apart, when the feed woke for a candle close but the
+# exchange has not published the candle yet
+CLOSE_RETRIES = int(os.getenv("FEED_CLOSE_RETRIES", "5"))
+# Minimum number of candles kept in memory per feed
+CANDLE_BUFFER_CAPACITY = int(os.getenv("CANDLE_BUFFER_CAPACITY", "1000"))
+# Largest page the exchange returns for one klines request
+MAX_KLINES_PER_REQUEST = 1000
+
+
+class KlineFeed:
+    """Fetches klines for one symbol/interval and fans them out to subscribers.
+
+    Every strategy task trading the same pair waits on the same feed, so the
+    exchange is queried once per candle no matter how many tasks are running.
+    The feed wakes just after each candle close and only publishes closed
+    candles, so subscribers run once per new candle.  History is kept in a
+    ``CandleBuffer`` and only the candles missing from it are fetched.  Closed
+    candles are also appended to the local ``KlineStore``, which warm starts
+    the buffer the next time the feed is started.  Indicators requested
+    through ``graph`` are updated once per published candle and shared by
+    every subscriber.
+    """
+
+    def __init__(self, symbol: str, interval: str, client, limit: int):
+        self.symbol = symbol
+        self.interval = interval
+        # klines are public market data, so any subscriber's client will do
+        self.exchange = AsyncExchange(client)
+        self.limit = limit
+        self.subscribers = 0
+        self.interval_ms = scheduler.interval_ms(interval)
+        self.candles = CandleBuffer(max(limit, CANDLE_BUFFER_CAPACITY))
+        self.store = kline_store.get_store(symbol, interval)
+        self.graph = IndicatorGraph(lambda: self.candles.view())
+        self.version = 0
+        self._updated = asyncio.Condition()
+        self._task: asyncio.Task | None = None
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+    def _fetch_limit(self, now_ms: int) -> int:
+        """Number of klines needed to bring the buffer up to date."""
+        last = self.candles.last_open_time
+        if last is None:
+            return min(self.limit + 1, MAX_KLINES_PER_REQUEST)
+        # closed candles missing since the newest stored one, plus the one forming
+        missing = (now_ms // self.interval_ms - 1) - last // self.interval_ms
+        return max(2, min(missing + 1, self.candles.capacity, MAX_KLINES_PER_REQUEST))
+
+    async def _fetch_closed(self) -> bool:
+        """Fetch the newest klines and store them if a new candle has closed."""
+        now_ms = scheduler.CLOCK.now_ms()
+        klines = await self.exchange.get_klines(
+            symbol=self.symbol, interval=self.interval, limit=self._fetch_limit(now_ms)
+        )
+        last = self.candles.last_open_time
+        closed = [
+            k for k in klines if k[6] < now_ms and (last is None or k[0] > last)
+        ]
+        for kline in closed:
+            self.candles.upsert(kline)
+        if closed:
+            try:
+                self.store.append(closed)
+            except OSError as exc:
+                print(f"Failed to store klines for {self.symbol} {self.interval}: {exc}")
+        return bool(closed)
+
+    async def _warm_start(self):
+        """Bring the local store up to date and seed the buffer from it."""
+        try:
+            await kline_store.backfill(
+                self.exchange, self.store, scheduler.CLOCK.now_ms()
+            )
+        except Exception as exc:
+            print(f"Kline backfill {self.symbol} {self.interval} failed: {exc}")
+        self.candles.load(self.store.read())
+
+    async def _publish(self):
+        self.graph.update(self.candles.view())
+        self.version += 1
+        async with self._updated:
+            self._updated.notify_all()
+
+    async def _run(self):
+        warm = False
+        # closed candles in the buffer that subscribers have not seen yet
+        unpublished = False
+        retries = 0
+        # no candle is due right after the backfill, only after a close wake-up
+        woke_for_close = False
+        while True:
+            # every step is retried, so subscribers never wait on a dead feed
+            try:
+                await scheduler.CLOCK.maybe_sync(self.exchange)
+                if not warm:
+                    await self._warm_start()
+                    # publish the history right away, then once per closed candle
+                    if self.candles.count:
+                        await self._publish()
+                    warm = True
+                unpublished = await self._fetch_closed() or unpublished
+                published = unpublished
+                if unpublished:
+                    await self._publish()
+                    unpublished = False
+            except Exception as exc:
+                print(f"Kline feed {self.symbol} {self.interval} failed: {exc}")
+                await asyncio.sleep(10)
+                continue
+            if not published and woke_for_close and retries < CLOSE_RETRIES:
+                retries += 1
+                await asyncio.sleep(1)
+                continue
+            retries = 0
+            await scheduler.sleep_until_close(self.interval)
+            woke_for_close = True
+
+    async def wait(self, version: int) -> tuple[int, Candles]:
+        """Wait for candles newer than ``version`` and return views of them."""
+        async with self._updated:
+            await self._updated.wait_for(lambda: self.version > version)
+        return self.version, self.candles.view()
+
+
+# active feeds keyed by (symbol, interval)
+FEEDS: dict[tuple[str, str], KlineFeed] = {}
+
+
+def subscribe(symbol: str, interval: str, client, limit: int) -> KlineFeed:
+    """Return the shared feed for a pair, starting it if needed."""
+    key = (symbol, interval)
+    feed = FEEDS.get(key)
+    if feed is None:
+        feed = KlineFeed(symbol, interval, client, limit)
+        FEEDS[key] = feed
+        feed.start()
+    # serve the subscriber needing the longest lookback
+    feed.limit = max(feed.limit, limit)
+    if limit > feed.candles.capacity:
+        feed.candles = feed.candles.grow(limit)
+    feed.subscribers += 1
+    return feed
+
+
+def unsubscribe(feed: KlineFeed):
+    """Drop one subscriber and stop the feed once nobody is listening."""
+    feed.subscribers -= 1
+    if feed.subscribers > 0:
+        return
+    feed.stop()
+    key = (feed.symbol, feed.interval)
+    if FEEDS.get(key) is feed:
+        del FEEDS[key]
@@ -0,0 +1,289 @@
+"""In-process metrics served in the Prometheus text format at ``/metrics``.
+
+Counters and histograms keep one cell per thread that records into them, so
+recording takes no lock and no update is lost between threads: each cell
+has a single writer, and a scrape adds all cells up.  Recording costs a
+dict lookup or two and a few additions, which is negligible next to the
+calls measured.  Bind ``labels(...)`` once where a call site is hot.
+
+Gauges are read from a callback when scraped.
+"""
+import asyncio
+import bisect
+import os
+import threading
+import time
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+# Seconds between event loop lag probes
+LOOP_LAG_INTERVAL = float(os.getenv("LOOP_LAG_INTERVAL", "0.5"))
+
+# Upper bounds in seconds, from in-process computations to slow round trips
+DEFAULT_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+    0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+router = APIRouter()
+
+REGISTRY: list = []
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: tuple[str, ...], values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Cells:
+    """Per-thread lists of numbers summed when read."""
+
+    def __init__(self, size: int):
+        self.size = size
+        self._cells: dict[int, list] = {}
+
+    def mine(self) -> list:
+        ident = threading.get_ident()
+        cell = self._cells.get(ident)
+        if cell is None:
+            cell = self._cells.setdefault(ident, [0] * self.size)
+        return cell
+
+    def total(self) -> list:
+        totals = [0] * self.size
+        for cell in list(self._cells.values()):
+            for i, value in enumerate(cell):
+                totals[i] += value
+        return totals
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self._children: dict[tuple, object] = {}
+        REGISTRY.append(self)
+
+    def labels(self, *values):
+        """The series with these label values, created on first use."""
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.label_names):
+                raise ValueError(f"{self.name} takes labels {self.label_names}")
+            child = self._children.setdefault(values, self._child())
+        return child
+
+    def _child(self):
+        raise NotImplementedError
+
+    def _samples(self, values: tuple, child) -> list[str]:
+        raise NotImplementedError
+
+    def expose(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for values, child in list(self._children.items()):
+            lines += self._samples(values, child)
+        return lines
+
+
+class _CounterChild:
+    def __init__(self):
+        self._cells = _Cells(1)
+
+    def inc(self, amount: float = 1):
+        self._cells.mine()[0] += amount
+
+    @property
+    def value(self) -> float:
+        return self._cells.total()[0]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _child(self):
+        return _CounterChild()
+
+    def inc(self, amount: float = 1):
+        self.labels().inc(amount)
+
+    def _samples(self, values, child):
+        return [f"{self.name}{_labels(self.label_names, values)} {_number(child.value)}"]
+
+
+class _HistogramChild:
+    def __init__(self, buckets: tuple[float, ...]):
+        self.buckets = buckets
+        # a count per bucket and one above the last, then the sum
+        self._cells = _Cells(len(buckets) + 2)
+
+    def observe(self, value: float):
+        cell = self._cells.mine()
+        cell[bisect.bisect_left(self.buckets, value)] += 1
+        cell[-1] += value
+
+    def time(self) -> "_Timer":
+        """Context manager observing the seconds spent in its block."""
+        return _Timer(self)
+
+
+class _Timer:
+    __slots__ = ("child", "start")
+
+    def __init__(self, child: _HistogramChild):
+        self.child = child
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc):
+        self.child.observe(time.perf_counter() - self.start)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help, labels=(), buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, help, labels)
+
+    def _child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float):
+        self.labels().observe(value)
+
+    def _samples(self, values, child):
+        totals = child._cells.total()
+        lines = []
+        count = 0
+        for bound, n in zip((*self.buckets, float("inf")), totals):
+            count += n
+            le = f'le="{_number(float(bound))}"'
+            lines.append(f"{self.name}_bucket{_labels(self.label_names, values, le)} {count}")
+        labels = _labels(self.label_names, values)
+        lines.append(f"{self.name}_sum{labels} {_number(float(totals[-1]))}")
+        lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class Gauge(_Metric):
+    """Value read from ``read()`` at scrape time, as ``{label values: value}``."""
+
+    kind = "gauge"
+
+    def __init__(self, name, help, read, labels=()):
+        super().__init__(name, help, labels)
+        self.read = read
+
+    def expose(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        try:
+            values = self.read()
+        except Exception as exc:
+            print(f"Metric {self.name} unavailable: {exc}")
+            return lines
+        if not isinstance(values, dict):
+            values = {(): values}
+        for label_values, value in values.items():
+            labels = _labels(self.label_names, label_values)
+            lines.append(f"{self.name}{labels} {_number(value)}")
+        return lines
+
+
+def render() -> str:
+    lines = []
+    for metric in REGISTRY:
+        lines += metric.expose()
+    return "\n".join(lines) + "\n"
+
+
+# --- metrics shared across modules ---
+
+EXCHANGE_SECONDS = Histogram(
+    "exchange_request_seconds",
+    "Binance API calls, including the wait for an exchange worker thread.",
+    ("method", "symbol"),
+)
+EXCHANGE_ERRORS = Counter(
+    "exchange_request_errors_total", "Binance API calls that raised.", ("method", "symbol")
+)
+SUPABASE_SECONDS = Histogram(
+    "supabase_request_seconds", "Supabase REST requests.", ("method", "table")
+)
+SUPABASE_ERRORS = Counter(
+    "supabase_request_errors_total",
+    "Supabase REST requests that failed or got an error status.",
+    ("method", "table"),
+)
+CHECK_SIGNAL_SECONDS = Histogram(
+    "strategy_check_signal_seconds",
+    "Signal evaluation per closed candle.",
+    ("strategy", "symbol"),
+)
+STRATEGY_ERRORS = Counter(
+    "strategy_loop_errors_total", "Errors caught by strategy loops.", ("strategy", "symbol")
+)
+DASHBOARD_SECONDS = Histogram(
+    "dashboard_metrics_seconds",
+    "Building dashboard metrics from the profit aggregates.",
+    ("resolution",),
+)
+LOOP_LAG_SECONDS = Histogram(
+    "event_loop_lag_seconds",
+    "Delay of a timer on the event loop beyond its due time.",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+_last_lag = 0.0
+Gauge(
+    "event_loop_lag_last_seconds", "Event loop lag measured by the latest probe.",
+    lambda: _last_lag,
+)
+
+_lag_task: asyncio.Task | None = None
+
+
+async def _probe_loop_lag():
+    global _last_lag
+    lag = LOOP_LAG_SECONDS.labels()
+    loop = asyncio.get_running_loop()
+    while True:
+        due = loop.time() + LOOP_LAG_INTERVAL
+        await asyncio.sleep(LOOP_LAG_INTERVAL)
+        _last_lag = max(loop.time() - due, 0.0)
+        lag.observe(_last_lag)
+
+
+def start():
+    global _lag_task
+    if _lag_task is None:
+        _lag_task = asyncio.get_running_loop().create_task(_probe_loop_lag())
+
+
+def stop():
+    global _lag_task
+    if _lag_task is not None:
+        _lag_task.cancel()
+        _lag_task = None
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    """Every metric in the Prometheus text exposition format."""
+    return PlainTextResponse(render(), media_type="text/plain; version=0.0.4")
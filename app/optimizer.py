@@ -0,0 +1,294 @@
+"""Parallel parameter sweeps over the vectorized backtests.
+
+Candle columns are copied once into a shared memory block that every worker
+process maps, so only parameter sets and result rows cross process
+boundaries.  Workers are spawned rather than forked because the API process
+runs thread pools that must not be duplicated mid-flight.
+"""
+import asyncio
+import itertools
+import math
+import multiprocessing
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+from fastapi import APIRouter, Body, Depends, HTTPException
+
+from . import auth, kline_store
+from .backtest import default_params, signal_function, simulate
+from .candles import Candles
+from .strategies import STRATEGY_MARKETS, STRATEGY_SPECS
+
+OPTIMIZER_WORKERS = int(os.getenv("OPTIMIZER_WORKERS", str(os.cpu_count() or 1)))
+# Upper bound on parameter sets evaluated by one sweep
+MAX_COMBINATIONS = int(os.getenv("OPTIMIZER_MAX_COMBINATIONS", "20000"))
+# Sweeps allowed to run at once, each with its own OPTIMIZER_WORKERS processes;
+# more are turned away with 429
+OPTIMIZER_MAX_SWEEPS = int(os.getenv("OPTIMIZER_MAX_SWEEPS", "1"))
+
+COLUMNS = ("open_time", "close_time", "open", "high", "low", "close", "volume")
+
+router = APIRouter()
+
+# candles mapped from shared memory inside a worker process
+_worker_candles: Candles | None = None
+_worker_shm: shared_memory.SharedMemory | None = None
+# sweeps currently running in this process
+_sweeps = 0
+
+
+def grid_size(space: dict[str, list]) -> int:
+    """Number of combinations in the grid of ``space``, without building it."""
+    return math.prod(len(values) for values in space.values())
+
+
+def grid(space: dict[str, list]) -> list[dict]:
+    """Every combination of the listed parameter values."""
+    names = list(space)
+    return [dict(zip(names, values)) for values in itertools.product(*space.values())]
+
+
+def random_search(space: dict[str, list], samples: int, seed: int | None = None) -> list[dict]:
+    """``samples`` distinct random combinations of the listed values.
+
+    Draws positions in the grid and decodes only those, so the cost depends
+    on ``samples`` rather than on the size of the grid.
+    """
+    size = grid_size(space)
+    if samples >= size:
+        return grid(space)
+    combos = []
+    for index in random.Random(seed).sample(range(size), samples):
+        combo = {}
+        for name, values in reversed(space.items()):
+            index, i = divmod(index, len(values))
+            combo[name] = values[i]
+        combos.append({name: combo[name] for name in space})
+    return combos
+
+
+def _share(candles: Candles) -> shared_memory.SharedMemory:
+    """Copy candle columns into one shared memory block, column after column."""
+    n = len(candles)
+    shm = shared_memory.SharedMemory(create=True, size=max(n * 8 * len(COLUMNS), 1))
+    for i, name in enumerate(COLUMNS):
+        dtype = np.int64 if name.endswith("_time") else np.float64
+        column = np.ndarray((n,), dtype=dtype, buffer=shm.buf, offset=i * n * 8)
+        column[:] = getattr(candles, name)
+    return shm
+
+
+def _attach(name: str, n: int):
+    """Worker initializer mapping the shared candles without copying them."""
+    global _worker_candles, _worker_shm
+    _worker_shm = shared_memory.SharedMemory(name=name)
+    columns = {}
+    for i, column in enumerate(COLUMNS):
+        dtype = np.int64 if column.endswith("_time") else np.float64
+        columns[column] = np.ndarray((n,), dtype=dtype, buffer=_worker_shm.buf, offset=i * n * 8)
+    _worker_candles = Candles(**columns)
+
+
+def _evaluate(job: tuple[str, dict, float]) -> dict:
+    strategy_id, params, amount = job
+    signals, _ = signal_function(strategy_id)
+    buy, sell = signals(_worker_candles, **params)
+    return {**params, **simulate(_worker_candles, buy, sell, amount).summary()}
+
+
+def _evaluate_chunk(jobs: list[tuple[str, dict, float]]) -> list[dict]:
+    return [_evaluate(job) for job in jobs]
+
+
+def _check_value(name: str, value, default):
+    """``value`` coerced to the type of the live ``default``, or ValueError.
+
+    Integer parameters are window lengths and must be at least 1; float
+    parameters are multipliers and thresholds and must be finite and >= 0.
+    """
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise ValueError(f"{name} must be a number, got {value!r}")
+    if isinstance(default, int):
+        if isinstance(value, float) and not value.is_integer():
+            raise ValueError(f"{name} must be an integer, got {value!r}")
+        if value < 1:
+            raise ValueError(f"{name} must be at least 1, got {value!r}")
+        return int(value)
+    if not math.isfinite(value) or value < 0:
+        raise ValueError(f"{name} must be a finite number >= 0, got {value!r}")
+    return float(value)
+
+
+def check_space(strategy_id: str, space: dict[str, list], defaults: dict) -> dict[str, list]:
+    """Validate a search space against the live parameters in ``defaults``.
+
+    Raises ValueError for unknown names, empty value lists and values of the
+    wrong type or range, so bad input never reaches the worker processes.
+    """
+    unknown = set(space) - set(defaults)
+    if unknown:
+        raise ValueError(f"Unknown parameters for {strategy_id}: {sorted(unknown)}")
+    checked = {}
+    for name, values in space.items():
+        if not isinstance(values, list) or not values:
+            raise ValueError(f"{name} needs a non-empty list of values")
+        checked[name] = [_check_value(name, value, defaults[name]) for value in values]
+    return checked
+
+
+def _jobs(
+    strategy_id: str,
+    space: dict[str, list],
+    amount: float,
+    samples: int | None,
+    seed: int | None,
+) -> list[tuple[str, dict, float]]:
+    defaults = default_params(strategy_id)
+    space = check_space(strategy_id, space, defaults)
+    count = min(samples, grid_size(space)) if samples else grid_size(space)
+    if count > MAX_COMBINATIONS:
+        raise ValueError(f"{count} combinations exceed the limit of {MAX_COMBINATIONS}")
+    combos = random_search(space, samples, seed) if samples else grid(space)
+    return [(strategy_id, {**defaults, **combo}, amount) for combo in combos]
+
+
+def _chunks(jobs: list, workers: int) -> list[list]:
+    size = max(len(jobs) // (workers * 4), 1)
+    return [jobs[i:i + size] for i in range(0, len(jobs), size)]
+
+
+def _pool(workers: int, shm: shared_memory.SharedMemory, n: int) -> ProcessPoolExecutor:
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_attach,
+        initargs=(shm.name, n),
+    )
+
+
+def _rank(chunks: list[list[dict]], rank_by: str) -> list[dict]:
+    rows = [row for chunk in chunks for row in chunk]
+    # a smaller drawdown is better, every other metric is better when larger
+    rows.sort(key=lambda row: row[rank_by], reverse=rank_by != "max_drawdown")
+    return rows
+
+
+def optimize(
+    strategy_id: str,
+    candles: Candles,
+    space: dict[str, list],
+    amount: float = 100.0,
+    samples: int | None = None,
+    rank_by: str = "total_profit",
+    workers: int | None = None,
+    seed: int | None = None,
+) -> list[dict]:
+    """Backtest parameter combinations in parallel and rank the results.
+
+    Runs the full grid of ``space`` or, when ``samples`` is given, a random
+    subset of it.  Parameters missing from ``space`` keep the values the live
+    strategy uses.  Rows are sorted best first by ``rank_by``.
+    """
+    jobs = _jobs(strategy_id, space, amount, samples, seed)
+    workers = min(workers or OPTIMIZER_WORKERS, len(jobs)) or 1
+    shm = _share(candles)
+    try:
+        with _pool(workers, shm, len(candles)) as pool:
+            chunks = list(pool.map(_evaluate_chunk, _chunks(jobs, workers)))
+    finally:
+        shm.close()
+        shm.unlink()
+    return _rank(chunks, rank_by)
+
+
+async def optimize_async(
+    strategy_id: str,
+    candles: Candles,
+    space: dict[str, list],
+    amount: float = 100.0,
+    samples: int | None = None,
+    rank_by: str = "total_profit",
+    workers: int | None = None,
+    seed: int | None = None,
+) -> list[dict]:
+    """``optimize`` awaiting the worker processes instead of blocking a thread.
+
+    Raises 429 while ``OPTIMIZER_MAX_SWEEPS`` sweeps are already running.
+    """
+    global _sweeps
+    if _sweeps >= OPTIMIZER_MAX_SWEEPS:
+        raise HTTPException(
+            status_code=429,
+            detail="An optimization is already running, try again later",
+            headers={"Retry-After": "10"},
+        )
+    _sweeps += 1
+    try:
+        return await _sweep(strategy_id, candles, space, amount, samples, rank_by, workers, seed)
+    finally:
+        _sweeps -= 1
+
+
+async def _sweep(
+    strategy_id: str,
+    candles: Candles,
+    space: dict[str, list],
+    amount: float,
+    samples: int | None,
+    rank_by: str,
+    workers: int | None,
+    seed: int | None,
+) -> list[dict]:
+    # validating and expanding the space can take a while; keep it off the loop
+    jobs = await asyncio.to_thread(_jobs, strategy_id, space, amount, samples, seed)
+    workers = min(workers or OPTIMIZER_WORKERS, len(jobs)) or 1
+    loop = asyncio.get_running_loop()
+    shm = _share(candles)
+    pool = _pool(workers, shm, len(candles))
+    try:
+        chunks = await asyncio.gather(*(
+            loop.run_in_executor(pool, _evaluate_chunk, chunk)
+            for chunk in _chunks(jobs, workers)
+        ))
+    finally:
+        # workers keep their own mapping, so the block can go right away
+        pool.shutdown(wait=False, cancel_futures=True)
+        shm.close()
+        shm.unlink()
+    return _rank(chunks, rank_by)
+
+
+@router.post("/strategy/{strategy_id}/optimize")
+async def optimize_strategy(
+    strategy_id: str,
+    space: dict[str, list] = Body(..., embed=True),
+    samples: int | None = Body(None, embed=True),
+    amount: float = Body(100.0, embed=True),
+    start: int | None = Body(None, embed=True),
+    end: int | None = Body(None, embed=True),
+    rank_by: str = Body("total_profit", embed=True),
+    top: int = Body(50, embed=True),
+    current_user: dict = Depends(auth.get_current_user),
+):
+    """Sweep strategy parameters over the locally stored klines.
+
+    The sweep runs in worker processes and is awaited, so it holds neither
+    the event loop nor a threadpool thread while it runs.
+    """
+    strategy_id = strategy_id.lower()
+    if strategy_id not in STRATEGY_SPECS:
+        raise HTTPException(status_code=404, detail="Unknown strategy")
+    if rank_by not in ("total_profit", "trades", "win_rate", "max_drawdown"):
+        raise HTTPException(status_code=400, detail="Unknown ranking metric")
+    symbol, interval = STRATEGY_MARKETS[strategy_id]
+    candles = kline_store.get_store(symbol, interval).read(start, end)
+    if len(candles) < 2:
+        raise HTTPException(status_code=404, detail="No stored klines for this range")
+    try:
+        rows = await optimize_async(strategy_id, candles, space, amount, samples, rank_by)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    return {"strategy": strategy_id, "combinations": len(rows), "results": rows[:top]}
@@ -0,0 +1,108 @@
+"""Password hashing in a dedicated pool of worker processes.
+
+bcrypt is deliberately slow, and running it in FastAPI's shared threadpool
+let a burst of logins starve every sync endpoint of threads.  Hashes are
+computed in spawned processes instead, which also escape the GIL, and at
+most ``BCRYPT_MAX_PENDING`` operations may be queued or running; beyond
+that requests are turned away with 429 right away.
+
+This module only imports passlib so the workers start quickly.
+"""
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from fastapi import HTTPException
+from passlib.context import CryptContext
+
+BCRYPT_WORKERS = int(os.getenv("BCRYPT_WORKERS", str(min(os.cpu_count() or 1, 4))))
+# Hash operations allowed to wait or run before new ones are rejected
+BCRYPT_MAX_PENDING = int(os.getenv("BCRYPT_MAX_PENDING", str(BCRYPT_WORKERS * 8)))
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+_pool: ProcessPoolExecutor | None = None
+_pending = 0
+
+
+def verify_password(plain_password: str, hashed_password: str) -> bool:
+    return pwd_context.verify(plain_password, hashed_password)
+
+
+def hash_password(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(
+            max_workers=BCRYPT_WORKERS, mp_context=multiprocessing.get_context("spawn")
+        )
+    return _pool
+
+
+def _discard_pool(broken: ProcessPoolExecutor):
+    """Drop a pool whose worker died so the next call starts a new one."""
+    global _pool
+    if _pool is broken:
+        print("Password worker pool broken, starting a new one")
+        _pool = None
+        broken.shutdown(wait=False, cancel_futures=True)
+
+
+async def _run(fn, *args):
+    loop = asyncio.get_running_loop()
+    pool = _get_pool()
+    try:
+        return await loop.run_in_executor(pool, fn, *args)
+    except BrokenProcessPool:
+        _discard_pool(pool)
+    # retry once on a fresh pool; a second failure is not the request's fault
+    pool = _get_pool()
+    try:
+        return await loop.run_in_executor(pool, fn, *args)
+    except BrokenProcessPool:
+        _discard_pool(pool)
+        raise HTTPException(
+            status_code=503,
+            detail="Authentication temporarily unavailable",
+            headers={"Retry-After": "1"},
+        )
+
+
+async def _submit(fn, *args):
+    global _pending
+    if _pending >= BCRYPT_MAX_PENDING:
+        raise HTTPException(
+            status_code=429,
+            detail="Too many authentication requests, try again shortly",
+            headers={"Retry-After": "1"},
+        )
+    _pending += 1
+    try:
+        return await _run(fn, *args)
+    finally:
+        _pending -= 1
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """``verify_password`` in the worker pool.
+
+    Raises 429 when the pool is saturated and 503 when its workers keep dying.
+    """
+    return await _submit(verify_password, plain_password, hashed_password)
+
+
+async def hash_password_async(password: str) -> str:
+    """``hash_password`` in the worker pool; raises like ``verify_password_async``."""
+    return await _submit(hash_password, password)
+
+
+def shutdown():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
@@ -0,0 +1,210 @@
+"""Per-user profit and loss aggregates maintained incrementally.
+
+A user's aggregate is built once from all of their ``trade_summary_view``
+rows and open BUY trades, page by page, and then kept current as the trade
+journal flushes fills: each closed trade costs one summary row and an O(1)
+update instead of a full recomputation.  Writes that bypass the journal
+(the ``/trades`` endpoints) drop the aggregate so the next dashboard request
+rebuilds it.
+
+Every write also increments the user's dashboard version in Redis.  Each
+process remembers the version its aggregate reflects and rebuilds when the
+shared version moved without it, i.e. when another worker wrote trades.
+"""
+import asyncio
+import os
+from array import array
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+
+from . import cache
+from .supabase_db import async_db
+
+# Closed trades kept for the dashboard's trade history and chart
+PNL_HISTORY_SIZE = int(os.getenv("PNL_HISTORY_SIZE", "1000"))
+# Rows fetched per request while rebuilding an aggregate
+PNL_PAGE_SIZE = int(os.getenv("PNL_PAGE_SIZE", "1000"))
+
+
+def _epoch(ts: str | None) -> float | None:
+    """Seconds since the epoch of a Supabase timestamp; naive ones are UTC."""
+    if not ts:
+        return None
+    try:
+        value = datetime.fromisoformat(ts.replace("Z", "+00:00"))
+    except (AttributeError, ValueError):
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+@dataclass
+class UserPnL:
+    total_profit: float = 0.0
+    closed: int = 0
+    wins: int = 0
+    duration_minutes: float = 0.0
+    # closed trades with both timestamps, the denominator of the average
+    timed: int = 0
+    # entry trade ids already counted, so replayed rows are not added twice
+    counted: set = field(default_factory=set)
+    # entry trade id -> BUY trade not paired with a SELL yet
+    open_trades: dict[int, dict] = field(default_factory=dict)
+    # most recent closed trades, oldest first
+    history: deque = field(default_factory=lambda: deque(maxlen=PNL_HISTORY_SIZE))
+    # every closed trade with an exit time, as columns for ``rollups``
+    exit_times: array = field(default_factory=lambda: array("d"))
+    profits: array = field(default_factory=lambda: array("d"))
+    strategy_codes: array = field(default_factory=lambda: array("i"))
+    # strategy id -> its code in ``strategy_codes``
+    strategies: dict[str, int] = field(default_factory=dict)
+
+    def add_open(self, trade: dict):
+        if trade["id"] not in self.counted:
+            self.open_trades[trade["id"]] = trade
+
+    def add_closed(self, row: dict):
+        """Account one ``trade_summary_view`` row."""
+        entry_id = row.get("entry_trade_id")
+        self.open_trades.pop(entry_id, None)
+        if entry_id is not None:
+            if entry_id in self.counted:
+                return
+            self.counted.add(entry_id)
+        profit = float(row.get("profit_amount") or 0)
+        self.total_profit += profit
+        self.closed += 1
+        if profit > 0:
+            self.wins += 1
+        entry_time = _epoch(row.get("entry_timestamp"))
+        exit_time = _epoch(row.get("exit_timestamp"))
+        if exit_time is not None:
+            self.exit_times.append(exit_time)
+            self.profits.append(profit)
+            strategy = row.get("strategy_id") or ""
+            self.strategy_codes.append(self.strategies.setdefault(strategy, len(self.strategies)))
+            if entry_time is not None:
+                self.duration_minutes += (exit_time - entry_time) / 60
+                self.timed += 1
+        self.history.append(row)
+
+    @property
+    def win_rate(self) -> float:
+        return self.wins / self.closed * 100 if self.closed else 0.0
+
+    @property
+    def avg_duration(self) -> float:
+        return self.duration_minutes / self.timed if self.timed else 0.0
+
+
+AGGREGATES: dict[int, UserPnL] = {}
+# user id -> dashboard version the loaded aggregate reflects
+VERSIONS: dict[int, int] = {}
+# Held by rebuilds and by journal flushes across their write and ``apply``,
+# so a rebuild never misses rows written but not yet applied
+LOCK = asyncio.Lock()
+
+
+async def _pages(fetch, user_id: int):
+    offset = 0
+    while True:
+        page = await fetch(user_id, skip=offset, limit=PNL_PAGE_SIZE) or []
+        for row in page:
+            yield row
+        if len(page) < PNL_PAGE_SIZE:
+            return
+        offset += len(page)
+
+
+async def _save_total(user_id: int, pnl: UserPnL):
+    try:
+        await async_db.update_user_total_profit(user_id, pnl.total_profit)
+    except Exception:
+        pass
+
+
+async def rebuild(user_id: int) -> UserPnL:
+    """Recompute the aggregate from every stored trade of ``user_id``."""
+    pnl = UserPnL()
+    async for trade in _pages(async_db.get_buy_trades, user_id):
+        pnl.add_open(trade)
+    async for row in _pages(async_db.get_trade_summary, user_id):
+        pnl.add_closed(row)
+    AGGREGATES[user_id] = pnl
+    await _save_total(user_id, pnl)
+    return pnl
+
+
+async def get(user_id: int, version: int | None = None) -> UserPnL:
+    """The aggregate of ``user_id``, rebuilt if missing or out of date.
+
+    ``version`` is the user's current dashboard version if the caller has
+    just read it; ``None`` means it is unknown or Redis is unavailable.
+    """
+    pnl = AGGREGATES.get(user_id)
+    if pnl is not None and (version is None or VERSIONS.get(user_id) == version):
+        return pnl
+    async with LOCK:
+        # local writes hold the lock, so only other workers can move it now
+        version = await cache.get_dashboard_version(user_id)
+        pnl = AGGREGATES.get(user_id)
+        if pnl is None or (version is not None and VERSIONS.get(user_id) != version):
+            pnl = await rebuild(user_id)
+            if version is not None:
+                VERSIONS[user_id] = version
+    return pnl
+
+
+def invalidate(user_id: int):
+    """Drop the aggregate after a write the journal did not see."""
+    AGGREGATES.pop(user_id, None)
+    VERSIONS.pop(user_id, None)
+
+
+def changed(user_id: int):
+    """Record a trade write made outside the journal (blocking)."""
+    invalidate(user_id)
+    cache.bump_dashboard_version(user_id)
+
+
+async def written(user_ids: set[int]):
+    """Publish journal writes already folded in by ``apply``.
+
+    Called with ``LOCK`` held.  An aggregate stays valid only if no other
+    worker bumped the version since it was last brought up to date.
+    """
+    for user_id in user_ids:
+        version = await cache.abump_dashboard_version(user_id)
+        if version is None or user_id not in AGGREGATES:
+            continue
+        if VERSIONS.get(user_id) == version - 1:
+            VERSIONS[user_id] = version
+        else:
+            invalidate(user_id)
+
+
+async def apply(opened: list[dict], closed_entry_ids: list[int]):
+    """Fold freshly written trades into the loaded aggregates.
+
+    ``opened`` are new BUY trade rows and ``closed_entry_ids`` the ids of
+    BUY trades just paired with a SELL.  Callers hold ``LOCK`` around both
+    the write and this call.  Users without a loaded aggregate are skipped;
+    their next rebuild reads the new rows anyway.
+    """
+    for trade in opened:
+        pnl = AGGREGATES.get(trade["owner_id"])
+        if pnl is not None:
+            pnl.add_open(trade)
+    if not closed_entry_ids or not AGGREGATES:
+        return
+    rows = await async_db.get_trade_summary_for_entries(closed_entry_ids) or []
+    changed = set()
+    for row in rows:
+        pnl = AGGREGATES.get(row.get("owner_id"))
+        if pnl is not None:
+            pnl.add_closed(row)
+            changed.add(row["owner_id"])
+    for user_id in changed:
+        await _save_total(user_id, AGGREGATES[user_id])
@@ -0,0 +1,131 @@
+"""Time-bucketed P&L series of closed trades and chart downsampling.
+
+Trades are bucketed with NumPy over the columns kept by ``pnl.UserPnL``, so
+a rollup of tens of thousands of 1m-strategy trades is a handful of array
+operations.  Series longer than the requested number of points are thinned
+with Largest-Triangle-Three-Buckets on the cumulative P&L curve, which keeps
+the peaks and troughs a chart needs.  Each kept point then stands for every
+bucket since the previous one, so per-point profit and trade counts still
+add up to the totals.
+"""
+from datetime import datetime, timezone
+
+import numpy as np
+
+# Bucket width in seconds of each resolution
+RESOLUTIONS = {
+    "minute": 60,
+    "hour": 3600,
+    "day": 86400,
+    "week": 7 * 86400,
+}
+# Weeks start on Monday; the epoch fell on a Thursday
+_ORIGINS = {"week": 4 * 86400}
+
+
+def rollup(times: np.ndarray, profits: np.ndarray, resolution: str) -> dict[str, np.ndarray]:
+    """Bucket trades by exit time into P&L, win rate and drawdown columns.
+
+    ``drawdown`` is measured on the cumulative P&L at bucket closes, from a
+    peak that starts at zero.
+    """
+    width = RESOLUTIONS[resolution]
+    origin = _ORIGINS.get(resolution, 0)
+    keys = np.floor((times - origin) / width).astype(np.int64)
+    buckets, inverse = np.unique(keys, return_inverse=True)
+    pnl = np.bincount(inverse, weights=profits, minlength=len(buckets))
+    trades = np.bincount(inverse, minlength=len(buckets))
+    wins = np.bincount(inverse, weights=profits > 0, minlength=len(buckets))
+    cumulative = np.cumsum(pnl)
+    peak = np.maximum.accumulate(np.maximum(cumulative, 0.0))
+    return {
+        "time": buckets * width + origin,
+        "profit": pnl,
+        "trades": trades,
+        "wins": wins,
+        "win_rate": np.divide(wins * 100, trades, out=np.zeros(len(buckets)), where=trades > 0),
+        "cumulative": cumulative,
+        "drawdown": peak - cumulative,
+    }
+
+
+def lttb(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """Indices of ``threshold`` points chosen by Largest-Triangle-Three-Buckets."""
+    n = len(x)
+    if threshold >= n:
+        return np.arange(n)
+    if threshold < 3:
+        # a single point is the last one, which closes the whole curve
+        return np.array([0, n - 1][max(2 - threshold, 0):], dtype=np.int64)
+    x = x.astype(np.float64)
+    y = y.astype(np.float64)
+    # interior points split into threshold - 2 buckets; the ends are kept
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        following = slice(end, edges[i + 2]) if i + 2 < len(edges) else slice(n - 1, n)
+        cx, cy = x[following].mean(), y[following].mean()
+        area = np.abs((x[a] - cx) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (cy - y[a]))
+        a = start + int(area.argmax())
+        selected[i + 1] = a
+    return selected
+
+
+def merge(columns: dict[str, np.ndarray], keep: np.ndarray) -> dict[str, np.ndarray]:
+    """Rollup columns at the ``keep`` indices, each merged with the buckets before it.
+
+    ``keep`` must be increasing and end at the last bucket.  Profit, trades
+    and wins are summed over each span and the win rate recomputed from them;
+    cumulative P&L and drawdown are the values at the kept bucket's close.
+    """
+    starts = np.concatenate([[0], keep[:-1] + 1])
+    merged = {name: columns[name][keep] for name in ("time", "cumulative", "drawdown")}
+    for name in ("profit", "trades", "wins"):
+        merged[name] = np.add.reduceat(columns[name], starts)
+    trades = merged["trades"]
+    merged["win_rate"] = np.divide(
+        merged["wins"] * 100, trades, out=np.zeros(len(keep)), where=trades > 0
+    )
+    return merged
+
+
+def _points(columns: dict[str, np.ndarray], max_points: int) -> list[dict]:
+    if len(columns["time"]) > max_points:
+        # LTTB only picks where the curve is split; every bucket still counts
+        keep = lttb(columns["time"], columns["cumulative"], max_points)
+        columns = merge(columns, keep)
+    return [
+        {
+            "time": datetime.fromtimestamp(int(t), timezone.utc).isoformat(),
+            "profit": float(profit),
+            "trades": int(trades),
+            "win_rate": float(win_rate),
+            "cumulative": float(cumulative),
+            "drawdown": float(drawdown),
+        }
+        for t, profit, trades, win_rate, cumulative, drawdown in zip(
+            columns["time"], columns["profit"], columns["trades"],
+            columns["win_rate"], columns["cumulative"], columns["drawdown"],
+        )
+    ]
+
+
+def series(
+    times: np.ndarray,
+    profits: np.ndarray,
+    strategy_codes: np.ndarray,
+    strategies: dict[str, int],
+    resolution: str,
+    max_points: int,
+) -> dict:
+    """Downsampled rollups over all trades and per strategy."""
+    result = {"total": _points(rollup(times, profits, resolution), max_points), "strategies": {}}
+    for strategy, code in strategies.items():
+        mask = strategy_codes == code
+        result["strategies"][strategy] = _points(
+            rollup(times[mask], profits[mask], resolution), max_points
+        )
+    return result
@@ -0,0 +1,75 @@
+"""Wake-up timing aligned to exchange candle closes."""
+import asyncio
+import os
+import time
+
+# Seconds to wait after a candle closes before fetching it, giving the
+# exchange time to publish the final values
+CANDLE_CLOSE_GRACE_SECONDS = float(os.getenv("CANDLE_CLOSE_GRACE_SECONDS", "1.5"))
+# How often the offset to the exchange clock is re-measured
+CLOCK_SYNC_SECONDS = float(os.getenv("CLOCK_SYNC_SECONDS", "3600"))
+
+# Kline intervals whose candles are aligned to multiples of their length
+INTERVAL_MS = {
+    "1m": 60_000,
+    "3m": 3 * 60_000,
+    "5m": 5 * 60_000,
+    "15m": 15 * 60_000,
+    "30m": 30 * 60_000,
+    "1h": 3_600_000,
+    "2h": 2 * 3_600_000,
+    "4h": 4 * 3_600_000,
+    "6h": 6 * 3_600_000,
+    "8h": 8 * 3_600_000,
+    "12h": 12 * 3_600_000,
+    "1d": 86_400_000,
+}
+
+
+def interval_ms(interval: str) -> int:
+    try:
+        return INTERVAL_MS[interval]
+    except KeyError:
+        raise ValueError(f"Unsupported kline interval: {interval}") from None
+
+
+class ServerClock:
+    """Local clock corrected by the measured offset to the exchange clock."""
+
+    def __init__(self):
+        self.offset_ms = 0
+        self.synced_at = 0.0
+
+    async def sync(self, exchange):
+        before = time.time() * 1000
+        server_ms = (await exchange.get_server_time())["serverTime"]
+        after = time.time() * 1000
+        self.offset_ms = int(server_ms - (before + after) / 2)
+        self.synced_at = time.monotonic()
+
+    async def maybe_sync(self, exchange):
+        """Re-measure the offset if it is older than ``CLOCK_SYNC_SECONDS``."""
+        if self.synced_at and time.monotonic() - self.synced_at < CLOCK_SYNC_SECONDS:
+            return
+        try:
+            await self.sync(exchange)
+        except Exception as exc:
+            print(f"Failed to sync exchange clock: {exc}")
+
+    def now_ms(self) -> int:
+        return int(time.time() * 1000) + self.offset_ms
+
+
+CLOCK = ServerClock()
+
+
+def next_close_ms(interval: str, now_ms: int) -> int:
+    """Exchange time at which the currently forming candle closes."""
+    period = interval_ms(interval)
+    return (now_ms // period + 1) * period
+
+
+async def sleep_until_close(interval: str, clock: ServerClock = CLOCK):
+    """Sleep until just after the forming candle of ``interval`` closes."""
+    delay_ms = next_close_ms(interval, clock.now_ms()) - clock.now_ms()
+    await asyncio.sleep(max(delay_ms, 0) / 1000 + CANDLE_CLOSE_GRACE_SECONDS)
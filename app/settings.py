@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException
 
 from .supabase_db import db
-from . import schemas, auth
+from . import schemas, auth, clients
 
 router = APIRouter()
 
@@ -20,4 +20,5 @@ def update_settings(
     updated = db.upsert_user_settings(
         current_user["id"], settings.binance_api_key, settings.binance_api_secret
     )
+    clients.invalidate(current_user["id"])
     return updated
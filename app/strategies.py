@@ -2,13 +2,30 @@ from fastapi import APIRouter, Depends, HTTPException, Body
 from binance.client import Client
 import pandas as pd
 import asyncio
-from datetime import datetime
 from contextvars import ContextVar
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 from . import auth
-from .supabase_db import db
-from . import crud, schemas
+from .supabase_db import async_db, db
+from . import clients, events, exchange_info, log_archive, metrics, market_data, trade_journal
+from .candles import Candles
+from .exchange import AsyncExchange
+from .indicators import IndicatorGraph
+from .logs import (
+    DEBUG,
+    DETAIL_LOG_SIZE,
+    ERROR,
+    EVENT_TYPES,
+    INFO,
+    LEVEL_NAMES,
+    LEVELS,
+    STRATEGY_LOG_LEVEL,
+    TRADE_LOG_SIZE,
+    LogRing,
+    event_type,
+    log_page,
+    record,
+)
 
 
 def _extract_order_details(order: dict) -> tuple[float, float, float]:
@@ -45,19 +62,13 @@ def _extract_order_details(order: dict) -> tuple[float, float, float]:
 
 router = APIRouter()
 
-# Mapping of available strategies to human-friendly names
-AVAILABLE_STRATEGIES = {
-    "squeeze_breakout_btc_4h": "Squeeze Breakout BTC 4H",
-    "squeeze_breakout_xrp_1h": "Squeeze Breakout XRP 1H",
-    "squeeze_breakout_doge_1h": "Squeeze Breakout DOGE 1H",
-    "squeeze_breakout_sol_4h": "Squeeze Breakout SOL 4H",
-    "hyper_frequency_ema_cross_btc_1m": "Hyper-Frequency EMA Cross BTC 1M",
-    "continuous_trend_rider_xrp_1m": "Continuous Trend Rider XRP 1M",
-}
-
 # --- LOGGING SETUP ---
 current_user_ctx: ContextVar[int | None] = ContextVar("current_user_ctx", default=None)
-STRATEGY_LOGS: dict[str, dict[str, list[str]]] = {}
+STRATEGY_LOGS: dict[str, dict[str, LogRing]] = {}
+# log key -> level set for that strategy; others use STRATEGY_LOG_LEVEL
+STRATEGY_LOG_LEVELS: dict[str, int] = {}
+# lowest level any strategy records, so most skipped events need one compare
+_min_log_level = STRATEGY_LOG_LEVEL
 
 
 def _log_key(user_id: int | None, strategy_id: str) -> str:
@@ -65,22 +76,65 @@ def _log_key(user_id: int | None, strategy_id: str) -> str:
     return f"{user_id}:{key}" if user_id is not None else key
 
 
-def log_detail(strategy_id: str, message: str):
-    """Appends a detailed, timestamped log message for a given strategy."""
+def _strategy_logs(key: str) -> dict[str, LogRing]:
+    logs = STRATEGY_LOGS.get(key)
+    if logs is None:
+        logs = STRATEGY_LOGS.setdefault(
+            key, {"detail": LogRing(DETAIL_LOG_SIZE), "trade": LogRing(TRADE_LOG_SIZE)}
+        )
+    return logs
+
+
+def _set_log_level(key: str, level: int | None):
+    global _min_log_level
+    if level is None:
+        STRATEGY_LOG_LEVELS.pop(key, None)
+    else:
+        STRATEGY_LOG_LEVELS[key] = level
+    _min_log_level = min([STRATEGY_LOG_LEVEL, *STRATEGY_LOG_LEVELS.values()])
+
+
+def log_event(strategy_id: str, kind: str, *args):
+    """Record an event of a registered ``kind`` with its raw field values.
+
+    Events below the strategy's log level return before anything is built;
+    recorded ones are rendered to text only when a client reads them.
+    """
+    level = EVENT_TYPES[kind][0]
+    if level < _min_log_level:
+        return
     user_id = current_user_ctx.get()
     key = _log_key(user_id, strategy_id)
-    logs = STRATEGY_LOGS.setdefault(key, {"detail": [], "trade": []})
-    if len(logs["detail"]) > 200:
-        logs["detail"].pop(0)
-    timestamp = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S UTC")
-    logs["detail"].append(f"[{timestamp}] {message}")
+    if level < STRATEGY_LOG_LEVELS.get(key, STRATEGY_LOG_LEVEL):
+        return
+    rec = record(kind, *args)
+    _strategy_logs(key)["detail"].append(rec)
+    events.HUB.publish(user_id, {"type": "detail", "strategy": strategy_id.lower(), "record": rec})
+    log_archive.ARCHIVE.append(user_id, strategy_id, "detail", rec)
+
+
+def log_detail(strategy_id: str, message: str):
+    """Appends a detailed, timestamped log message for a given strategy."""
+    log_event(strategy_id, "message", message)
 
 
 def _log(strategy_id: str, message: str, log_type: str = "detail") -> None:
     user_id = current_user_ctx.get()
-    key = _log_key(user_id, strategy_id)
-    logs = STRATEGY_LOGS.setdefault(key, {"detail": [], "trade": []})
-    logs.setdefault(log_type, []).append(message)
+    logs = _strategy_logs(_log_key(user_id, strategy_id))
+    ring = logs.get(log_type)
+    if ring is None:
+        ring = logs.setdefault(log_type, LogRing(DETAIL_LOG_SIZE))
+    ring.append(message)
+    events.HUB.publish(user_id, {"type": log_type, "strategy": strategy_id.lower(), "line": message})
+    log_archive.ARCHIVE.append(user_id, strategy_id, log_type, record("message", message))
+
+
+def _log_trade(user_id: int, message: str) -> None:
+    """Add a buy/sell event to the user's log across all strategies."""
+    ring = GLOBAL_TRADE_LOGS.get(user_id)
+    if ring is None:
+        ring = GLOBAL_TRADE_LOGS.setdefault(user_id, LogRing(TRADE_LOG_SIZE))
+    ring.append(message)
 
 
 # --- INDICATOR HELPER FUNCTIONS ---
@@ -132,331 +186,225 @@ class Position:
     price: float
     quantity: float
     commission: float
-    trade_id: int | None = None
+    # trade journal reference and UTC time of the entry fill
+    ref: str | None = None
+    time: str | None = None
 
 OPEN_POSITION: dict[tuple[int, str], Position | None] = {}
 
 # history of completed trades for profit reporting
 TRADE_HISTORY: dict[tuple[int, str], list[dict[str, float]]] = {}
 # aggregated logs of buy/sell events for display on strategy page
-GLOBAL_TRADE_LOGS: dict[int, list[str]] = {}
+GLOBAL_TRADE_LOGS: dict[int, LogRing] = {}
 
 
-# --- STRATEGY CLASSES with DETAILED LOGGING ---
+def _running_tasks() -> dict[tuple[str], int]:
+    counts: dict[tuple[str], int] = {}
+    for (_, strategy_id), item in list(RUNNING_TASKS.items()):
+        if not item["task"].done():
+            counts[(strategy_id,)] = counts.get((strategy_id,), 0) + 1
+    return counts
 
-class SqueezeBreakoutStrategy_BTC_4H:
-    def __init__(self):
-        self.strategy_id = "squeeze_breakout_btc_4h"
-        self.ema_length = 200
-        self.squeeze_length = 20
-        self.bb_mult = 2.0
-        self.kc_mult = 1.5
+
+metrics.Gauge(
+    "strategy_tasks_running", "Strategy loops alive, across all users.",
+    _running_tasks, ("strategy",),
+)
+
+
+# --- STRATEGY CLASSES with DETAILED LOGGING ---
+# Per-candle checks are DEBUG so they cost nothing at the default level.
+
+event_type("check", DEBUG, "--- Checking new candle ---")
+event_type("signal", INFO, "{signal} SIGNAL CONFIRMED", "signal")
+event_type("hold", DEBUG, "HOLD: {reason}", "reason")
+event_type(
+    "squeeze.trend", DEBUG,
+    "Trend: Close({close:.{precision}f}) > EMA({ema:.{precision}f})? {passed}",
+    "close", "ema", "passed", "precision",
+)
+event_type("squeeze.active", DEBUG, "Squeeze active on previous bar? {active}", "active")
+event_type(
+    "squeeze.entry", DEBUG,
+    "Entry: Close({close:.{precision}f}) > Donchian High({high:.{precision}f})? {passed}",
+    "close", "high", "passed", "precision",
+)
+event_type(
+    "squeeze.exit", DEBUG,
+    "Exit: Close({close:.{precision}f}) < Donchian Low({low:.{precision}f})? {passed}",
+    "close", "low", "passed", "precision",
+)
+event_type(
+    "hyper.volatility", DEBUG,
+    "Volatility({volatility:.3f}%) > Min({minimum}%)? {passed}",
+    "volatility", "minimum", "passed",
+)
+event_type("hyper.trend", DEBUG, "Trend: {trend}", "trend")
+event_type(
+    "hyper.crossover", DEBUG,
+    "Crossover: FastEMA({fast:.2f}) vs SlowEMA({slow:.2f})",
+    "fast", "slow",
+)
+event_type(
+    "trend_rider.close", DEBUG,
+    "Close({close:.5f}) vs EMA({length})({ema:.5f})",
+    "close", "length", "ema",
+)
+event_type(
+    "amount_adjusted", INFO, "Adjusted trade amount to MIN_NOTIONAL {min_notional}",
+    "min_notional",
+)
+event_type(
+    "entry", INFO, "Entering trade at {price:.5f} with qty {quantity}", "price", "quantity"
+)
+event_type("exit", INFO, "Exiting trade at {price:.5f}. Profit: {profit:.4f}", "price", "profit")
+event_type("order_error", ERROR, "ERROR placing {side} order: {error}", "side", "error")
+event_type("loop_error", ERROR, "ERROR in strategy loop: {error}", "error")
+
+
+class SqueezeBreakoutStrategy:
+    """Volatility squeeze breakout filtered by a long EMA trend."""
+
+    def __init__(
+        self,
+        strategy_id: str,
+        ema_length: int = 200,
+        squeeze_length: int = 20,
+        bb_mult: float = 2.0,
+        kc_mult: float = 1.5,
+        precision: int = 2,
+    ):
+        self.strategy_id = strategy_id
+        self.ema_length = ema_length
+        self.squeeze_length = squeeze_length
+        self.bb_mult = bb_mult
+        self.kc_mult = kc_mult
+        # decimals used when logging prices
+        self.precision = precision
         print(f"Initialized: {self.strategy_id}")
 
-    def check_signal(self, df: pd.DataFrame) -> str:
-        log_detail(self.strategy_id, "--- Checking new candle ---")
-        # Calculate Indicators
-        df[f"EMA_{self.ema_length}"] = ema(df["close"], self.ema_length)
-        bbl, bbu = bollinger_bands(df["close"], self.squeeze_length, self.bb_mult)
-        df["BBL"], df["BBU"] = bbl, bbu
-        kcl, kcu = keltner_channels(df, self.squeeze_length, self.kc_mult)
-        df["KCL"], df["KCU"] = kcl, kcu
-        df["don_h"] = df["high"].rolling(self.squeeze_length).max()
-        df["don_l"] = df["low"].rolling(self.squeeze_length).min()
-
-        latest = df.iloc[-1]
-        previous = df.iloc[-2]
-
-        is_bull_market = latest["close"] > latest[f"EMA_{self.ema_length}"]
-        log_detail(
-            self.strategy_id,
-            f"Trend: Close({latest['close']:.2f}) > EMA({latest[f'EMA_{self.ema_length}']:.2f})? {is_bull_market}",
-        )
+    def bind(self, graph: IndicatorGraph):
+        """Request the indicators this strategy reads from a shared graph."""
+        self.ema = graph.ema(self.ema_length)
+        self.bb = graph.bollinger(self.squeeze_length, self.bb_mult)
+        self.kc = graph.keltner(self.squeeze_length, self.kc_mult)
+        self.don_h = graph.highest(self.squeeze_length)
+        self.don_l = graph.lowest(self.squeeze_length)
+
+    def check_signal(self, candles: Candles) -> str:
+        log_event(self.strategy_id, "check")
+        p = self.precision
+        close = candles.close[-1]
+        ema_now = self.ema.value
+        bbl_prev, bbu_prev = self.bb.previous
+        kcl_prev, kcu_prev = self.kc.previous
+        don_h_prev = self.don_h.previous
+        don_l_prev = self.don_l.previous
+
+        is_bull_market = close > ema_now
+        log_event(self.strategy_id, "squeeze.trend", close, ema_now, is_bull_market, p)
         if not is_bull_market:
-            log_detail(self.strategy_id, "HOLD: Not a bull market.")
+            log_event(self.strategy_id, "hold", "Not a bull market.")
             return "HOLD"
 
-        squeeze_was_active = (previous["BBL"] > previous["KCL"]) and (
-            previous["BBU"] < previous["KCU"]
-        )
-        log_detail(self.strategy_id, f"Squeeze active on previous bar? {squeeze_was_active}")
+        squeeze_was_active = (bbl_prev > kcl_prev) and (bbu_prev < kcu_prev)
+        log_event(self.strategy_id, "squeeze.active", squeeze_was_active)
 
-        entry_signal = latest["close"] > previous["don_h"]
-        log_detail(
-            self.strategy_id,
-            f"Entry: Close({latest['close']:.2f}) > Donchian High({previous['don_h']:.2f})? {entry_signal}",
-        )
+        entry_signal = close > don_h_prev
+        log_event(self.strategy_id, "squeeze.entry", close, don_h_prev, entry_signal, p)
         if squeeze_was_active and entry_signal:
-            log_detail(self.strategy_id, "BUY SIGNAL CONFIRMED")
+            log_event(self.strategy_id, "signal", "BUY")
             return "BUY"
 
-        exit_signal = latest["close"] < previous["don_l"]
-        log_detail(
-            self.strategy_id,
-            f"Exit: Close({latest['close']:.2f}) < Donchian Low({previous['don_l']:.2f})? {exit_signal}",
-        )
+        exit_signal = close < don_l_prev
+        log_event(self.strategy_id, "squeeze.exit", close, don_l_prev, exit_signal, p)
         if exit_signal:
-            log_detail(self.strategy_id, "SELL SIGNAL CONFIRMED")
+            log_event(self.strategy_id, "signal", "SELL")
             return "SELL"
 
-        log_detail(self.strategy_id, "HOLD: No entry or exit conditions met.")
+        log_event(self.strategy_id, "hold", "No entry or exit conditions met.")
         return "HOLD"
 
 
 class HyperFrequencyEMAStrategy:
-    """Hyper-Frequency EMA Cross strategy hard coded for BTCUSDT 1m."""
-
-    def __init__(self):
-        self.strategy_id = "hyper_frequency_ema_cross_btc_1m"
-        self.symbol = "BTCUSDT"
-        self.interval = "1m"
+    """Hyper-Frequency EMA Cross strategy."""
+
+    def __init__(
+        self,
+        strategy_id: str,
+        ema_long_len: int = 200,
+        ema_fast_len: int = 5,
+        ema_slow_len: int = 10,
+        atr_len_vol: int = 20,
+        min_vol_percent: float = 0.05,
+    ):
+        self.strategy_id = strategy_id
 
         # strategy parameters
-        self.ema_long_len = 200
-        self.ema_fast_len = 5
-        self.ema_slow_len = 10
-        self.atr_len_vol = 20
-        self.min_vol_percent = 0.05
+        self.ema_long_len = ema_long_len
+        self.ema_fast_len = ema_fast_len
+        self.ema_slow_len = ema_slow_len
+        self.atr_len_vol = atr_len_vol
+        self.min_vol_percent = min_vol_percent
 
         # used by _run_strategy_loop for lookback calculation
         self.ema_length = self.ema_long_len
         self.squeeze_length = self.atr_len_vol
 
-        print(
-            f"Initialized: {self.strategy_id} for {self.symbol} on {self.interval}"
-        )
+        print(f"Initialized: {self.strategy_id}")
 
-    def check_signal(self, df: pd.DataFrame) -> str:
-        log_detail(self.strategy_id, "--- Checking new candle ---")
+    def bind(self, graph: IndicatorGraph):
+        self.ema_long = graph.ema(self.ema_long_len)
+        self.ema_fast = graph.ema(self.ema_fast_len)
+        self.ema_slow = graph.ema(self.ema_slow_len)
+        self.atr = graph.atr(self.atr_len_vol)
 
-        df[f"EMA_{self.ema_long_len}"] = ema(df["close"], self.ema_long_len)
-        df[f"EMA_{self.ema_fast_len}"] = ema(df["close"], self.ema_fast_len)
-        df[f"EMA_{self.ema_slow_len}"] = ema(df["close"], self.ema_slow_len)
-        df[f"ATR_{self.atr_len_vol}"] = atr(df, self.atr_len_vol)
+    def check_signal(self, candles: Candles) -> str:
+        log_event(self.strategy_id, "check")
 
-        latest = df.iloc[-1]
-        previous = df.iloc[-2]
+        close = candles.close[-1]
+        ema_long = self.ema_long.value
 
-        vol_pct = (latest[f"ATR_{self.atr_len_vol}"] / latest["close"]) * 100
+        vol_pct = (self.atr.value / close) * 100
         has_vol = vol_pct > self.min_vol_percent
-        log_detail(
-            self.strategy_id,
-            f"Volatility({vol_pct:.3f}%) > Min({self.min_vol_percent}%)? {has_vol}",
-        )
+        log_event(self.strategy_id, "hyper.volatility", vol_pct, self.min_vol_percent, has_vol)
         if not has_vol:
-            log_detail(self.strategy_id, "HOLD: Market too flat")
+            log_event(self.strategy_id, "hold", "Market too flat")
             return "HOLD"
 
-        is_bull = latest["close"] > latest[f"EMA_{self.ema_long_len}"]
-        is_bear = latest["close"] < latest[f"EMA_{self.ema_long_len}"]
+        is_bull = close > ema_long
+        is_bear = close < ema_long
         trend_msg = "Bullish" if is_bull else "Bearish" if is_bear else "Neutral"
-        log_detail(self.strategy_id, f"Trend: {trend_msg}")
+        log_event(self.strategy_id, "hyper.trend", trend_msg)
 
-        fast_prev = previous[f"EMA_{self.ema_fast_len}"]
-        slow_prev = previous[f"EMA_{self.ema_slow_len}"]
-        fast_now = latest[f"EMA_{self.ema_fast_len}"]
-        slow_now = latest[f"EMA_{self.ema_slow_len}"]
+        fast_prev = self.ema_fast.previous
+        slow_prev = self.ema_slow.previous
+        fast_now = self.ema_fast.value
+        slow_now = self.ema_slow.value
 
         long_entry = fast_prev <= slow_prev and fast_now > slow_now
         short_entry = fast_prev >= slow_prev and fast_now < slow_now
 
-        log_detail(
-            self.strategy_id,
-            f"Crossover: FastEMA({fast_now:.2f}) vs SlowEMA({slow_now:.2f})",
-        )
+        log_event(self.strategy_id, "hyper.crossover", fast_now, slow_now)
 
         if is_bull and long_entry:
-            log_detail(self.strategy_id, "BUY SIGNAL CONFIRMED")
+            log_event(self.strategy_id, "signal", "BUY")
             return "BUY"
 
         if is_bear and short_entry:
-            log_detail(self.strategy_id, "SELL SIGNAL CONFIRMED")
+            log_event(self.strategy_id, "signal", "SELL")
             return "SELL"
 
-        log_detail(self.strategy_id, "HOLD: No action, conditions not met")
+        log_event(self.strategy_id, "hold", "No action, conditions not met")
         return "HOLD"
 
 
-class SqueezeBreakoutStrategy_XRP_1H:
-    def __init__(self):
-        self.strategy_id = "squeeze_breakout_xrp_1h"
-        self.ema_length = 200
-        self.squeeze_length = 20
-        self.bb_mult = 2.0
-        self.kc_mult = 1.5
-        print(f"Initialized: {self.strategy_id}")
-
-    def check_signal(self, df: pd.DataFrame) -> str:
-        log_detail(self.strategy_id, "--- Checking new candle ---")
-        df[f"EMA_{self.ema_length}"] = ema(df["close"], self.ema_length)
-        bbl, bbu = bollinger_bands(df["close"], self.squeeze_length, self.bb_mult)
-        df["BBL"], df["BBU"] = bbl, bbu
-        kcl, kcu = keltner_channels(df, self.squeeze_length, self.kc_mult)
-        df["KCL"], df["KCU"] = kcl, kcu
-        df["don_h"] = df["high"].rolling(self.squeeze_length).max()
-        df["don_l"] = df["low"].rolling(self.squeeze_length).min()
-
-        latest = df.iloc[-1]
-        previous = df.iloc[-2]
-
-        is_bull_market = latest["close"] > latest[f"EMA_{self.ema_length}"]
-        log_detail(
-            self.strategy_id,
-            f"Trend: Close({latest['close']:.4f}) > EMA({latest[f'EMA_{self.ema_length}']:.4f})? {is_bull_market}",
-        )
-        if not is_bull_market:
-            log_detail(self.strategy_id, "HOLD: Not a bull market.")
-            return "HOLD"
-
-        squeeze_was_active = (previous["BBL"] > previous["KCL"]) and (
-            previous["BBU"] < previous["KCU"]
-        )
-        log_detail(self.strategy_id, f"Squeeze active on previous bar? {squeeze_was_active}")
-
-        entry_signal = latest["close"] > previous["don_h"]
-        log_detail(
-            self.strategy_id,
-            f"Entry: Close({latest['close']:.4f}) > Donchian High({previous['don_h']:.4f})? {entry_signal}",
-        )
-        if squeeze_was_active and entry_signal:
-            log_detail(self.strategy_id, "BUY SIGNAL CONFIRMED")
-            return "BUY"
+class ContinuousTrendRiderStrategy:
+    """Continuous Trend Rider: long above the EMA, flat below it."""
 
-        exit_signal = latest["close"] < previous["don_l"]
-        log_detail(
-            self.strategy_id,
-            f"Exit: Close({latest['close']:.4f}) < Donchian Low({previous['don_l']:.4f})? {exit_signal}",
-        )
-        if exit_signal:
-            log_detail(self.strategy_id, "SELL SIGNAL CONFIRMED")
-            return "SELL"
-
-        log_detail(self.strategy_id, "HOLD: No entry or exit conditions met.")
-        return "HOLD"
-
-
-class SqueezeBreakoutStrategy_DOGE_1H:
-    def __init__(self):
-        self.strategy_id = "squeeze_breakout_doge_1h"
-        self.ema_length = 200
-        self.squeeze_length = 20
-        self.bb_mult = 2.0
-        self.kc_mult = 1.5
-        print(f"Initialized: {self.strategy_id}")
-
-    def check_signal(self, df: pd.DataFrame) -> str:
-        log_detail(self.strategy_id, "--- Checking new candle ---")
-        df[f"EMA_{self.ema_length}"] = ema(df["close"], self.ema_length)
-        bbl, bbu = bollinger_bands(df["close"], self.squeeze_length, self.bb_mult)
-        df["BBL"], df["BBU"] = bbl, bbu
-        kcl, kcu = keltner_channels(df, self.squeeze_length, self.kc_mult)
-        df["KCL"], df["KCU"] = kcl, kcu
-        df["don_h"] = df["high"].rolling(self.squeeze_length).max()
-        df["don_l"] = df["low"].rolling(self.squeeze_length).min()
-
-        latest = df.iloc[-1]
-        previous = df.iloc[-2]
-
-        is_bull_market = latest["close"] > latest[f"EMA_{self.ema_length}"]
-        log_detail(
-            self.strategy_id,
-            f"Trend: Close({latest['close']:.4f}) > EMA({latest[f'EMA_{self.ema_length}']:.4f})? {is_bull_market}",
-        )
-        if not is_bull_market:
-            log_detail(self.strategy_id, "HOLD: Not a bull market.")
-            return "HOLD"
-
-        squeeze_was_active = (previous["BBL"] > previous["KCL"]) and (
-            previous["BBU"] < previous["KCU"]
-        )
-        log_detail(self.strategy_id, f"Squeeze active on previous bar? {squeeze_was_active}")
-
-        entry_signal = latest["close"] > previous["don_h"]
-        log_detail(
-            self.strategy_id,
-            f"Entry: Close({latest['close']:.4f}) > Donchian High({previous['don_h']:.4f})? {entry_signal}",
-        )
-        if squeeze_was_active and entry_signal:
-            log_detail(self.strategy_id, "BUY SIGNAL CONFIRMED")
-            return "BUY"
-
-        exit_signal = latest["close"] < previous["don_l"]
-        log_detail(
-            self.strategy_id,
-            f"Exit: Close({latest['close']:.4f}) < Donchian Low({previous['don_l']:.4f})? {exit_signal}",
-        )
-        if exit_signal:
-            log_detail(self.strategy_id, "SELL SIGNAL CONFIRMED")
-            return "SELL"
-
-        log_detail(self.strategy_id, "HOLD: No entry or exit conditions met.")
-        return "HOLD"
-
-
-class SqueezeBreakoutStrategy_SOL_4H:
-    def __init__(self):
-        self.strategy_id = "squeeze_breakout_sol_4h"
-        self.ema_length = 200
-        self.squeeze_length = 20
-        self.bb_mult = 2.0
-        self.kc_mult = 1.5
-        print(f"Initialized: {self.strategy_id}")
-
-    def check_signal(self, df: pd.DataFrame) -> str:
-        log_detail(self.strategy_id, "--- Checking new candle ---")
-        df[f"EMA_{self.ema_length}"] = ema(df["close"], self.ema_length)
-        bbl, bbu = bollinger_bands(df["close"], self.squeeze_length, self.bb_mult)
-        df["BBL"], df["BBU"] = bbl, bbu
-        kcl, kcu = keltner_channels(df, self.squeeze_length, self.kc_mult)
-        df["KCL"], df["KCU"] = kcl, kcu
-        df["don_h"] = df["high"].rolling(self.squeeze_length).max()
-        df["don_l"] = df["low"].rolling(self.squeeze_length).min()
-
-        latest = df.iloc[-1]
-        previous = df.iloc[-2]
-
-        is_bull_market = latest["close"] > latest[f"EMA_{self.ema_length}"]
-        log_detail(
-            self.strategy_id,
-            f"Trend: Close({latest['close']:.2f}) > EMA({latest[f'EMA_{self.ema_length}']:.2f})? {is_bull_market}",
-        )
-        if not is_bull_market:
-            log_detail(self.strategy_id, "HOLD: Not a bull market.")
-            return "HOLD"
-
-        squeeze_was_active = (previous["BBL"] > previous["KCL"]) and (
-            previous["BBU"] < previous["KCU"]
-        )
-        log_detail(self.strategy_id, f"Squeeze active on previous bar? {squeeze_was_active}")
-
-        entry_signal = latest["close"] > previous["don_h"]
-        log_detail(
-            self.strategy_id,
-            f"Entry: Close({latest['close']:.2f}) > Donchian High({previous['don_h']:.2f})? {entry_signal}",
-        )
-        if squeeze_was_active and entry_signal:
-            log_detail(self.strategy_id, "BUY SIGNAL CONFIRMED")
-            return "BUY"
-
-        exit_signal = latest["close"] < previous["don_l"]
-        log_detail(
-            self.strategy_id,
-            f"Exit: Close({latest['close']:.2f}) < Donchian Low({previous['don_l']:.2f})? {exit_signal}",
-        )
-        if exit_signal:
-            log_detail(self.strategy_id, "SELL SIGNAL CONFIRMED")
-            return "SELL"
-
-        log_detail(self.strategy_id, "HOLD: No entry or exit conditions met.")
-        return "HOLD"
-
-
-class ContinuousTrendRider_XRP_1M:
-    """Continuous Trend Rider strategy for XRPUSDT 1m."""
-
-    def __init__(self):
-        self.strategy_id = "continuous_trend_rider_xrp_1m"
-        self.ema_len = 5
+    def __init__(self, strategy_id: str, ema_len: int = 5):
+        self.strategy_id = strategy_id
+        self.ema_len = ema_len
 
         # used by _run_strategy_loop for lookback calculation
         self.ema_length = self.ema_len
@@ -464,66 +412,82 @@ class ContinuousTrendRider_XRP_1M:
 
         print(f"Initialized: {self.strategy_id}")
 
-    def check_signal(self, df: pd.DataFrame) -> str:
-        log_detail(self.strategy_id, "--- Checking new candle ---")
+    def bind(self, graph: IndicatorGraph):
+        self.ema = graph.ema(self.ema_len)
 
-        df[f"EMA_{self.ema_len}"] = ema(df["close"], self.ema_len)
+    def check_signal(self, candles: Candles) -> str:
+        log_event(self.strategy_id, "check")
 
-        latest = df.iloc[-1]
+        close = candles.close[-1]
+        ema_now = self.ema.value
 
-        is_bullish = latest["close"] > latest[f"EMA_{self.ema_len}"]
-        is_bearish = latest["close"] < latest[f"EMA_{self.ema_len}"]
+        is_bullish = close > ema_now
+        is_bearish = close < ema_now
 
-        log_detail(
-            self.strategy_id,
-            f"Close({latest['close']:.5f}) vs EMA({self.ema_len})({latest[f'EMA_{self.ema_len}']:.5f})",
-        )
+        log_event(self.strategy_id, "trend_rider.close", close, self.ema_len, ema_now)
 
         if is_bullish:
-            log_detail(self.strategy_id, "BUY SIGNAL CONFIRMED")
+            log_event(self.strategy_id, "signal", "BUY")
             return "BUY"
 
         if is_bearish:
-            log_detail(self.strategy_id, "SELL SIGNAL CONFIRMED")
+            log_event(self.strategy_id, "signal", "SELL")
             return "SELL"
 
-        log_detail(self.strategy_id, "HOLD: Price exactly on EMA")
+        log_event(self.strategy_id, "hold", "Price exactly on EMA")
         return "HOLD"
 
 
-# Mapping from strategy ids to their class implementations
-STRATEGY_CLASSES = {
-    "squeeze_breakout_btc_4h": SqueezeBreakoutStrategy_BTC_4H,
-    "squeeze_breakout_xrp_1h": SqueezeBreakoutStrategy_XRP_1H,
-    "squeeze_breakout_doge_1h": SqueezeBreakoutStrategy_DOGE_1H,
-    "squeeze_breakout_sol_4h": SqueezeBreakoutStrategy_SOL_4H,
-    "hyper_frequency_ema_cross_btc_1m": HyperFrequencyEMAStrategy,
-    "continuous_trend_rider_xrp_1m": ContinuousTrendRider_XRP_1M,
-}
+@dataclass(frozen=True)
+class StrategySpec:
+    """A strategy class run with fixed parameters on one market."""
+
+    strategy_id: str
+    name: str
+    factory: type
+    symbol: str
+    interval: str
+    params: dict = field(default_factory=dict)
+
+    def build(self, **overrides):
+        return self.factory(self.strategy_id, **{**self.params, **overrides})
+
+
+_SPECS = [
+    StrategySpec(
+        "squeeze_breakout_btc_4h", "Squeeze Breakout BTC 4H",
+        SqueezeBreakoutStrategy, "BTCUSDT", Client.KLINE_INTERVAL_4HOUR,
+    ),
+    StrategySpec(
+        "squeeze_breakout_xrp_1h", "Squeeze Breakout XRP 1H",
+        SqueezeBreakoutStrategy, "XRPUSDT", Client.KLINE_INTERVAL_1HOUR, {"precision": 4},
+    ),
+    StrategySpec(
+        "squeeze_breakout_doge_1h", "Squeeze Breakout DOGE 1H",
+        SqueezeBreakoutStrategy, "DOGEUSDT", Client.KLINE_INTERVAL_1HOUR, {"precision": 4},
+    ),
+    StrategySpec(
+        "squeeze_breakout_sol_4h", "Squeeze Breakout SOL 4H",
+        SqueezeBreakoutStrategy, "SOLUSDT", Client.KLINE_INTERVAL_4HOUR,
+    ),
+    StrategySpec(
+        "hyper_frequency_ema_cross_btc_1m", "Hyper-Frequency EMA Cross BTC 1M",
+        HyperFrequencyEMAStrategy, "BTCUSDT", Client.KLINE_INTERVAL_1MINUTE,
+    ),
+    StrategySpec(
+        "continuous_trend_rider_xrp_1m", "Continuous Trend Rider XRP 1M",
+        ContinuousTrendRiderStrategy, "XRPUSDT", Client.KLINE_INTERVAL_1MINUTE,
+    ),
+]
+
+# Registered strategies by id
+STRATEGY_SPECS: dict[str, StrategySpec] = {spec.strategy_id: spec for spec in _SPECS}
 
-def _get_client(user_id: int) -> Client:
-    settings = db.get_user_settings(user_id)
-    if not settings:
-        raise HTTPException(status_code=400, detail="Binance API keys not configured")
-    return Client(settings["binance_api_key"], settings["binance_api_secret"])
-
-
-def _get_min_notional(client: Client, symbol: str) -> float:
-    """Return the MIN_NOTIONAL filter for a symbol if available."""
-    try:
-        info = client.get_symbol_info(symbol)
-    except Exception:
-        return 0.0
-    if not info:
-        return 0.0
-    for f in info.get("filters", []):
-        if f.get("filterType") == "MIN_NOTIONAL":
-            try:
-                return float(f.get("minNotional", 0))
-            except (TypeError, ValueError):
-                return 0.0
-    return 0.0
+# Mapping of available strategies to human-friendly names
+AVAILABLE_STRATEGIES = {sid: spec.name for sid, spec in STRATEGY_SPECS.items()}
 
+# Symbol and kline interval traded by each strategy
+STRATEGY_MARKETS = {sid: (spec.symbol, spec.interval) for sid, spec in STRATEGY_SPECS.items()}
 
 @router.post("/strategy/test/buy")
 def test_buy(
@@ -531,8 +495,8 @@ def test_buy(
     amount: float = Body(..., embed=True),
     current_user: dict = Depends(auth.get_current_user),
 ):
-    client = _get_client(current_user["id"])
-    min_notional = _get_min_notional(client, symbol.upper())
+    client = clients.get_client(current_user["id"])
+    min_notional = exchange_info.min_notional(symbol, client)
     if amount < min_notional:
         amount = min_notional
         _log("manual", f"Adjusted buy amount to MIN_NOTIONAL {min_notional}")
@@ -550,10 +514,7 @@ def test_buy(
         current_user_ctx.reset(token)
     qty = order.get("executedQty", amount)
     _log("manual", f"BUY {symbol.upper()} qty {qty}", "trade")
-    logs = GLOBAL_TRADE_LOGS.setdefault(current_user["id"], [])
-    logs.append(f"BUY {symbol.upper()} qty {qty}")
-    if len(logs) > 1000:
-        logs.pop(0)
+    _log_trade(current_user["id"], f"BUY {symbol.upper()} qty {qty}")
     _log("manual", f"Placed market BUY order for {symbol.upper()} amount {amount}")
     return {"buy": order}
 
@@ -564,8 +525,8 @@ def test_sell(
     amount: float = Body(..., embed=True),
     current_user: dict = Depends(auth.get_current_user),
 ):
-    client = _get_client(current_user["id"])
-    min_notional = _get_min_notional(client, symbol.upper())
+    client = clients.get_client(current_user["id"])
+    min_notional = exchange_info.min_notional(symbol, client)
     if amount < min_notional:
         amount = min_notional
         _log("manual", f"Adjusted sell amount to MIN_NOTIONAL {min_notional}")
@@ -583,10 +544,7 @@ def test_sell(
         current_user_ctx.reset(token)
     qty = order.get("executedQty", amount)
     _log("manual", f"SELL {symbol.upper()} qty {qty}", "trade")
-    logs = GLOBAL_TRADE_LOGS.setdefault(current_user["id"], [])
-    logs.append(f"SELL {symbol.upper()} qty {qty}")
-    if len(logs) > 1000:
-        logs.pop(0)
+    _log_trade(current_user["id"], f"SELL {symbol.upper()} qty {qty}")
     _log("manual", f"Placed market SELL order for {symbol.upper()} amount {amount}")
     return {"sell": order}
 
@@ -595,16 +553,51 @@ def test_sell(
 def get_strategy_logs(
     strategy_id: str,
     log_type: str = "detail",
+    since: int | None = None,
+    current_user: dict = Depends(auth.get_current_user),
+):
+    """Log lines of a strategy; with ``since`` only those after that cursor.
+
+    Pass the returned ``next`` as ``since`` to poll for new lines.
+    """
+    logs = STRATEGY_LOGS.get(_log_key(current_user["id"], strategy_id), {})
+    return log_page(logs.get(log_type), since)
+
+
+@router.get("/strategy/{strategy_id}/log_level")
+def get_strategy_log_level(
+    strategy_id: str, current_user: dict = Depends(auth.get_current_user)
+):
+    key = _log_key(current_user["id"], strategy_id)
+    return {"level": LEVEL_NAMES[STRATEGY_LOG_LEVELS.get(key, STRATEGY_LOG_LEVEL)]}
+
+
+@router.put("/strategy/{strategy_id}/log_level")
+def set_strategy_log_level(
+    strategy_id: str,
+    level: str | None = Body(..., embed=True),
     current_user: dict = Depends(auth.get_current_user),
 ):
-    logs = STRATEGY_LOGS.get(_log_key(current_user["id"], strategy_id), {"detail": [], "trade": []})
-    return {"logs": logs.get(log_type, [])}
+    """Set which events of a strategy are recorded; null restores the default.
+
+    ``debug`` also records every signal check, which costs time on each tick.
+    """
+    if level is not None and level.lower() not in LEVELS:
+        raise HTTPException(
+            status_code=400, detail=f"Level must be one of {', '.join(LEVELS)}"
+        )
+    key = _log_key(current_user["id"], strategy_id)
+    _set_log_level(key, LEVELS[level.lower()] if level is not None else None)
+    return {"level": LEVEL_NAMES[STRATEGY_LOG_LEVELS.get(key, STRATEGY_LOG_LEVEL)]}
 
 
 @router.get("/trade_logs")
-def get_all_trade_logs(current_user: dict = Depends(auth.get_current_user)):
+def get_all_trade_logs(
+    since: int | None = None,
+    current_user: dict = Depends(auth.get_current_user),
+):
     """Return aggregated buy/sell events across all strategies."""
-    return {"logs": GLOBAL_TRADE_LOGS.get(current_user["id"], [])}
+    return log_page(GLOBAL_TRADE_LOGS.get(current_user["id"]), since)
 
 
 async def _run_strategy_loop(
@@ -615,154 +608,115 @@ async def _run_strategy_loop(
     amount: float | None = None,
 ):
     """Background loop that continuously checks signals and logs trades."""
-    symbol_map = {
-        "squeeze_breakout_btc_4h": ("BTCUSDT", Client.KLINE_INTERVAL_4HOUR),
-        "squeeze_breakout_xrp_1h": ("XRPUSDT", Client.KLINE_INTERVAL_1HOUR),
-        "squeeze_breakout_doge_1h": ("DOGEUSDT", Client.KLINE_INTERVAL_1HOUR),
-        "squeeze_breakout_sol_4h": ("SOLUSDT", Client.KLINE_INTERVAL_4HOUR),
-        "hyper_frequency_ema_cross_btc_1m": ("BTCUSDT", Client.KLINE_INTERVAL_1MINUTE),
-        "continuous_trend_rider_xrp_1m": ("XRPUSDT", Client.KLINE_INTERVAL_1MINUTE),
-    }
-    symbol, interval = symbol_map[strategy_id]
-    min_notional = _get_min_notional(client, symbol)
+    symbol, interval = STRATEGY_MARKETS[strategy_id]
+    exchange = AsyncExchange(client)
+    filters = await exchange_info.EXCHANGE_INFO.filters(symbol, client)
+    min_notional = filters.min_notional if filters else 0.0
     trade_amount = amount if amount is not None else min_notional
     if trade_amount < min_notional:
         trade_amount = min_notional
-        log_detail(strategy_id, f"Adjusted trade amount to MIN_NOTIONAL {min_notional}")
+        log_event(strategy_id, "amount_adjusted", min_notional)
 
     amount = trade_amount
     limit = strategy.ema_length + strategy.squeeze_length + 50
     key = (user_id, strategy_id)
     token = current_user_ctx.set(user_id)
+    # candles come from a feed shared with every task trading this pair
+    feed = market_data.subscribe(symbol, interval, client, limit)
+    try:
+        # indicators are shared with every strategy reading the same feed
+        strategy.bind(feed.graph)
+        version = 0
+        check_seconds = metrics.CHECK_SIGNAL_SECONDS.labels(strategy_id, symbol)
+        loop_errors = metrics.STRATEGY_ERRORS.labels(strategy_id, symbol)
 
-    while True:
-        try:
-            klines = client.get_klines(symbol=symbol, interval=interval, limit=limit)
-            if not klines:
-                await asyncio.sleep(10)
-                continue
-
-            df = pd.DataFrame(
-                klines,
-                columns=[
-                    "open_time", "open", "high", "low", "close", "volume",
-                    "close_time", "quote_asset_volume", "number_of_trades",
-                    "taker_buy_base", "taker_buy_quote", "ignore",
-                ],
-            )
-            df[["open", "high", "low", "close"]] = df[["open", "high", "low", "close"]].astype(float)
-
-            signal = strategy.check_signal(df)
-            position = OPEN_POSITION.get(key)
-
-            if signal == "BUY" and position is None:
-                try:
-                    order = client.create_order(
-                        symbol=symbol, side="BUY", type="MARKET", quoteOrderQty=amount
+        while True:
+            try:
+                version, candles = await feed.wait(version)
+                with check_seconds.time():
+                    signal = strategy.check_signal(candles)
+                position = OPEN_POSITION.get(key)
+
+                if signal == "BUY" and position is None:
+                    try:
+                        order = await exchange.create_order(
+                            symbol=symbol, side="BUY", type="MARKET", quoteOrderQty=amount
+                        )
+                        entry_price, executed_qty, entry_commission = _extract_order_details(order)
+                    except Exception as exc:
+                        log_event(strategy_id, "order_error", "BUY", str(exc))
+                        await asyncio.sleep(5)
+                        continue
+
+                    # journaled locally and written to Supabase in the background
+                    opened_at = trade_journal.now()
+                    ref = trade_journal.JOURNAL.record_open(
+                        user_id, strategy_id, symbol, executed_qty, entry_price, opened_at
                     )
-                    entry_price, executed_qty, entry_commission = _extract_order_details(order)
-                except Exception as exc:
-                    log_detail(strategy_id, f"ERROR placing BUY order: {exc}")
-                    await asyncio.sleep(5)
-                    continue
-
-                trade = crud.create_trade(
-                    schemas.TradeCreate(
-                        symbol=symbol,
-                        side="BUY",
-                        quantity=executed_qty,
+                    OPEN_POSITION[key] = Position(
                         price=entry_price,
-                        strategy_id=strategy_id,
-                        status="open",
-                    ),
-                    user_id,
-                )
-                trade_id = trade.get("id") if trade else None
-                OPEN_POSITION[key] = Position(
-                    price=entry_price,
-                    quantity=executed_qty,
-                    commission=entry_commission,
-                    trade_id=trade_id,
-                )
-                # record trade log for the buy event
-                _log(strategy_id, f"BUY {symbol.upper()} qty {executed_qty}", "trade")
-                trade_logs = GLOBAL_TRADE_LOGS.setdefault(user_id, [])
-                trade_logs.append(f"BUY {symbol.upper()} qty {executed_qty}")
-                if len(trade_logs) > 1000:
-                    trade_logs.pop(0)
-                log_detail(strategy_id, f"Entering trade at {entry_price:.5f} with qty {executed_qty}")
-
-            elif signal == "SELL" and position is not None:
-                try:
-                    order = client.create_order(
-                        symbol=symbol, side="SELL", type="MARKET", quantity=position.quantity
+                        quantity=executed_qty,
+                        commission=entry_commission,
+                        ref=ref,
+                        time=opened_at,
                     )
-                    exit_price, _, exit_commission = _extract_order_details(order)
-                except Exception as exc:
-                    log_detail(strategy_id, f"ERROR placing SELL order: {exc}")
-                    await asyncio.sleep(5)
-                    continue
-
-                sell_trade = crud.create_trade(
-                    schemas.TradeCreate(
-                        symbol=symbol,
-                        side="SELL",
-                        quantity=position.quantity,
-                        price=exit_price,
-                        strategy_id=strategy_id,
-                        status="closed",
-                        related_trade_id=position.trade_id,
-                    ),
-                    user_id,
-                )
-                sell_trade_id = sell_trade.get("id") if sell_trade else None
-
-                if position.trade_id:
-                    crud.update_trade(
-                        position.trade_id,
-                        schemas.TradeCreate(
-                            symbol=symbol,
-                            side="BUY",
-                            quantity=position.quantity,
-                            price=position.price,
-                            strategy_id=strategy_id,
-                            status="closed",
-                            related_trade_id=sell_trade_id,
-                        ),
+                    # record trade log for the buy event
+                    _log(strategy_id, f"BUY {symbol.upper()} qty {executed_qty}", "trade")
+                    _log_trade(user_id, f"BUY {symbol.upper()} qty {executed_qty}")
+                    log_event(strategy_id, "entry", entry_price, executed_qty)
+
+                elif signal == "SELL" and position is not None:
+                    try:
+                        quantity = position.quantity
+                        if filters:
+                            # sell what the lot size allows; rejected locally
+                            # rather than by the exchange when it is too small
+                            quantity = filters.round_quantity(quantity)
+                            filters.validate(quantity=quantity, price=float(candles.close[-1]))
+                        order = await exchange.create_order(
+                            symbol=symbol, side="SELL", type="MARKET", quantity=quantity
+                        )
+                        exit_price, sold_qty, exit_commission = _extract_order_details(order)
+                        # the lot size rounding means less than the position may have sold
+                        sold_qty = sold_qty or quantity
+                    except Exception as exc:
+                        log_event(strategy_id, "order_error", "SELL", str(exc))
+                        await asyncio.sleep(5)
+                        continue
+
+                    trade_journal.JOURNAL.record_close(
+                        position.ref,
+                        user_id,
+                        strategy_id,
+                        symbol,
+                        sold_qty,
+                        entry_price=position.price,
+                        exit_price=exit_price,
+                        commission_entry=position.commission,
+                        commission_exit=exit_commission,
+                        entry_quantity=position.quantity,
+                        entry_time=position.time,
                     )
 
-                trade_log_data = schemas.CompletedTradeCreate(
-                    strategy_id=strategy_id,
-                    symbol=symbol,
-                    entry_price=position.price,
-                    exit_price=exit_price,
-                    quantity=position.quantity,
-                    commission_entry=position.commission,
-                    commission_exit=exit_commission,
-                )
-                crud.create_completed_trade(trade_log_data, user_id)
-
-                OPEN_POSITION[key] = None
-
-                # record trade log for the sell event
-                _log(strategy_id, f"SELL {symbol.upper()} qty {position.quantity}", "trade")
-                trade_logs = GLOBAL_TRADE_LOGS.setdefault(user_id, [])
-                trade_logs.append(f"SELL {symbol.upper()} qty {position.quantity}")
-                if len(trade_logs) > 1000:
-                    trade_logs.pop(0)
-
-                profit = (exit_price - position.price) * position.quantity - position.commission - exit_commission
-                log_detail(strategy_id, f"Exiting trade at {exit_price:.5f}. Profit: {profit:.4f}")
-
-        except asyncio.CancelledError:
-            break
-        except Exception as exc:
-            log_detail(strategy_id, f"ERROR in strategy loop: {exc}")
-            await asyncio.sleep(10)
-
-        await asyncio.sleep(5)
+                    OPEN_POSITION[key] = None
 
-    current_user_ctx.reset(token)
+                    # record trade log for the sell event
+                    _log(strategy_id, f"SELL {symbol.upper()} qty {sold_qty}", "trade")
+                    _log_trade(user_id, f"SELL {symbol.upper()} qty {sold_qty}")
+
+                    profit = (exit_price - position.price) * sold_qty - position.commission - exit_commission
+                    log_event(strategy_id, "exit", exit_price, profit)
+
+            except asyncio.CancelledError:
+                break
+            except Exception as exc:
+                loop_errors.inc()
+                log_event(strategy_id, "loop_error", str(exc))
+                await asyncio.sleep(10)
+    finally:
+        # release the shared feed even when cancelled mid-sleep
+        market_data.unsubscribe(feed)
+        current_user_ctx.reset(token)
 
 
 @router.post("/strategy/{strategy_id}/start")
@@ -775,15 +729,15 @@ async def start_strategy(
     key = (current_user["id"], strategy_id)
     if key in RUNNING_TASKS:
         raise HTTPException(status_code=400, detail="Strategy already running")
-    existing = db.get_active_user_strategy(current_user["id"], strategy_id)
+    existing = await async_db.get_active_user_strategy(current_user["id"], strategy_id)
     if existing:
         raise HTTPException(status_code=400, detail="Strategy already running")
-    cls = STRATEGY_CLASSES.get(strategy_id)
-    if not cls:
+    spec = STRATEGY_SPECS.get(strategy_id)
+    if not spec:
         raise HTTPException(status_code=404, detail="Unknown strategy")
-    client = _get_client(current_user["id"])
-    strategy = cls()
-    run = db.create_user_strategy_run(current_user["id"], strategy_id)
+    client = await clients.get_client_async(current_user["id"])
+    strategy = spec.build()
+    run = await async_db.create_user_strategy_run(current_user["id"], strategy_id)
     task = asyncio.create_task(
         _run_strategy_loop(strategy, client, current_user["id"], strategy_id, amount)
     )
@@ -793,6 +747,9 @@ async def start_strategy(
     token = current_user_ctx.set(current_user["id"])
     log_detail(strategy_id, "Strategy started")
     current_user_ctx.reset(token)
+    events.HUB.publish(
+        current_user["id"], {"type": "status", "strategy": strategy_id, "running": True}
+    )
     return {"status": "started"}
 
 
@@ -806,17 +763,20 @@ async def stop_strategy(strategy_id: str, current_user: dict = Depends(auth.get_
         item["task"].cancel()
         run_id = item.get("run_id")
     else:
-        existing = db.get_active_user_strategy(current_user["id"], strategy_id)
+        existing = await async_db.get_active_user_strategy(current_user["id"], strategy_id)
         if existing:
             run_id = existing["id"]
         else:
             raise HTTPException(status_code=404, detail="Strategy not running")
     if run_id:
-        db.stop_user_strategy_run(run_id)
+        await async_db.stop_user_strategy_run(run_id)
     OPEN_POSITION.pop(key, None)
     token = current_user_ctx.set(current_user["id"])
     log_detail(strategy_id, "Strategy stopped")
     current_user_ctx.reset(token)
+    events.HUB.publish(
+        current_user["id"], {"type": "status", "strategy": strategy_id, "running": False}
+    )
     return {"status": "stopped"}
 
 
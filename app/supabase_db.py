@@ -1,11 +1,95 @@
 import os
-import json
-from urllib import request, parse, error
+import threading
+import time
 from cryptography.fernet import Fernet
 from datetime import datetime
 
+import httpx
+
+from .metrics import SUPABASE_ERRORS, SUPABASE_SECONDS
+
+try:
+    import h2  # noqa: F401  - enables HTTP/2 in httpx
+except ImportError:
+    h2 = None
+
+# Keep-alive connections kept open to PostgREST
+SUPABASE_POOL_SIZE = int(os.getenv("SUPABASE_POOL_SIZE", "20"))
+# Seconds allowed to connect, and to wait on each read/write
+SUPABASE_CONNECT_TIMEOUT = float(os.getenv("SUPABASE_CONNECT_TIMEOUT", "5"))
+SUPABASE_TIMEOUT = float(os.getenv("SUPABASE_TIMEOUT", "10"))
+# Negotiate HTTP/2 when the server and the ``h2`` package support it
+SUPABASE_HTTP2 = os.getenv("SUPABASE_HTTP2", "1") == "1" and h2 is not None
+
+
+class RequestStats:
+    """Request count, errors, new connections and latency per method and table.
+
+    ``connections`` counts requests that had to open a TCP connection; the
+    others reused a pooled one.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats: dict[tuple[str, str], dict] = {}
+
+    def record(
+        self,
+        method: str,
+        path: str,
+        seconds: float,
+        failed: bool = False,
+        connected: bool = False,
+    ):
+        key = (method, path.split("?")[0])
+        table = key[1].lstrip("/")
+        SUPABASE_SECONDS.labels(method, table).observe(seconds)
+        if failed:
+            SUPABASE_ERRORS.labels(method, table).inc()
+        with self._lock:
+            stats = self._stats.setdefault(
+                key,
+                {
+                    "count": 0,
+                    "errors": 0,
+                    "connections": 0,
+                    "total_seconds": 0.0,
+                    "max_seconds": 0.0,
+                },
+            )
+            stats["count"] += 1
+            stats["errors"] += failed
+            stats["connections"] += connected
+            stats["total_seconds"] += seconds
+            stats["max_seconds"] = max(stats["max_seconds"], seconds)
+
+    def snapshot(self) -> dict[str, dict]:
+        with self._lock:
+            return {
+                f"{method} {path}": {
+                    **stats,
+                    "avg_seconds": stats["total_seconds"] / stats["count"],
+                }
+                for (method, path), stats in self._stats.items()
+            }
+
+
+def _first(res):
+    return res[0] if res else None
+
+
+# httpcore trace event sent when a request opens a new TCP connection
+_CONNECTED = "connection.connect_tcp.complete"
+
+
+class _SupabaseBase:
+    """Configuration and PostgREST queries shared by the sync and async clients.
+
+    Each query method hands its request to ``_call`` together with a
+    function applied to the decoded response, so it returns the result
+    directly on ``SupabaseDB`` and an awaitable on ``AsyncSupabaseDB``.
+    """
 
-class SupabaseDB:
     def __init__(self):
         self.url = os.getenv("SUPABASE_URL")
         self.key = os.getenv("SUPABASE_KEY")
@@ -24,39 +108,55 @@ class SupabaseDB:
         if not enc_key:
             raise RuntimeError("ENCRYPTION_KEY environment variable must be set")
         self.cipher = Fernet(enc_key)
+        self.stats = RequestStats()
 
-    def encrypt(self, value: str) -> str:
-        return self.cipher.encrypt(value.encode()).decode()
-
-    def decrypt(self, value: str) -> str:
-        return self.cipher.decrypt(value.encode()).decode()
-
-    def _request(self, method: str, path: str, params: dict | None = None, data: dict | None = None):
-        url = self.rest_url + path
-        if params:
-            query = parse.urlencode(params)
-            url += f"?{query}"
+    def _client_options(self) -> dict:
+        return {
+            "base_url": self.rest_url,
+            "headers": self.headers,
+            "http2": SUPABASE_HTTP2,
+            "limits": httpx.Limits(
+                max_connections=SUPABASE_POOL_SIZE,
+                max_keepalive_connections=SUPABASE_POOL_SIZE,
+            ),
+            "timeout": httpx.Timeout(SUPABASE_TIMEOUT, connect=SUPABASE_CONNECT_TIMEOUT),
+        }
 
-        headers = self.headers.copy()
+    @staticmethod
+    def _request_headers(method: str, upsert: bool = False) -> dict:
         if method in {"POST", "PATCH", "PUT", "DELETE"}:
             # Return the affected row(s) so the calling code receives the full
             # representation rather than an empty body
-            headers["Prefer"] = "return=representation"
+            prefer = "return=representation"
+            if upsert:
+                prefer += ",resolution=merge-duplicates"
+            return {"Prefer": prefer}
+        return {}
+
+    @staticmethod
+    def _decode(resp: httpx.Response):
+        if resp.is_error:
+            raise RuntimeError(f"Supabase request failed: {resp.status_code} {resp.text}")
+        if resp.content:
+            return resp.json()
+        return None
 
-        data_bytes = None
-        if data is not None:
-            data_bytes = json.dumps(data).encode()
+    def _call(self, method: str, path: str, params=None, data=None, then=None, upsert=False):
+        raise NotImplementedError
 
-        req = request.Request(url, method=method, headers=headers, data=data_bytes)
-        try:
-            with request.urlopen(req) as resp:
-                resp_data = resp.read().decode()
-                if resp_data:
-                    return json.loads(resp_data)
-                return None
-        except error.HTTPError as exc:
-            msg = exc.read().decode()
-            raise RuntimeError(f"Supabase request failed: {exc.code} {msg}") from None
+    def encrypt(self, value: str) -> str:
+        return self.cipher.encrypt(value.encode()).decode()
+
+    def decrypt(self, value: str) -> str:
+        return self.cipher.decrypt(value.encode()).decode()
+
+    def _decrypt_settings(self, res):
+        if res:
+            item = res[0]
+            item["binance_api_key"] = self.decrypt(item["binance_api_key"])
+            item["binance_api_secret"] = self.decrypt(item["binance_api_secret"])
+            return item
+        return None
 
     # User operations
     def create_user(self, username: str, hashed_password: str, status: str = "Pending"):
@@ -66,43 +166,36 @@ class SupabaseDB:
             "status": status,
             "total_profit": 0.0,
         }
-        res = self._request("POST", "/users", data=data)
-        return res[0] if res else None
+        return self._call("POST", "/users", data=data, then=_first)
 
     def get_user_by_username(self, username: str):
         params = {"username": f"eq.{username}"}
-        res = self._request("GET", "/users", params=params)
-        return res[0] if res else None
+        return self._call("GET", "/users", params=params, then=_first)
 
     def get_user(self, user_id: int):
         params = {"id": f"eq.{user_id}"}
-        res = self._request("GET", "/users", params=params)
-        return res[0] if res else None
+        return self._call("GET", "/users", params=params, then=_first)
 
     def get_users(self):
-        return self._request("GET", "/users", params={})
+        return self._call("GET", "/users", params={})
 
     def update_user_status(self, user_id: int, status: str):
         params = {"id": f"eq.{user_id}"}
         data = {"status": status}
-        res = self._request("PATCH", "/users", params=params, data=data)
-        return res[0] if res else None
+        return self._call("PATCH", "/users", params=params, data=data, then=_first)
 
     def update_user_total_profit(self, user_id: int, total_profit: float):
         params = {"id": f"eq.{user_id}"}
         data = {"total_profit": total_profit}
-        res = self._request("PATCH", "/users", params=params, data=data)
-        return res[0] if res else None
+        return self._call("PATCH", "/users", params=params, data=data, then=_first)
 
     # Trade operations
     def create_trade(self, trade: dict):
-        res = self._request("POST", "/trades", data=trade)
-        return res[0] if res else None
+        return self._call("POST", "/trades", data=trade, then=_first)
 
     def get_trade(self, trade_id: int):
         params = {"id": f"eq.{trade_id}"}
-        res = self._request("GET", "/trades", params=params)
-        return res[0] if res else None
+        return self._call("GET", "/trades", params=params, then=_first)
 
     def get_trades(self, owner_id: int, skip: int = 0, limit: int = 100):
         params = {
@@ -110,82 +203,86 @@ class SupabaseDB:
             "offset": skip,
             "limit": limit,
         }
-        return self._request("GET", "/trades", params=params)
+        return self._call("GET", "/trades", params=params)
+
+    def get_buy_trades(self, owner_id: int, skip: int = 0, limit: int = 100):
+        params = {
+            "owner_id": f"eq.{owner_id}",
+            "side": "eq.buy",
+            "order": "id.asc",
+            "offset": skip,
+            "limit": limit,
+        }
+        return self._call("GET", "/trades", params=params)
 
     def get_trade_summary(self, owner_id: int, skip: int = 0, limit: int = 100):
-        """Return rows from the ``trade_summary_view`` for a user."""
+        """Return rows from the ``trade_summary_view`` for a user, oldest exit first."""
         params = {
             "owner_id": f"eq.{owner_id}",
+            "order": "exit_timestamp.asc,entry_trade_id.asc",
             "offset": skip,
             "limit": limit,
         }
-        return self._request("GET", "/trade_summary_view", params=params)
+        return self._call("GET", "/trade_summary_view", params=params)
+
+    def get_trade_summary_for_entries(self, entry_trade_ids: list[int]):
+        """Summary rows of the trade pairs opened by ``entry_trade_ids``."""
+        params = {
+            "entry_trade_id": f"in.({','.join(str(i) for i in entry_trade_ids)})",
+            "order": "exit_timestamp.asc,entry_trade_id.asc",
+        }
+        return self._call("GET", "/trade_summary_view", params=params)
 
     def update_trade(self, trade_id: int, trade: dict):
         params = {"id": f"eq.{trade_id}"}
-        res = self._request("PATCH", "/trades", params=params, data=trade)
-        return res[0] if res else None
+        return self._call("PATCH", "/trades", params=params, data=trade, then=_first)
 
     def delete_trade(self, trade_id: int):
         params = {"id": f"eq.{trade_id}"}
-        res = self._request("DELETE", "/trades", params=params)
-        return res
+        return self._call("DELETE", "/trades", params=params)
+
+    def create_completed_trade(self, trade: dict):
+        return self._call("POST", "/completed_trades", data=trade, then=_first)
+
+    def upsert_trades(self, trades: list[dict]):
+        """Insert or update several trades in one request, matched on ``client_ref``."""
+        params = {"on_conflict": "client_ref"}
+        return self._call("POST", "/trades", params=params, data=trades, upsert=True)
+
+    def upsert_completed_trades(self, trades: list[dict]):
+        params = {"on_conflict": "client_ref"}
+        return self._call("POST", "/completed_trades", params=params, data=trades, upsert=True)
 
     # User settings operations
     def get_user_settings(self, user_id: int):
         params = {"user_id": f"eq.{user_id}"}
-        res = self._request("GET", "/user_settings", params=params)
-        if res:
-            item = res[0]
-            item["binance_api_key"] = self.decrypt(item["binance_api_key"])
-            item["binance_api_secret"] = self.decrypt(item["binance_api_secret"])
-            return item
-        return None
+        return self._call("GET", "/user_settings", params=params, then=self._decrypt_settings)
 
-    def upsert_user_settings(self, user_id: int, api_key: str, api_secret: str):
-        encrypted = {
+    def _encrypt_settings(self, api_key: str, api_secret: str) -> dict:
+        return {
             "binance_api_key": self.encrypt(api_key),
             "binance_api_secret": self.encrypt(api_secret),
         }
-        existing = self.get_user_settings(user_id)
-        if existing:
-            params = {"user_id": f"eq.{user_id}"}
-            res = self._request("PATCH", "/user_settings", params=params, data=encrypted)
-            return res[0] if res else None
+
+    def _update_user_settings(self, user_id: int, encrypted: dict):
+        params = {"user_id": f"eq.{user_id}"}
+        return self._call("PATCH", "/user_settings", params=params, data=encrypted, then=_first)
+
+    def _insert_user_settings(self, user_id: int, encrypted: dict):
         data = {"user_id": user_id, **encrypted}
-        res = self._request("POST", "/user_settings", data=data)
-        return res[0] if res else None
+        return self._call("POST", "/user_settings", data=data, then=_first)
 
     # Bot config operations
     def get_bot_config(self, user_id: int):
         params = {"user_id": f"eq.{user_id}"}
-        res = self._request("GET", "/bot_configs", params=params)
-        return res[0] if res else None
+        return self._call("GET", "/bot_configs", params=params, then=_first)
 
-    def upsert_bot_config(
-        self,
-        user_id: int,
-        strategy: str,
-        risk_level: str,
-        market: str,
-        is_active: bool,
-        amount: float | None,
-    ):
-        data = {
-            "strategy": strategy,
-            "risk_level": risk_level,
-            "market": market,
-            "is_active": is_active,
-            "amount": amount,
-        }
-        existing = self.get_bot_config(user_id)
-        if existing:
-            params = {"user_id": f"eq.{user_id}"}
-            res = self._request("PATCH", "/bot_configs", params=params, data=data)
-            return res[0] if res else None
-        data["user_id"] = user_id
-        res = self._request("POST", "/bot_configs", data=data)
-        return res[0] if res else None
+    def _update_bot_config(self, user_id: int, data: dict):
+        params = {"user_id": f"eq.{user_id}"}
+        return self._call("PATCH", "/bot_configs", params=params, data=data, then=_first)
+
+    def _insert_bot_config(self, user_id: int, data: dict):
+        return self._call("POST", "/bot_configs", data={**data, "user_id": user_id}, then=_first)
 
     # User strategy run operations
     def get_active_user_strategy(self, user_id: int, strategy_id: str):
@@ -194,24 +291,160 @@ class SupabaseDB:
             "strategy_id": f"eq.{strategy_id}",
             "is_running": "eq.true",
         }
-        res = self._request("GET", "/user_strategy_runs", params=params)
-        return res[0] if res else None
+        return self._call("GET", "/user_strategy_runs", params=params, then=_first)
 
     def get_active_user_strategies(self, user_id: int):
         """Return all active strategy runs for a user."""
         params = {"user_id": f"eq.{user_id}", "is_running": "eq.true"}
-        return self._request("GET", "/user_strategy_runs", params=params) or []
+        return self._call("GET", "/user_strategy_runs", params=params, then=lambda res: res or [])
 
     def create_user_strategy_run(self, user_id: int, strategy_id: str):
         data = {"user_id": user_id, "strategy_id": strategy_id}
-        res = self._request("POST", "/user_strategy_runs", data=data)
-        return res[0] if res else None
+        return self._call("POST", "/user_strategy_runs", data=data, then=_first)
 
     def stop_user_strategy_run(self, run_id: int):
         params = {"id": f"eq.{run_id}"}
         data = {"is_running": False, "stopped_at": datetime.utcnow().isoformat()}
-        res = self._request("PATCH", "/user_strategy_runs", params=params, data=data)
-        return res[0] if res else None
+        return self._call("PATCH", "/user_strategy_runs", params=params, data=data, then=_first)
+
+
+def _bot_config(strategy: str, risk_level: str, market: str, is_active: bool, amount):
+    return {
+        "strategy": strategy,
+        "risk_level": risk_level,
+        "market": market,
+        "is_active": is_active,
+        "amount": amount,
+    }
+
+
+class SupabaseDB(_SupabaseBase):
+    """Blocking client for sync endpoints and worker threads."""
+
+    def __init__(self):
+        super().__init__()
+        # one pooled keep-alive client shared by every thread
+        self.http = httpx.Client(**self._client_options())
+
+    def _request(
+        self,
+        method: str,
+        path: str,
+        params: dict | None = None,
+        data: dict | list | None = None,
+        upsert: bool = False,
+    ):
+        events = []
+
+        def trace(event: str, info: dict):
+            if event == _CONNECTED:
+                events.append(event)
+
+        start = time.perf_counter()
+        failed = True
+        try:
+            resp = self.http.request(
+                method,
+                path,
+                params=params,
+                json=data,
+                headers=self._request_headers(method, upsert),
+                extensions={"trace": trace},
+            )
+            failed = resp.is_error
+        finally:
+            self.stats.record(method, path, time.perf_counter() - start, failed, bool(events))
+        return self._decode(resp)
+
+    def _call(self, method: str, path: str, params=None, data=None, then=None, upsert=False):
+        res = self._request(method, path, params=params, data=data, upsert=upsert)
+        return then(res) if then else res
+
+    def upsert_user_settings(self, user_id: int, api_key: str, api_secret: str):
+        encrypted = self._encrypt_settings(api_key, api_secret)
+        if self.get_user_settings(user_id):
+            return self._update_user_settings(user_id, encrypted)
+        return self._insert_user_settings(user_id, encrypted)
+
+    def upsert_bot_config(
+        self,
+        user_id: int,
+        strategy: str,
+        risk_level: str,
+        market: str,
+        is_active: bool,
+        amount: float | None,
+    ):
+        data = _bot_config(strategy, risk_level, market, is_active, amount)
+        if self.get_bot_config(user_id):
+            return self._update_bot_config(user_id, data)
+        return self._insert_bot_config(user_id, data)
+
+
+class AsyncSupabaseDB(_SupabaseBase):
+    """Awaitable twin of ``SupabaseDB`` for coroutines on the event loop."""
+
+    def __init__(self):
+        super().__init__()
+        self.http = httpx.AsyncClient(**self._client_options())
+
+    async def _request(
+        self,
+        method: str,
+        path: str,
+        params: dict | None = None,
+        data: dict | list | None = None,
+        upsert: bool = False,
+    ):
+        events = []
+
+        async def trace(event: str, info: dict):
+            if event == _CONNECTED:
+                events.append(event)
+
+        start = time.perf_counter()
+        failed = True
+        try:
+            resp = await self.http.request(
+                method,
+                path,
+                params=params,
+                json=data,
+                headers=self._request_headers(method, upsert),
+                extensions={"trace": trace},
+            )
+            failed = resp.is_error
+        finally:
+            self.stats.record(method, path, time.perf_counter() - start, failed, bool(events))
+        return self._decode(resp)
+
+    async def _call(self, method: str, path: str, params=None, data=None, then=None, upsert=False):
+        res = await self._request(method, path, params=params, data=data, upsert=upsert)
+        return then(res) if then else res
+
+    async def upsert_user_settings(self, user_id: int, api_key: str, api_secret: str):
+        encrypted = self._encrypt_settings(api_key, api_secret)
+        if await self.get_user_settings(user_id):
+            return await self._update_user_settings(user_id, encrypted)
+        return await self._insert_user_settings(user_id, encrypted)
+
+    async def upsert_bot_config(
+        self,
+        user_id: int,
+        strategy: str,
+        risk_level: str,
+        market: str,
+        is_active: bool,
+        amount: float | None,
+    ):
+        data = _bot_config(strategy, risk_level, market, is_active, amount)
+        if await self.get_bot_config(user_id):
+            return await self._update_bot_config(user_id, data)
+        return await self._insert_bot_config(user_id, data)
+
+    async def aclose(self):
+        await self.http.aclose()
 
 
 db = SupabaseDB()
+async_db = AsyncSupabaseDB()
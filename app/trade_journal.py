@@ -0,0 +1,327 @@
+"""Write-behind journal of trade fills.
+
+Fills are appended to a local JSON-lines file as soon as the exchange
+confirms them, which takes microseconds, and a background task writes them
+to Supabase in batches: one bulk upsert for the trade rows, one for the
+links between entry and exit rows and one for ``completed_trades``.  Every
+row carries the journal's ``client_ref`` and is upserted on it, so replaying
+entries after a crash (or retrying a batch whose response was lost) never
+creates duplicates.
+
+A checkpoint next to the journal records how far it has been flushed; the
+journal is truncated whenever everything in it has been written.
+"""
+import asyncio
+import json
+import os
+import uuid
+from datetime import datetime, timezone
+
+from . import pnl
+from .crud import _completed_trade_data
+from .schemas import CompletedTradeCreate
+from .supabase_db import async_db
+
+TRADE_JOURNAL_PATH = os.getenv("TRADE_JOURNAL_PATH", "data/trade_journal.jsonl")
+# Seconds between flushes while fills keep arriving
+JOURNAL_FLUSH_SECONDS = float(os.getenv("JOURNAL_FLUSH_SECONDS", "1"))
+# Most journal entries written to Supabase per batch
+JOURNAL_BATCH_SIZE = int(os.getenv("JOURNAL_BATCH_SIZE", "500"))
+# Longest wait between retries while Supabase is failing
+JOURNAL_MAX_RETRY_SECONDS = float(os.getenv("JOURNAL_MAX_RETRY_SECONDS", "60"))
+# fsync every entry to survive power loss, not just a process crash
+JOURNAL_FSYNC = os.getenv("JOURNAL_FSYNC", "0") == "1"
+
+
+def now() -> str:
+    """Current UTC time as journal entries record it."""
+    return datetime.utcnow().isoformat()
+
+
+def _utc(ts: str) -> str:
+    """Journal time with an explicit UTC offset for the ``timestamp`` column."""
+    value = datetime.fromisoformat(ts)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.isoformat()
+
+
+def _trade_row(
+    ref: str,
+    user_id: int,
+    strategy_id: str,
+    symbol: str,
+    side: str,
+    quantity: float,
+    price: float,
+    status: str,
+    time: str,
+) -> dict:
+    return {
+        "client_ref": ref,
+        "owner_id": user_id,
+        "strategy_id": strategy_id,
+        "symbol": symbol,
+        "side": side,
+        "quantity": quantity,
+        "price": price,
+        "status": status,
+        "related_trade_id": None,
+        # the fill time, not when the row happened to be flushed
+        "timestamp": _utc(time),
+    }
+
+
+class TradeJournal:
+    """Append-only log of fills with a batching Supabase flusher."""
+
+    def __init__(self, path: str = TRADE_JOURNAL_PATH):
+        self.path = path
+        self.checkpoint_path = path + ".checkpoint"
+        # (end offset in the journal, entry) not yet written to Supabase
+        self.pending: list[tuple[int, dict]] = []
+        self.flushed_offset = 0
+        self._fh = None
+        self._wakeup: asyncio.Event | None = None
+        self._task: asyncio.Task | None = None
+
+    # --- recording ---
+
+    def _append(self, entry: dict) -> str:
+        if self._fh is None:
+            self._open()
+        line = json.dumps(entry, separators=(",", ":")) + "\n"
+        self._fh.write(line.encode())
+        self._fh.flush()
+        if JOURNAL_FSYNC:
+            os.fsync(self._fh.fileno())
+        self.pending.append((self._fh.tell(), entry))
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return entry["ref"]
+
+    def record_open(
+        self,
+        user_id: int,
+        strategy_id: str,
+        symbol: str,
+        quantity: float,
+        price: float,
+        time: str | None = None,
+    ) -> str:
+        """Journal an entry fill made at ``time`` (default now) and return its reference."""
+        return self._append({
+            "kind": "open",
+            "ref": uuid.uuid4().hex,
+            "time": time or now(),
+            "user_id": user_id,
+            "strategy_id": strategy_id,
+            "symbol": symbol,
+            "quantity": quantity,
+            "price": price,
+        })
+
+    def record_close(
+        self,
+        open_ref: str | None,
+        user_id: int,
+        strategy_id: str,
+        symbol: str,
+        quantity: float,
+        entry_price: float | None,
+        exit_price: float,
+        commission_entry: float | None = None,
+        commission_exit: float | None = None,
+        completed: bool = True,
+        entry_quantity: float | None = None,
+        entry_time: str | None = None,
+    ) -> str:
+        """Journal an exit fill closing the entry recorded as ``open_ref``.
+
+        ``quantity`` is what was sold; the entry row is rewritten with the
+        ``entry_quantity`` and ``entry_time`` it was opened with.
+        ``completed`` also adds a ``completed_trades`` row with the profit.
+        Without ``open_ref`` only a standalone closed SELL row is written.
+        """
+        return self._append({
+            "kind": "close",
+            "ref": uuid.uuid4().hex,
+            "open_ref": open_ref,
+            "time": now(),
+            "user_id": user_id,
+            "strategy_id": strategy_id,
+            "symbol": symbol,
+            "quantity": quantity,
+            "entry_price": entry_price,
+            "entry_quantity": entry_quantity,
+            "entry_time": entry_time,
+            "exit_price": exit_price,
+            "commission_entry": commission_entry,
+            "commission_exit": commission_exit,
+            "completed": completed,
+        })
+
+    # --- recovery ---
+
+    def _open(self):
+        """Load the checkpoint and replay entries written after it."""
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        try:
+            with open(self.checkpoint_path) as fh:
+                self.flushed_offset = json.load(fh)["offset"]
+        except FileNotFoundError:
+            pass
+        self._fh = open(self.path, "a+b")
+        self._fh.seek(self.flushed_offset)
+        offset = self.flushed_offset
+        for line in self._fh:
+            if not line.endswith(b"\n"):
+                # torn write from a crash; the fill was never acknowledged
+                break
+            offset += len(line)
+            self.pending.append((offset, json.loads(line)))
+        self._fh.truncate(offset)
+        self._fh.seek(offset)
+        if self.pending:
+            print(f"Trade journal: replaying {len(self.pending)} unflushed entries")
+
+    def _save_checkpoint(self):
+        tmp = self.checkpoint_path + ".tmp"
+        with open(tmp, "w") as fh:
+            json.dump({"offset": self.flushed_offset}, fh)
+        os.replace(tmp, self.checkpoint_path)
+
+    # --- flushing ---
+
+    async def _write_batch(self, entries: list[dict]) -> tuple[list[dict], list[int]]:
+        """Upsert the rows for ``entries``; safe to repeat after a failure.
+
+        Returns the BUY rows written as open and the ids of the BUY trades
+        that were closed, for the P&L aggregates.
+        """
+        # keyed by client_ref so a position opened and closed in the same
+        # batch yields one row for its entry trade.  The entry row of every
+        # exit is rewritten as closed, which also returns its id for linking.
+        rows: dict[str, dict] = {}
+        for e in entries:
+            if e["kind"] == "open":
+                rows[e["ref"]] = _trade_row(
+                    e["ref"], e["user_id"], e["strategy_id"], e["symbol"],
+                    "buy", e["quantity"], e["price"], "open", e["time"],
+                )
+                continue
+            if e["open_ref"]:
+                # entries journaled before the entry fill was carried along
+                # fall back to the exit's quantity and time
+                rows[e["open_ref"]] = _trade_row(
+                    e["open_ref"], e["user_id"], e["strategy_id"], e["symbol"], "buy",
+                    e.get("entry_quantity") or e["quantity"], e["entry_price"], "closed",
+                    e.get("entry_time") or e["time"],
+                )
+            rows[e["ref"]] = _trade_row(
+                e["ref"], e["user_id"], e["strategy_id"], e["symbol"],
+                "sell", e["quantity"], e["exit_price"], "closed", e["time"],
+            )
+        saved = await async_db.upsert_trades(list(rows.values())) or []
+        ids = {r["client_ref"]: r["id"] for r in saved}
+
+        # link each exit to its entry now that both have ids
+        links: dict[str, dict] = {}
+        completed = []
+        for e in entries:
+            if e["kind"] != "close":
+                continue
+            open_id, close_id = ids.get(e["open_ref"]), ids.get(e["ref"])
+            if e["open_ref"]:
+                links[e["open_ref"]] = {**rows[e["open_ref"]], "related_trade_id": close_id}
+                links[e["ref"]] = {**rows[e["ref"]], "related_trade_id": open_id}
+            if e["completed"]:
+                completed.append({
+                    "client_ref": e["ref"],
+                    **_completed_trade_data(
+                        CompletedTradeCreate(
+                            strategy_id=e["strategy_id"],
+                            symbol=e["symbol"],
+                            entry_price=e["entry_price"],
+                            exit_price=e["exit_price"],
+                            quantity=e["quantity"],
+                            commission_entry=e["commission_entry"],
+                            commission_exit=e["commission_exit"],
+                        ),
+                        e["user_id"],
+                    ),
+                })
+        if links:
+            await async_db.upsert_trades(list(links.values()))
+        if completed:
+            await async_db.upsert_completed_trades(completed)
+
+        opened = [r for r in saved if r["side"] == "buy" and r["status"] == "open"]
+        closed = [ids[e["open_ref"]] for e in entries
+                  if e["kind"] == "close" and ids.get(e["open_ref"])]
+        return opened, closed
+
+    async def flush(self):
+        """Write pending entries to Supabase, oldest first."""
+        while self.pending:
+            batch = self.pending[:JOURNAL_BATCH_SIZE]
+            entries = [entry for _, entry in batch]
+            users = {e["user_id"] for e in entries}
+            async with pnl.LOCK:
+                opened, closed = await self._write_batch(entries)
+                try:
+                    await pnl.apply(opened, closed)
+                except Exception as exc:
+                    print(f"Trade journal: rebuilding P&L after failed update: {exc}")
+                    for user_id in users:
+                        pnl.invalidate(user_id)
+                await pnl.written(users)
+            del self.pending[:len(batch)]
+            self.flushed_offset = batch[-1][0]
+            if not self.pending:
+                # everything is in Supabase, so the journal can start over
+                self._fh.truncate(0)
+                self._fh.seek(0)
+                self.flushed_offset = 0
+            self._save_checkpoint()
+
+    async def _run(self):
+        delay = JOURNAL_FLUSH_SECONDS
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.flush()
+                delay = JOURNAL_FLUSH_SECONDS
+                # let more fills accumulate into the next batch
+                await asyncio.sleep(JOURNAL_FLUSH_SECONDS)
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                delay = min(delay * 2, JOURNAL_MAX_RETRY_SECONDS)
+                print(f"Trade journal flush failed, retrying in {delay:.1f}s: {exc}")
+
+    def start(self):
+        if self._fh is None:
+            self._open()
+        if self._task is None:
+            self._wakeup = asyncio.Event()
+            if self.pending:
+                self._wakeup.set()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the flusher after a last attempt to write pending entries."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        try:
+            await self.flush()
+        except Exception as exc:
+            print(f"Trade journal: {len(self.pending)} entries left for replay: {exc}")
+
+
+JOURNAL = TradeJournal()
@@ -0,0 +1,102 @@
+"""Login throughput with bcrypt in the threadpool and in the process pool.
+
+Serves a minimal app in process through ``httpx.ASGITransport`` and fires
+``LOGINS`` concurrent password checks at it, once on a sync endpoint that
+verifies in FastAPI's threadpool as ``/token`` used to, then on an async
+endpoint using ``verify_password_async``.  A sync ``/ping`` is polled during
+each burst to show whether other endpoints still get a thread.  Prints
+logins/s, p50/p99 login latency, how many were turned away with 429 and how
+quickly, and the ping latency.  Run from the repository root::
+
+    PYTHONPATH=. python bench/password_pool.py
+
+``BCRYPT_WORKERS`` and ``BCRYPT_MAX_PENDING`` are read from the environment
+as in the app.
+"""
+import asyncio
+import os
+import statistics
+import time
+
+import httpx
+from fastapi import FastAPI
+
+from app import passwords
+
+LOGINS = int(os.getenv("BENCH_LOGINS", "64"))
+PINGS = 20
+
+
+def _app(hashed: str) -> FastAPI:
+    app = FastAPI()
+
+    @app.post("/threadpool")
+    def threadpool():
+        return {"ok": passwords.verify_password("secret", hashed)}
+
+    @app.post("/pool")
+    async def pool():
+        return {"ok": await passwords.verify_password_async("secret", hashed)}
+
+    @app.get("/ping")
+    def ping():
+        return {}
+
+    return app
+
+
+def _percentile(samples: list[float], q: float) -> float:
+    return samples[max(int(len(samples) * q) - 1, 0)]
+
+
+async def _burst(client: httpx.AsyncClient, path: str):
+    await client.post(path)  # warm up the workers
+    logins = []
+    pings = []
+
+    async def login():
+        start = time.perf_counter()
+        resp = await client.post(path)
+        logins.append((resp.status_code, time.perf_counter() - start))
+
+    async def pinger():
+        await asyncio.sleep(0.05)
+        for _ in range(PINGS):
+            start = time.perf_counter()
+            await client.get("/ping")
+            pings.append(time.perf_counter() - start)
+            await asyncio.sleep(0.05)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(login() for _ in range(LOGINS)), pinger())
+    elapsed = time.perf_counter() - start
+
+    ok = sorted(s for code, s in logins if code == 200)
+    rejected = [s for code, s in logins if code == 429]
+    print(
+        f"{path:<11} ok {len(ok):3d}  logins/s {len(ok) / elapsed:6.1f}  "
+        f"p50 {_percentile(ok, 0.5) * 1000:6.0f} ms  "
+        f"p99 {_percentile(ok, 0.99) * 1000:6.0f} ms  "
+        f"429 {len(rejected):3d} (max {max(rejected, default=0) * 1000:.1f} ms)  "
+        f"ping p50 {statistics.median(pings) * 1000:.1f} ms "
+        f"max {max(pings) * 1000:.0f} ms"
+    )
+
+
+async def main():
+    app = _app(passwords.hash_password("secret"))
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench", timeout=120
+    ) as client:
+        print(
+            f"{LOGINS} concurrent logins, BCRYPT_WORKERS={passwords.BCRYPT_WORKERS} "
+            f"BCRYPT_MAX_PENDING={passwords.BCRYPT_MAX_PENDING}"
+        )
+        await _burst(client, "/threadpool")
+        await _burst(client, "/pool")
+    passwords.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
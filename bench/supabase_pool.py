@@ -0,0 +1,152 @@
+"""Latency of Supabase requests with and without connection reuse.
+
+Starts a PostgREST stand-in over TLS on loopback and sends the same GET
+``REQUESTS`` times, first opening a connection per request with ``urllib``
+as ``SupabaseDB`` used to, then through the pooled ``SupabaseDB`` client.
+Exits non-zero unless pooling lowers the median latency and ``db.stats``
+shows the requests reusing one connection.  Run from the repository root::
+
+    PYTHONPATH=. python bench/supabase_pool.py
+"""
+import datetime
+import ipaddress
+import json
+import os
+import ssl
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from cryptography import x509
+from cryptography.fernet import Fernet
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.x509.oid import NameOID
+
+REQUESTS = int(os.getenv("BENCH_REQUESTS", "500"))
+ROWS = [{"id": 1, "username": "bench", "status": "Active"}]
+
+
+class PostgrestStandIn(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # headers and body go out in separate writes; Nagle would hold the body
+    # for a delayed ACK on kept-alive connections
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        body = json.dumps(ROWS).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def _certificate(directory: str) -> tuple[str, str]:
+    """Self-signed certificate for 127.0.0.1 and its key, as file paths."""
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "127.0.0.1")])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - datetime.timedelta(minutes=1))
+        .not_valid_after(now + datetime.timedelta(hours=1))
+        .add_extension(
+            x509.SubjectAlternativeName([x509.IPAddress(ipaddress.ip_address("127.0.0.1"))]),
+            critical=False,
+        )
+        .add_extension(x509.BasicConstraints(ca=True, path_length=None), critical=True)
+        .sign(key, hashes.SHA256())
+    )
+    cert_path = os.path.join(directory, "cert.pem")
+    key_path = os.path.join(directory, "key.pem")
+    with open(cert_path, "wb") as fh:
+        fh.write(cert.public_bytes(serialization.Encoding.PEM))
+    with open(key_path, "wb") as fh:
+        fh.write(key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption(),
+        ))
+    return cert_path, key_path
+
+
+def _serve(cert_path: str, key_path: str) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), PostgrestStandIn)
+    server.daemon_threads = True
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    context.load_cert_chain(cert_path, key_path)
+    server.socket = context.wrap_socket(server.socket, server_side=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def _timed(call) -> list[float]:
+    call()  # warm up
+    samples = []
+    for _ in range(REQUESTS):
+        start = time.perf_counter()
+        call()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def _summary(label: str, samples: list[float]) -> float:
+    samples = sorted(samples)
+    median = statistics.median(samples)
+    p99 = samples[int(len(samples) * 0.99) - 1]
+    print(f"{label:<28} median {median * 1000:6.2f} ms   p99 {p99 * 1000:6.2f} ms")
+    return median
+
+
+def main() -> int:
+    with tempfile.TemporaryDirectory() as directory:
+        cert_path, key_path = _certificate(directory)
+        server = _serve(cert_path, key_path)
+        base = f"https://127.0.0.1:{server.server_port}"
+        os.environ["SUPABASE_URL"] = base
+        os.environ.setdefault("SUPABASE_KEY", "bench")
+        os.environ.setdefault("ENCRYPTION_KEY", Fernet.generate_key().decode())
+        # trusted by httpx for the pooled client
+        os.environ["SSL_CERT_FILE"] = cert_path
+        from app.supabase_db import SupabaseDB
+
+        context = ssl.create_default_context(cafile=cert_path)
+        url = f"{base}/rest/v1/users?select=*&id=eq.1"
+
+        def per_request():
+            request = urllib.request.Request(url, headers={"apikey": "bench"})
+            with urllib.request.urlopen(request, context=context) as resp:
+                json.loads(resp.read())
+
+        db = SupabaseDB()
+        print(f"{REQUESTS} sequential GETs over TLS on loopback")
+        before = _summary("connection per request", _timed(per_request))
+        after = _summary("pooled keep-alive", _timed(lambda: db.get_user(1)))
+        stats = db.stats.snapshot()["GET /users"]
+        print(f"db.stats: {stats['count']} requests, {stats['connections']} new connections")
+        server.shutdown()
+
+    ok = True
+    if after >= before:
+        print("FAIL: pooling did not lower the median latency")
+        ok = False
+    if stats["connections"] != 1 or stats["count"] != REQUESTS + 1:
+        print("FAIL: requests did not reuse one pooled connection")
+        ok = False
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
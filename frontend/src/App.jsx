@@ -79,7 +79,7 @@ export default function App() {
       case 'assets':
         return <AssetsPage />;
       case 'charts':
-        return <ChartsPage theme={theme} />;
+        return <ChartsPage theme={theme} token={token} />;
       case 'manual':
         return <ManualTradePage theme={theme} token={token} />;
       default:
@@ -1,32 +1,50 @@
 import { useState, useEffect } from 'react';
 import GlassCard from './GlassCard';
+import { appendLines, linesFor, subscribeEvents } from './eventStream';
 
 export default function LogModal({ strategy, token, onClose }) {
   const [activeTab, setActiveTab] = useState('trade');
   const [tradeLogs, setTradeLogs] = useState([]);
   const [detailLogs, setDetailLogs] = useState([]);
+  const [verbose, setVerbose] = useState(false);
 
   useEffect(() => {
     if (!strategy) return;
-    const fetchLogs = () => {
-      fetch(`http://localhost:8000/strategy/${strategy.id}/logs?log_type=trade`, {
-        headers: { Authorization: `Bearer ${token}` },
-      })
-        .then((res) => res.json())
-        .then((data) => setTradeLogs(data.logs || []))
-        .catch(() => setTradeLogs([]));
-      fetch(`http://localhost:8000/strategy/${strategy.id}/logs?log_type=detail`, {
-        headers: { Authorization: `Bearer ${token}` },
-      })
-        .then((res) => res.json())
-        .then((data) => setDetailLogs(data.logs || []))
-        .catch(() => setDetailLogs([]));
-    };
-    fetchLogs();
-    const id = setInterval(fetchLogs, 2000);
-    return () => clearInterval(id);
+    setTradeLogs([]);
+    setDetailLogs([]);
+    return subscribeEvents(token, (events) => {
+      setTradeLogs((prev) => appendLines(prev, linesFor(events, strategy.id, 'trade')));
+      setDetailLogs((prev) => appendLines(prev, linesFor(events, strategy.id, 'detail')));
+    });
+  }, [strategy, token]);
+
+  useEffect(() => {
+    if (!strategy) return;
+    fetch(`http://localhost:8000/strategy/${strategy.id}/log_level`, {
+      headers: { Authorization: `Bearer ${token}` },
+    })
+      .then((res) => (res.ok ? res.json() : null))
+      .then((data) => setVerbose(data?.level === 'debug'))
+      .catch(() => {});
   }, [strategy, token]);
 
+  // every signal check is only logged at the debug level
+  const toggleVerbose = () => {
+    const next = !verbose;
+    fetch(`http://localhost:8000/strategy/${strategy.id}/log_level`, {
+      method: 'PUT',
+      headers: {
+        'Content-Type': 'application/json',
+        Authorization: `Bearer ${token}`,
+      },
+      body: JSON.stringify({ level: next ? 'debug' : null }),
+    })
+      .then((res) => {
+        if (res.ok) setVerbose(next);
+      })
+      .catch(() => {});
+  };
+
   const parseTradeLog = (log) => {
     const m = log.match(/(BUY|SELL)\s+(\w+)\s+qty\s+([\d.]+)/i);
     if (!m) return { type: '', pair: '', qty: '', raw: log };
@@ -53,6 +71,12 @@ export default function LogModal({ strategy, token, onClose }) {
           >
             Detail Logs
           </button>
+          {activeTab === 'detail' && (
+            <label className="ml-auto flex items-center gap-2 text-sm text-gray-600 dark:text-gray-300">
+              <input type="checkbox" checked={verbose} onChange={toggleVerbose} />
+              Show signal checks
+            </label>
+          )}
         </div>
         <div className="flex-grow overflow-y-auto">
           {activeTab === 'trade' && (
@@ -0,0 +1,38 @@
+// Server-pushed strategy logs, trade events and run status. EventSource
+// reconnects by itself and resumes after the last event it received, so
+// nothing needs to be polled. Events are handed over in batches so a replay
+// of the buffered history renders once rather than once per line.
+export const MAX_LOG_LINES = 1000;
+
+export function subscribeEvents(token, onEvents) {
+  const source = new EventSource(
+    `http://localhost:8000/events?token=${encodeURIComponent(token)}`,
+  );
+  let batch = [];
+  let timer = null;
+  const handle = (e) => {
+    batch.push(JSON.parse(e.data));
+    if (timer === null) {
+      timer = setTimeout(() => {
+        const events = batch;
+        batch = [];
+        timer = null;
+        onEvents(events);
+      }, 100);
+    }
+  };
+  ['detail', 'trade', 'status'].forEach((type) => source.addEventListener(type, handle));
+  return () => {
+    clearTimeout(timer);
+    source.close();
+  };
+}
+
+// Log lines of one strategy and type from a batch of events.
+export const linesFor = (events, strategyId, type) =>
+  events
+    .filter((e) => e.type === type && e.strategy === String(strategyId).toLowerCase())
+    .map((e) => e.line);
+
+export const appendLines = (prev, lines) =>
+  lines.length ? [...prev, ...lines].slice(-MAX_LOG_LINES) : prev;
@@ -57,7 +57,7 @@ const WickShape = ({ x, y, width, height, payload }) => {
 
 const intervalMap = { '15M': '15m', '1H': '1h', '4H': '4h', '1D': '1d', '1W': '1w' };
 
-export default function ChartsPage({ theme }) {
+export default function ChartsPage({ theme, token }) {
   const [activePair, setActivePair] = useState('BTC/USDT');
   const [activeInterval, setActiveInterval] = useState('1H');
   const [chartType, setChartType] = useState('line');
@@ -83,7 +83,9 @@ export default function ChartsPage({ theme }) {
       const interval = intervalMap[activeInterval];
       const [kRes, tRes] = await Promise.all([
         fetch(`https://api.binance.com/api/v3/klines?symbol=${symbol}&interval=${interval}&limit=100`).then(r => r.json()),
-        fetch(`https://api.binance.com/api/v3/ticker/24hr?symbol=${symbol}`).then(r => r.json()),
+        fetch(`http://localhost:8000/market/${symbol}`, {
+          headers: { Authorization: `Bearer ${token}` },
+        }).then(r => r.json()).then(r => r.data),
       ]);
       const lineData = kRes.map((k, idx) => ({
         time: idx,
@@ -98,11 +100,11 @@ export default function ChartsPage({ theme }) {
         isBullish: parseFloat(k[4]) >= parseFloat(k[1]),
       }));
       const info = {
-        price: parseFloat(tRes.lastPrice),
-        change: parseFloat(tRes.priceChangePercent),
-        high: parseFloat(tRes.highPrice),
-        low: parseFloat(tRes.lowPrice),
-        volume: parseFloat(tRes.volume),
+        price: tRes.price,
+        change: tRes.change_percent,
+        high: tRes.high,
+        low: tRes.low,
+        volume: tRes.volume,
         lineData,
         candleData,
       };
@@ -1,6 +1,7 @@
 import { useState, useEffect } from 'react';
 import GlassCard from '../components/GlassCard';
 import LogModal from '../components/LogModal';
+import { subscribeEvents } from '../components/eventStream';
 import { toast } from 'react-hot-toast';
 
 const STRATEGY_INFO = {
@@ -66,6 +67,14 @@ export default function StrategiesPage() {
       });
   }, [token]);
 
+  // start/stop from other tabs and devices arrive as status events
+  useEffect(() => subscribeEvents(token, (events) => {
+    const running = {};
+    events.filter((e) => e.type === 'status').forEach((e) => { running[e.strategy] = e.running; });
+    if (Object.keys(running).length === 0) return;
+    setStrategies((prev) => prev.map((s) => (s.id in running ? { ...s, running: running[s.id] } : s)));
+  }), [token]);
+
   const toggleStrategy = (id, running) => {
     const endpoint = running ? `/strategy/${id}/stop` : `/strategy/${id}/start`;
     const amount = tradeAmounts[id];
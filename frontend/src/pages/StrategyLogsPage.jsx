@@ -1,5 +1,6 @@
 import { useState, useEffect } from 'react';
 import GlassCard from '../components/GlassCard';
+import { appendLines, linesFor, subscribeEvents } from '../components/eventStream';
 
 export default function StrategyLogsPage({ strategy, token, onBack }) {
   const [tab, setTab] = useState('detail');
@@ -9,24 +10,12 @@ export default function StrategyLogsPage({ strategy, token, onBack }) {
   useEffect(() => {
     if (!strategy) return;
 
-    const fetchLogs = () => {
-      fetch(`http://localhost:8000/strategy/${strategy}/logs?log_type=detail`, {
-        headers: { Authorization: `Bearer ${token}` },
-      })
-        .then((res) => res.json())
-        .then((data) => setDetailLogs(data.logs || []))
-        .catch(() => {});
-      fetch(`http://localhost:8000/strategy/${strategy}/logs?log_type=trade`, {
-        headers: { Authorization: `Bearer ${token}` },
-      })
-        .then((res) => res.json())
-        .then((data) => setTradeLogs(data.logs || []))
-        .catch(() => {});
-    };
-
-    fetchLogs();
-    const id = setInterval(fetchLogs, 2000);
-    return () => clearInterval(id);
+    setDetailLogs([]);
+    setTradeLogs([]);
+    return subscribeEvents(token, (events) => {
+      setDetailLogs((prev) => appendLines(prev, linesFor(events, strategy, 'detail')));
+      setTradeLogs((prev) => appendLines(prev, linesFor(events, strategy, 'trade')));
+    });
   }, [strategy, token]);
 
   const activeClass =
@@ -0,0 +1,23 @@
+import multiprocessing
+import os
+
+import pytest
+from cryptography.fernet import Fernet
+
+# app modules build their Supabase clients at import time
+os.environ.setdefault("SUPABASE_URL", "http://127.0.0.1:9")
+os.environ.setdefault("SUPABASE_KEY", "test")
+os.environ.setdefault("ENCRYPTION_KEY", Fernet.generate_key().decode())
+os.environ.setdefault("SECRET_KEY", "test")
+
+
+@pytest.fixture(autouse=True)
+def reap_workers():
+    """Wait for worker processes a test left shutting down.
+
+    Pools are shut down without waiting; on a small machine their workers
+    would otherwise still be starting or exiting during the timing tests.
+    """
+    yield
+    for child in multiprocessing.active_children():
+        child.join(10)
@@ -0,0 +1,66 @@
+"""ETags of the cached dashboard."""
+import asyncio
+
+import pytest
+
+from app import cache, dashboard, pnl
+
+
+class _Redis:
+    """Dict-backed stand-in for the async Redis client."""
+
+    def __init__(self):
+        self.data = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def mget(self, *keys):
+        return [self.data.get(key) for key in keys]
+
+    async def set(self, key, value, ex=None, nx=False):
+        if nx and key in self.data:
+            return None
+        self.data[key] = value.encode() if isinstance(value, str) else value
+        return True
+
+    async def incr(self, key):
+        self.data[key] = str(int(self.data.get(key, 0)) + 1).encode()
+        return int(self.data[key])
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    fake = _Redis()
+    monkeypatch.setattr(cache, "async_redis", fake)
+
+    async def aggregate(user_id, version=None):
+        return pnl.UserPnL()
+
+    monkeypatch.setattr(pnl, "get", aggregate)
+    monkeypatch.setattr(dashboard, "_metrics", lambda *args: {"trades": 0})
+    return fake
+
+
+def _get(etag=None):
+    return asyncio.run(dashboard.get_dashboard_data(
+        resolution="trade", points=10, if_none_match=etag, current_user={"id": 7},
+    ))
+
+
+def test_unchanged_poll_is_not_modified(redis):
+    etag = _get().headers["ETag"]
+    assert _get(etag).status_code == 304
+    asyncio.run(cache.abump_dashboard_version(7))
+    assert _get(etag).status_code == 200
+
+
+def test_etag_from_before_a_flush_never_matches(redis):
+    asyncio.run(cache.abump_dashboard_version(7))
+    etag = _get().headers["ETag"]
+    redis.data.clear()
+    # the counter starts over and reaches the same number again
+    asyncio.run(cache.abump_dashboard_version(7))
+    response = _get(etag)
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
@@ -0,0 +1,106 @@
+"""Event loop responsiveness while many tasks call the fake exchange."""
+import asyncio
+import gc
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from app import exchange, fake_exchange
+
+TASKS = 500
+CALLS_PER_TASK = 2
+# seconds added by the fake exchange to every response
+LATENCY = 0.02
+# 99% of timers on the loop fire at most this late while the calls run
+MAX_LOOP_LAG = 0.1
+# no single timer may be later than this; on a one-CPU machine the fake
+# exchange's handler threads occasionally hold the GIL for a few switch intervals
+MAX_LOOP_SPIKE = 0.25
+# the first probe also waits for all tasks to start and the pool threads to spawn
+MAX_STARTUP_LAG = 0.5
+# runs measured before the lag is blamed on the code rather than the machine
+ATTEMPTS = 3
+
+
+@pytest.fixture
+def fake_server(monkeypatch):
+    server = fake_exchange.make_server(port=0, latency=LATENCY)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setattr(
+        exchange, "BINANCE_API_URL", f"http://127.0.0.1:{server.server_port}/api"
+    )
+    # full collections over whatever earlier tests left on the heap pause the
+    # loop regardless of how the exchange is called; keep them out of the probe
+    gc.collect()
+    gc.freeze()
+    yield server
+    gc.unfreeze()
+    server.shutdown()
+    server.server_close()
+
+
+async def _probe_lag(stop: asyncio.Event, interval: float = 0.005) -> list[float]:
+    loop = asyncio.get_running_loop()
+    lags = []
+    while not stop.is_set():
+        due = loop.time() + interval
+        await asyncio.sleep(interval)
+        lags.append(loop.time() - due)
+    return lags
+
+
+async def _strategy_task(client, symbol: str):
+    ex = exchange.AsyncExchange(client)
+    for _ in range(CALLS_PER_TASK):
+        klines = await ex.get_klines(symbol=symbol, interval="1m", limit=50)
+        assert len(klines) == 50
+    order = await ex.create_order(
+        symbol=symbol, side="BUY", type="MARKET", quoteOrderQty=10
+    )
+    assert order["status"] == "FILLED"
+
+
+def _lag_problem(lags: list[float], elapsed: float) -> str | None:
+    calls = TASKS * (CALLS_PER_TASK + 1)
+    # far quicker than the calls made one after another
+    if elapsed >= calls * LATENCY / 4:
+        return f"took {elapsed:.2f}s"
+    if len(lags) <= 10:
+        return f"only {len(lags)} probes"
+    if lags[0] >= MAX_STARTUP_LAG:
+        return f"startup lag {lags[0]:.3f}s"
+    steady = np.sort(lags[1:])
+    p99 = steady[int(len(steady) * 0.99) - 1]
+    if p99 >= MAX_LOOP_LAG:
+        return f"p99 lag {p99:.3f}s over {len(lags)} probes"
+    if steady[-1] >= MAX_LOOP_SPIKE:
+        return f"max lag {steady[-1]:.3f}s"
+    return None
+
+
+def test_loop_lag_under_500_concurrent_tasks(fake_server):
+    client = exchange.create_client("key", "secret")
+
+    async def main():
+        stop = asyncio.Event()
+        probe = asyncio.create_task(_probe_lag(stop))
+        symbols = fake_exchange.SYMBOLS
+        start = time.perf_counter()
+        await asyncio.gather(*(
+            _strategy_task(client, symbols[i % len(symbols)]) for i in range(TASKS)
+        ))
+        elapsed = time.perf_counter() - start
+        stop.set()
+        return await probe, elapsed
+
+    # a blocked loop lags on every run; a starved CI machine only now and then
+    problems = []
+    for _ in range(ATTEMPTS):
+        problem = _lag_problem(*asyncio.run(main()))
+        if problem is None:
+            return
+        problems.append(problem)
+    pytest.fail("; ".join(problems))
@@ -0,0 +1,137 @@
+"""The streaming indicators against the pandas helpers they replace."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.candles import Candles
+from app.indicators import IndicatorGraph
+from app.strategies import atr, bollinger_bands, ema, keltner_channels
+
+TOLERANCE = 1e-9
+
+
+def _random_candles(n: int, seed: int) -> dict[str, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 1, n))
+    # opening gaps make the true range differ from high - low
+    open_ = np.concatenate([[close[0]], close[:-1]]) + rng.normal(0, 1, n)
+    high = np.maximum(open_, close) + rng.uniform(0, 1, n)
+    low = np.minimum(open_, close) - rng.uniform(0, 1, n)
+    open_time = np.arange(n, dtype=np.int64) * 60_000
+    return {
+        "open_time": open_time,
+        "close_time": open_time + 59_999,
+        "open": open_,
+        "high": high,
+        "low": low,
+        "close": close,
+        "volume": rng.uniform(1, 10, n),
+    }
+
+
+def _candles(columns: dict[str, np.ndarray], stop: int) -> Candles:
+    return Candles(**{name: values[:stop] for name, values in columns.items()})
+
+
+def _forming(columns: dict[str, np.ndarray], row: int, rng) -> dict[str, np.ndarray]:
+    """Copy with the candle at ``row`` replaced by an earlier, different tick."""
+    revised = {name: values.copy() for name, values in columns.items()}
+    close = revised["open"][row] + rng.normal(0, 1)
+    revised["close"][row] = close
+    revised["high"][row] = max(revised["open"][row], close) + rng.uniform(0, 0.5)
+    revised["low"][row] = min(revised["open"][row], close) - rng.uniform(0, 0.5)
+    return revised
+
+
+def _expected(columns: dict[str, np.ndarray], stop: int) -> dict[str, tuple]:
+    """Last and previous value of every indicator, computed with pandas."""
+    df = pd.DataFrame({c: columns[c][:stop] for c in ("high", "low", "close")})
+    bb_lower, bb_upper = bollinger_bands(df["close"], 20, 2.0)
+    kc_lower, kc_upper = keltner_channels(df, 20, 1.5)
+    series = {
+        "ema": ema(df["close"], 50),
+        "atr": atr(df, 14),
+        "bb_lower": bb_lower,
+        "bb_upper": bb_upper,
+        "kc_lower": kc_lower,
+        "kc_upper": kc_upper,
+        "highest": df["high"].rolling(20).max(),
+        "lowest": df["low"].rolling(20).min(),
+    }
+    return {
+        name: (s.iloc[-1], s.iloc[-2] if len(s) > 1 else np.nan)
+        for name, s in series.items()
+    }
+
+
+def _nodes(graph: IndicatorGraph) -> dict:
+    return {
+        "ema": graph.ema(50),
+        "atr": graph.atr(14),
+        "bb": graph.bollinger(20, 2.0),
+        "kc": graph.keltner(20, 1.5),
+        "highest": graph.highest(20),
+        "lowest": graph.lowest(20),
+    }
+
+
+def _actual(nodes: dict) -> dict[str, tuple]:
+    values = {}
+    for name in ("ema", "atr", "highest", "lowest"):
+        values[name] = (nodes[name].value, nodes[name].previous)
+    for name in ("bb", "kc"):
+        lower, upper = nodes[name].value
+        prev_lower, prev_upper = nodes[name].previous
+        values[f"{name}_lower"] = (lower, prev_lower)
+        values[f"{name}_upper"] = (upper, prev_upper)
+    return values
+
+
+def _assert_matches(actual: dict, expected: dict, stop: int):
+    for name, pair in expected.items():
+        np.testing.assert_allclose(
+            actual[name], pair, rtol=TOLERANCE, atol=TOLERANCE, equal_nan=True,
+            err_msg=f"{name} after {stop} candles",
+        )
+
+
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_graph_matches_pandas_with_revised_candles(seed):
+    columns = _random_candles(300, seed)
+    rng = np.random.default_rng(seed + 100)
+    graph = IndicatorGraph()
+    nodes = _nodes(graph)
+    for stop in range(1, len(columns["close"]) + 1):
+        # a forming tick of the newest candle, then its final values
+        graph.update(_candles(_forming(columns, stop - 1, rng), stop))
+        graph.update(_candles(columns, stop))
+        _assert_matches(_actual(nodes), _expected(columns, stop), stop)
+
+
+def test_graph_updated_with_batches_of_candles():
+    columns = _random_candles(300, 4)
+    graph = IndicatorGraph()
+    nodes = _nodes(graph)
+    for stop in (1, 2, 40, 41, 120, 299, 300):
+        graph.update(_candles(columns, stop))
+        _assert_matches(_actual(nodes), _expected(columns, stop), stop)
+
+
+@pytest.mark.parametrize("bind_at", [1, 15, 100])
+def test_nodes_bound_late_warm_up_from_history(bind_at):
+    columns = _random_candles(250, 5)
+    rng = np.random.default_rng(6)
+    seen = {"stop": 0}
+    graph = IndicatorGraph(history=lambda: _candles(columns, seen["stop"]))
+    early = graph.ema(10)
+    nodes = None
+    for stop in range(1, len(columns["close"]) + 1):
+        graph.update(_candles(_forming(columns, stop - 1, rng), stop))
+        graph.update(_candles(columns, stop))
+        seen["stop"] = stop
+        if stop == bind_at:
+            nodes = _nodes(graph)
+        if nodes is not None:
+            _assert_matches(_actual(nodes), _expected(columns, stop), stop)
+    close = pd.Series(columns["close"])
+    np.testing.assert_allclose(early.value, ema(close, 10).iloc[-1], rtol=TOLERANCE)
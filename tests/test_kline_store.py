@@ -0,0 +1,56 @@
+"""Store cache and input checks of the kline endpoint."""
+import pytest
+from fastapi import HTTPException
+
+from app import exchange_info, kline_store
+
+
+@pytest.fixture
+def known_symbols(monkeypatch):
+    symbols = {"BTCUSDT": exchange_info.SymbolFilters("BTCUSDT")}
+    monkeypatch.setattr(exchange_info.EXCHANGE_INFO, "symbols", symbols)
+    monkeypatch.setattr(exchange_info, "EXCHANGE_INFO_RETRY_SECONDS", float("inf"))
+
+
+def test_least_recently_used_store_is_evicted(monkeypatch):
+    monkeypatch.setattr(kline_store, "STORES", kline_store.OrderedDict())
+    monkeypatch.setattr(kline_store, "KLINE_STORE_CACHE_SIZE", 2)
+    first = kline_store.get_store("btcusdt", "1m")
+    kline_store.get_store("ETHUSDT", "1m")
+    assert kline_store.get_store("BTCUSDT", "1m") is first
+    kline_store.get_store("XRPUSDT", "1m")
+    assert list(kline_store.STORES) == [("BTCUSDT", "1m"), ("XRPUSDT", "1m")]
+
+
+def test_unknown_interval_is_rejected(known_symbols):
+    with pytest.raises(HTTPException) as exc:
+        kline_store.get_klines("BTCUSDT", interval="7m", current_user={})
+    assert exc.value.status_code == 400
+
+
+def test_unknown_symbol_is_rejected(known_symbols, monkeypatch):
+    monkeypatch.setattr(kline_store, "STORES", kline_store.OrderedDict())
+    with pytest.raises(HTTPException) as exc:
+        kline_store.get_klines("../../etc", interval="1m", current_user={})
+    assert exc.value.status_code == 404
+    assert not kline_store.STORES
+
+
+def test_known_symbol_reads_the_store(known_symbols, tmp_path, monkeypatch):
+    monkeypatch.setattr(kline_store, "STORES", kline_store.OrderedDict())
+    monkeypatch.chdir(tmp_path)  # the store directory is relative
+    store = kline_store.get_store("BTCUSDT", "1m")
+    store.append([[0, "1", "2", "0.5", "1.5", "10", 59_999]])
+    body = kline_store.get_klines("btcusdt", interval="1m", current_user={})
+    assert body["klines"] == [[0, 1.0, 2.0, 0.5, 1.5, 10.0]]
+
+
+def test_limit_is_capped(known_symbols, tmp_path, monkeypatch):
+    monkeypatch.setattr(kline_store, "STORES", kline_store.OrderedDict())
+    monkeypatch.setattr(kline_store, "KLINES_MAX_LIMIT", 3)
+    monkeypatch.chdir(tmp_path)
+    store = kline_store.get_store("BTCUSDT", "1m")
+    store.append([[i * 60_000, "1", "2", "0.5", "1.5", "10", i * 60_000 + 59_999]
+                  for i in range(10)])
+    body = kline_store.get_klines("BTCUSDT", interval="1m", limit=10**9, current_user={})
+    assert [row[0] for row in body["klines"]] == [7 * 60_000, 8 * 60_000, 9 * 60_000]
@@ -0,0 +1,45 @@
+"""Queries of the log archive racing its writer."""
+from app import log_archive
+from app.logs import record
+
+
+def _archive(tmp_path, monkeypatch, records: int) -> log_archive.LogArchive:
+    monkeypatch.setattr(log_archive, "LOG_SEGMENT_RECORDS", 2)
+    archive = log_archive.LogArchive(str(tmp_path))
+    archive._load()
+    archive._write([(1, "s", 0, record("message", f"line {i}")) for i in range(records)])
+    archive._close_files()
+    return archive
+
+
+def test_segment_expired_during_a_query_is_skipped(tmp_path, monkeypatch):
+    archive = _archive(tmp_path, monkeypatch, 4)
+    first, second = archive.segments
+    real_lines = first.lines
+
+    def expire_then_read(rows):
+        # _expire removes the segment after history() copied the list
+        first.remove()
+        return real_lines(rows)
+
+    monkeypatch.setattr(first, "lines", expire_then_read)
+    lines, cursor = archive.history(1)
+    assert [line["fields"]["message"] for line in lines] == ["line 2", "line 3"]
+    assert cursor is None
+
+
+def test_growing_segment_is_remapped_and_the_old_map_closed(tmp_path, monkeypatch):
+    monkeypatch.setattr(log_archive, "LOG_SEGMENT_RECORDS", 10)
+    archive = log_archive.LogArchive(str(tmp_path))
+    archive._load()
+    archive._write([(1, "s", 0, record("message", "first"))])
+    assert len(archive.history(1)[0]) == 1
+    segment = archive.segments[0]
+    old = segment._data
+
+    archive._write([(1, "s", 0, record("message", "second"))])
+    archive._close_files()
+    lines, _ = archive.history(1)
+    assert [line["fields"]["message"] for line in lines] == ["first", "second"]
+    assert old.closed
+    assert segment._data is not old
@@ -0,0 +1,54 @@
+"""Symbol checks of the ticker endpoints."""
+import asyncio
+import json
+
+import pytest
+from binance.exceptions import BinanceAPIException
+from fastapi import HTTPException
+
+from app import cache, exchange_info, market
+
+
+class _Client:
+    def __init__(self):
+        self.calls = []
+
+    def get_ticker(self, symbol):
+        self.calls.append(symbol)
+        text = json.dumps({"code": -1121, "msg": "Invalid symbol."})
+        raise BinanceAPIException(None, 400, text)
+
+
+@pytest.fixture
+def client(monkeypatch):
+    client = _Client()
+    symbols = {s: exchange_info.SymbolFilters(s) for s in ("BTCUSDT", "DELISTED")}
+    monkeypatch.setattr(exchange_info.EXCHANGE_INFO, "symbols", symbols)
+    monkeypatch.setattr(exchange_info, "EXCHANGE_INFO_RETRY_SECONDS", float("inf"))
+    monkeypatch.setattr(market, "_client", client)
+    monkeypatch.setattr(market, "_L1", {})
+    monkeypatch.setattr(market, "_rejected", {})
+
+    async def no_cache(symbols):
+        return [None] * len(symbols)
+
+    monkeypatch.setattr(cache, "get_market_data", no_cache)
+    return client
+
+
+def _status(call) -> int:
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(call)
+    return exc.value.status_code
+
+
+def test_unknown_symbols_never_reach_the_exchange(client):
+    names = ",".join(f"BOGUS{i}" for i in range(50))
+    assert _status(market.get_markets(names, current_user={})) == 404
+    assert client.calls == []
+
+
+def test_rejected_symbol_is_remembered(client):
+    for _ in range(3):
+        assert _status(market.get_market("delisted", current_user={})) == 404
+    assert client.calls == ["DELISTED"]
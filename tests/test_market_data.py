@@ -0,0 +1,103 @@
+"""Polling schedule of the shared kline feed."""
+import asyncio
+
+import pytest
+
+from app import kline_store, market_data, scheduler
+
+
+class _Stop(Exception):
+    pass
+
+
+class _NoNewCandles:
+    """Exchange that never has a newly closed candle."""
+
+    def __init__(self):
+        self.calls = 0
+
+    async def get_klines(self, **params):
+        self.calls += 1
+        return []
+
+
+@pytest.fixture
+def feed(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(kline_store, "STORES", kline_store.OrderedDict())
+    monkeypatch.setattr(market_data, "CLOSE_RETRIES", 2)
+    monkeypatch.setattr(scheduler.CLOCK, "synced_at", float("inf"))
+
+    async def no_backfill(exchange, store, now_ms):
+        return 0
+
+    monkeypatch.setattr(kline_store, "backfill", no_backfill)
+    feed = market_data.KlineFeed("BTCUSDT", "1m", None, 50)
+    feed.exchange = _NoNewCandles()
+    return feed
+
+
+def test_retries_only_after_a_close_wake_up(feed, monkeypatch):
+    fetches_at_wake = []
+
+    async def sleep_until_close(interval):
+        fetches_at_wake.append(feed.exchange.calls)
+        if len(fetches_at_wake) == 2:
+            raise _Stop
+
+    async def instant(seconds):
+        pass
+
+    monkeypatch.setattr(scheduler, "sleep_until_close", sleep_until_close)
+    monkeypatch.setattr(market_data.asyncio, "sleep", instant)
+    with pytest.raises(_Stop):
+        asyncio.run(feed._run())
+    # one fetch after the backfill, then the fetch and retries after the close
+    assert fetches_at_wake == [1, 1 + 1 + market_data.CLOSE_RETRIES]
+
+
+def test_failures_are_retried_and_waiters_still_served(feed, monkeypatch):
+    failures = {"warm": 1, "publish": 1}
+    warm_start = feed._warm_start
+    update = feed.graph.update
+
+    async def flaky_warm_start():
+        if failures["warm"]:
+            failures["warm"] -= 1
+            raise OSError("disk")
+        await warm_start()
+
+    def flaky_update(candles):
+        if failures["publish"]:
+            failures["publish"] -= 1
+            raise ValueError("indicator")
+        update(candles)
+
+    async def one_candle(**params):
+        return [[0, "1", "2", "0.5", "1.5", "10", 59_999]]
+
+    real_sleep = asyncio.sleep
+
+    async def instant(seconds):
+        await real_sleep(0)
+
+    async def forever(interval):
+        await asyncio.Event().wait()
+
+    monkeypatch.setattr(feed, "_warm_start", flaky_warm_start)
+    monkeypatch.setattr(feed.graph, "update", flaky_update)
+    monkeypatch.setattr(feed.exchange, "get_klines", one_candle)
+    monkeypatch.setattr(scheduler, "sleep_until_close", forever)
+    monkeypatch.setattr(market_data.asyncio, "sleep", instant)
+
+    async def main():
+        task = asyncio.create_task(feed._run())
+        try:
+            return await asyncio.wait_for(feed.wait(0), timeout=5)
+        finally:
+            task.cancel()
+
+    version, candles = asyncio.run(main())
+    assert version == 1
+    assert list(candles.open_time) == [0]
+    assert failures == {"warm": 0, "publish": 0}
@@ -0,0 +1,94 @@
+"""Validation and the awaited sweep of the parameter optimizer."""
+import asyncio
+
+import numpy as np
+import pytest
+from fastapi import HTTPException
+
+from app import kline_store, optimizer
+from app.candles import Candles
+
+STRATEGY = "continuous_trend_rider_xrp_1m"
+
+
+def _candles(n: int = 300) -> Candles:
+    rng = np.random.default_rng(1)
+    close = 100 + np.cumsum(rng.normal(0, 1, n))
+    open_time = np.arange(n, dtype=np.int64) * 60_000
+    return Candles(
+        open_time=open_time,
+        close_time=open_time + 59_999,
+        open=close,
+        high=close + 1,
+        low=close - 1,
+        close=close,
+        volume=np.ones(n),
+    )
+
+
+@pytest.mark.parametrize("values", [[5.5], ["5"], [True], [0], [-3], []])
+def test_bad_window_lengths_are_rejected_before_the_pool(values, monkeypatch):
+    monkeypatch.setattr(optimizer, "_pool", None)  # never reached
+    with pytest.raises(ValueError):
+        optimizer.optimize(STRATEGY, _candles(), {"ema_len": values})
+
+
+def test_bad_float_parameter_is_rejected():
+    space = {"min_vol_percent": [float("nan")]}
+    with pytest.raises(ValueError):
+        optimizer.optimize("hyper_frequency_ema_cross_btc_1m", _candles(), space)
+
+
+def test_endpoint_answers_400(monkeypatch):
+    class Store:
+        def read(self, start, end):
+            return _candles()
+
+    monkeypatch.setattr(kline_store, "get_store", lambda symbol, interval: Store())
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(optimizer.optimize_strategy(
+            STRATEGY, space={"ema_len": ["x"]}, samples=None, amount=100.0,
+            start=None, end=None, rank_by="total_profit", top=50, current_user={},
+        ))
+    assert exc.value.status_code == 400
+
+
+def test_async_sweep_matches_the_blocking_one():
+    candles = _candles()
+    space = {"ema_len": [3, 5.0, 8, 13]}
+    expected = optimizer.optimize(STRATEGY, candles, space, workers=2)
+    rows = asyncio.run(optimizer.optimize_async(STRATEGY, candles, space, workers=2))
+    assert rows == expected
+    assert [type(row["ema_len"]) for row in rows] == [int] * 4
+
+
+def test_oversized_grid_is_rejected_before_it_is_built(monkeypatch):
+    def never(space):
+        raise AssertionError("grid built")
+
+    monkeypatch.setattr(optimizer, "grid", never)
+    values = list(range(1, 201))
+    big = {name: values for name in ("ema_long_len", "ema_fast_len", "ema_slow_len", "atr_len_vol")}
+    with pytest.raises(ValueError, match="exceed the limit"):
+        optimizer._jobs("hyper_frequency_ema_cross_btc_1m", big, 100.0, None, None)
+    # sampling a huge grid only decodes the sampled positions
+    jobs = optimizer._jobs("hyper_frequency_ema_cross_btc_1m", big, 100.0, 10, 7)
+    assert len(jobs) == 10
+
+
+def test_random_search_draws_distinct_grid_combinations():
+    space = {"a": [1, 2, 3], "b": [10, 20], "c": [0.5, 1.5, 2.5, 3.5]}
+    combos = optimizer.random_search(space, 12, seed=3)
+    everything = optimizer.grid(space)
+    assert len({tuple(c.items()) for c in combos}) == 12
+    assert all(c in everything for c in combos)
+    assert all(list(c) == ["a", "b", "c"] for c in combos)
+    assert optimizer.random_search(space, 100) == everything
+
+
+def test_concurrent_sweeps_are_capped(monkeypatch):
+    monkeypatch.setattr(optimizer, "OPTIMIZER_MAX_SWEEPS", 1)
+    monkeypatch.setattr(optimizer, "_sweeps", 1)
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(optimizer.optimize_async(STRATEGY, _candles(), {"ema_len": [3]}))
+    assert exc.value.status_code == 429
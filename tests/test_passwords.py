@@ -0,0 +1,50 @@
+"""Recovery of the password hashing pool."""
+import asyncio
+import os
+import signal
+
+import pytest
+from fastapi import HTTPException
+
+from app import passwords
+
+
+@pytest.fixture
+def pool():
+    yield
+    passwords.shutdown()
+
+
+def test_pool_replaced_after_a_worker_dies(pool):
+    hashed = passwords.hash_password("secret")
+
+    async def main():
+        assert await passwords.verify_password_async("secret", hashed)
+        broken = passwords._pool
+        for process in list(broken._processes.values()):
+            os.kill(process.pid, signal.SIGKILL)
+        # the dead pool is noticed, replaced and the call retried
+        assert await passwords.verify_password_async("secret", hashed)
+        assert passwords._pool is not broken
+        assert not await passwords.verify_password_async("wrong", hashed)
+
+    asyncio.run(main())
+    assert passwords._pending == 0
+
+
+def test_pool_that_keeps_breaking_returns_503(pool, monkeypatch):
+    async def broken(pool, fn, *args):
+        raise passwords.BrokenProcessPool("worker died")
+
+    monkeypatch.setattr(
+        asyncio.BaseEventLoop, "run_in_executor", broken
+    )
+
+    async def main():
+        with pytest.raises(HTTPException) as exc:
+            await passwords.verify_password_async("secret", "hash")
+        return exc.value
+
+    error = asyncio.run(main())
+    assert error.status_code == 503
+    assert passwords._pending == 0
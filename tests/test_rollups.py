@@ -0,0 +1,41 @@
+"""Downsampled P&L series keep adding up to the totals."""
+import numpy as np
+import pytest
+
+from app import rollups
+
+
+def _trades(n: int, seed: int):
+    rng = np.random.default_rng(seed)
+    times = np.sort(rng.uniform(0, 30 * 86400, n))
+    return times, rng.normal(0, 5, n)
+
+
+@pytest.mark.parametrize("max_points", [3, 10, 50])
+def test_downsampled_points_keep_profit_and_trades(max_points):
+    times, profits = _trades(5000, max_points)
+    columns = rollups.rollup(times, profits, "hour")
+    assert len(columns["time"]) > max_points
+    points = rollups._points(columns, max_points)
+
+    assert len(points) == max_points
+    assert sum(p["trades"] for p in points) == len(profits)
+    assert sum(p["profit"] for p in points) == pytest.approx(profits.sum())
+    assert points[-1]["cumulative"] == pytest.approx(profits.sum())
+    # every merged span's win rate comes from its own trades
+    keep = rollups.lttb(columns["time"], columns["cumulative"], max_points)
+    starts = np.concatenate([[0], keep[:-1] + 1])
+    for point, start, end in zip(points, starts, keep + 1):
+        in_span = (columns["time"][start] <= np.floor(times / 3600) * 3600) & (
+            np.floor(times / 3600) * 3600 <= columns["time"][end - 1]
+        )
+        assert point["trades"] == in_span.sum()
+        expected = (profits[in_span] > 0).mean() * 100 if in_span.any() else 0.0
+        assert point["win_rate"] == pytest.approx(expected)
+
+
+def test_short_series_is_not_merged():
+    times, profits = _trades(20, 1)
+    columns = rollups.rollup(times, profits, "week")
+    points = rollups._points(columns, 50)
+    assert [p["trades"] for p in points] == list(columns["trades"])
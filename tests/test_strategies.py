@@ -0,0 +1,51 @@
+"""Lifecycle of the strategy loop."""
+import asyncio
+
+from app import exchange_info, market_data, strategies
+
+STRATEGY = "continuous_trend_rider_xrp_1m"
+
+
+class _Feed:
+    graph = None
+
+    async def wait(self, version):
+        return version + 1, None
+
+
+class _FailingStrategy:
+    ema_length = 5
+    squeeze_length = 0
+
+    def bind(self, graph):
+        pass
+
+    def check_signal(self, candles):
+        raise RuntimeError("bad candles")
+
+
+def test_feed_released_when_cancelled_during_error_backoff(monkeypatch):
+    released = []
+    feed = _Feed()
+
+    async def no_filters(symbol, client=None):
+        return None
+
+    monkeypatch.setattr(exchange_info.EXCHANGE_INFO, "filters", no_filters)
+    monkeypatch.setattr(market_data, "subscribe", lambda *args: feed)
+    monkeypatch.setattr(market_data, "unsubscribe", released.append)
+
+    async def main():
+        task = asyncio.create_task(strategies._run_strategy_loop(
+            _FailingStrategy(), None, 1, STRATEGY, 10.0
+        ))
+        # the failing check puts the loop into its 10 s back-off
+        await asyncio.sleep(0.05)
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    asyncio.run(main())
+    assert released == [feed]
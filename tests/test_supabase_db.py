@@ -0,0 +1,66 @@
+"""Connection reuse of the pooled Supabase clients."""
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from app.supabase_db import AsyncSupabaseDB, SupabaseDB
+
+REQUESTS = 20
+
+
+class _Postgrest(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        status = 404 if self.path.startswith("/rest/v1/missing") else 200
+        body = json.dumps([{"id": 1, "username": "test"}]).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def postgrest(monkeypatch):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Postgrest)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setenv("SUPABASE_URL", f"http://127.0.0.1:{server.server_port}")
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_sync_client_reuses_one_connection(postgrest):
+    db = SupabaseDB()
+    for _ in range(REQUESTS):
+        assert db.get_user(1)["username"] == "test"
+    with pytest.raises(RuntimeError):
+        db._request("GET", "/missing")
+    db.http.close()
+    stats = db.stats.snapshot()
+    assert stats["GET /users"]["count"] == REQUESTS
+    assert stats["GET /users"]["connections"] == 1
+    missing = stats["GET /missing"]
+    assert (missing["count"], missing["errors"], missing["connections"]) == (1, 1, 0)
+
+
+def test_async_client_reuses_one_connection(postgrest):
+    async def main():
+        db = AsyncSupabaseDB()
+        for _ in range(REQUESTS):
+            assert (await db.get_user(1))["username"] == "test"
+        await db.aclose()
+        return db.stats.snapshot()["GET /users"]
+
+    stats = asyncio.run(main())
+    assert stats["count"] == REQUESTS
+    assert stats["connections"] == 1
@@ -0,0 +1,44 @@
+"""Rows the trade journal writes to Supabase."""
+import asyncio
+
+import pytest
+
+from app import trade_journal
+
+
+@pytest.fixture
+def written(monkeypatch):
+    calls = {"trades": [], "completed": []}
+
+    async def upsert_trades(rows):
+        calls["trades"].append(rows)
+        return [{**row, "id": i} for i, row in enumerate(rows, 1)]
+
+    async def upsert_completed_trades(rows):
+        calls["completed"].append(rows)
+        return rows
+
+    db = trade_journal.async_db
+    monkeypatch.setattr(db, "upsert_trades", upsert_trades)
+    monkeypatch.setattr(db, "upsert_completed_trades", upsert_completed_trades)
+    return calls
+
+
+def test_rows_carry_fill_times_and_the_bought_quantity(written, tmp_path):
+    journal = trade_journal.TradeJournal(str(tmp_path / "journal.jsonl"))
+    opened_at = "2026-01-02T03:04:05.000006"
+    ref = journal.record_open(1, "s", "BTCUSDT", 0.123456, 100.0, opened_at)
+    journal.record_close(
+        ref, 1, "s", "BTCUSDT", 0.1234, entry_price=100.0, exit_price=110.0,
+        entry_quantity=0.123456, entry_time=opened_at,
+    )
+    # replayed later, e.g. after Supabase was down
+    asyncio.run(journal._write_batch([e for _, e in journal.pending]))
+
+    rows = {row["side"]: row for row in written["trades"][0]}
+    close = journal.pending[1][1]
+    assert rows["buy"]["quantity"] == 0.123456
+    assert rows["buy"]["timestamp"] == "2026-01-02T03:04:05.000006+00:00"
+    assert rows["sell"]["quantity"] == 0.1234
+    assert rows["sell"]["timestamp"] == close["time"] + "+00:00"
+    assert written["completed"][0][0]["quantity"] == 0.1234